@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+📦 Индекс свободных аккаунтов по играм
+Выдача свободного аккаунта без чтения всей таблицы steam_accounts
+"""
+
+import time
+import threading
+import logging
+from typing import Dict, Iterable, Optional, Tuple
+from config import Config
+
+class AccountInventory:
+    """
+    Кэш свободных аккаунтов процесса: игра -> упорядоченное множество ID.
+    Источник истины — база данных: выданный из кэша ID все равно занимается
+    условным UPDATE, поэтому устаревшая запись приводит лишь к повторной попытке.
+    """
+
+    def __init__(self, db_path: str, reload_seconds: int = None):
+        self.db_path = db_path
+        self.reload_seconds = reload_seconds or Config.INVENTORY_RELOAD_SECONDS
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._free: Dict[str, Dict[int, None]] = {}
+        self._games: Dict[int, str] = {}
+        self._loaded_at: Optional[float] = None
+
+    def _is_stale(self) -> bool:
+        return self._loaded_at is None or time.monotonic() - self._loaded_at > self.reload_seconds
+
+    def load(self, rows: Iterable[Tuple[int, str]]):
+        """Полная загрузка индекса из пар (account_id, game_name)"""
+        free: Dict[str, Dict[int, None]] = {}
+        games: Dict[int, str] = {}
+        for account_id, game_name in rows:
+            free.setdefault(game_name, {})[account_id] = None
+            games[account_id] = game_name
+
+        with self._lock:
+            self._free = free
+            self._games = games
+            self._loaded_at = time.monotonic()
+        self.logger.debug(f"Индекс свободных аккаунтов загружен: {len(games)} аккаунтов, {len(free)} игр")
+
+    def needs_reload(self) -> bool:
+        """Нужна ли перезагрузка индекса из базы"""
+        with self._lock:
+            return self._is_stale()
+
+    def invalidate(self):
+        """Пометить индекс устаревшим"""
+        with self._lock:
+            self._loaded_at = None
+
+    def pop(self, game_name: str) -> Optional[int]:
+        """Извлечение свободного аккаунта для игры за O(1)"""
+        with self._lock:
+            accounts = self._free.get(game_name)
+            if not accounts:
+                return None
+            account_id = next(iter(accounts))
+            del accounts[account_id]
+            del self._games[account_id]
+            return account_id
+
+    def add(self, account_id: int, game_name: str):
+        """Возврат аккаунта в число свободных"""
+        with self._lock:
+            old_game = self._games.get(account_id)
+            if old_game is not None and old_game != game_name:
+                self._free.get(old_game, {}).pop(account_id, None)
+            self._free.setdefault(game_name, {})[account_id] = None
+            self._games[account_id] = game_name
+
+    def discard(self, account_id: int):
+        """Удаление аккаунта из числа свободных"""
+        with self._lock:
+            game_name = self._games.pop(account_id, None)
+            if game_name is not None:
+                self._free.get(game_name, {}).pop(account_id, None)
+
+    def count(self, game_name: str) -> int:
+        """Количество свободных аккаунтов для игры"""
+        with self._lock:
+            return len(self._free.get(game_name, {}))
+
+
+_inventories: Dict[str, AccountInventory] = {}
+_inventories_lock = threading.Lock()
+
+def get_inventory(db_path: str) -> AccountInventory:
+    """Получение общего индекса для файла базы данных"""
+    with _inventories_lock:
+        inventory = _inventories.get(db_path)
+        if inventory is None:
+            inventory = AccountInventory(db_path)
+            _inventories[db_path] = inventory
+        return inventory
@@ -12,6 +12,7 @@ from typing import List, Dict, Optional, Tuple
 from dataclasses import dataclass
 from enum import Enum
 import logging
+from db_pool import get_pool
 
 class AccountStatus(Enum):
     """Статусы аккаунтов"""
@@ -53,12 +54,13 @@ class AccountManager:
     
     def __init__(self, db_path: str = "steam_rental.db"):
         self.db_path = db_path
+        self.pool = get_pool(self.db_path)
         self.setup_database()
         self.logger = logging.getLogger(__name__)
     
     def setup_database(self):
         """Настройка базы данных для аккаунтов"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.pool.connection() as conn:
             cursor = conn.cursor()
             
             # Таблица аккаунтов с расширенной информацией
@@ -158,7 +160,7 @@ class AccountManager:
     def add_account(self, account_data: Dict) -> int:
         """Добавление нового аккаунта"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.pool.connection() as conn:
                 cursor = conn.cursor()
                 
                 # Подготовка данных
@@ -222,7 +224,7 @@ class AccountManager:
                     sort_order: str = "DESC", limit: Optional[int] = None) -> List[AccountInfo]:
         """Получение списка аккаунтов с фильтрацией и сортировкой"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.pool.connection() as conn:
                 cursor = conn.cursor()
                 
                 # Базовый запрос
@@ -282,7 +284,7 @@ class AccountManager:
     def update_account(self, account_id: int, updates: Dict) -> bool:
         """Обновление информации об аккаунте"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.pool.connection() as conn:
                 cursor = conn.cursor()
                 
                 # Получаем старые данные для истории
@@ -329,7 +331,7 @@ class AccountManager:
     def delete_account(self, account_id: int) -> bool:
         """Удаление аккаунта"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.pool.connection() as conn:
                 cursor = conn.cursor()
                 
                 # Получаем данные для истории
@@ -365,7 +367,7 @@ class AccountManager:
     def get_account_statistics(self, account_id: Optional[int] = None) -> Dict:
         """Получение статистики аккаунтов"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.pool.connection() as conn:
                 cursor = conn.cursor()
                 
                 if account_id:
@@ -439,7 +441,7 @@ class AccountManager:
     def search_accounts(self, query: str) -> List[AccountInfo]:
         """Поиск аккаунтов по различным критериям"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.pool.connection() as conn:
                 cursor = conn.cursor()
                 
                 search_query = """
@@ -466,7 +468,7 @@ class AccountManager:
     def get_top_earning_accounts(self, limit: int = 10) -> List[AccountInfo]:
         """Получение топ аккаунтов по доходу"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.pool.connection() as conn:
                 cursor = conn.cursor()
                 
                 cursor.execute("""
@@ -489,7 +491,7 @@ class AccountManager:
     def get_accounts_by_game(self, game_name: str) -> List[AccountInfo]:
         """Получение аккаунтов по игре"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.pool.connection() as conn:
                 cursor = conn.cursor()
                 
                 cursor.execute("""
@@ -512,7 +514,7 @@ class AccountManager:
     def add_tag(self, name: str, color: str = '#007bff', description: str = '') -> int:
         """Добавление нового тега"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.pool.connection() as conn:
                 cursor = conn.cursor()
                 
                 cursor.execute("""
@@ -531,7 +533,7 @@ class AccountManager:
     def get_all_tags(self) -> List[Dict]:
         """Получение всех тегов"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.pool.connection() as conn:
                 cursor = conn.cursor()
                 
                 cursor.execute("SELECT * FROM account_tags ORDER BY name")
@@ -555,7 +557,7 @@ class AccountManager:
     def _add_account_tags(self, account_id: int, tags: List[str]):
         """Добавление тегов к аккаунту"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.pool.connection() as conn:
                 cursor = conn.cursor()
                 
                 for tag_name in tags:
@@ -583,7 +585,7 @@ class AccountManager:
     def _update_account_tags(self, account_id: int, new_tags: List[str]):
         """Обновление тегов аккаунта"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.pool.connection() as conn:
                 cursor = conn.cursor()
                 
                 # Удаляем старые связи
@@ -599,7 +601,7 @@ class AccountManager:
                            new_value: Optional[str], user_id: Optional[str] = None):
         """Логирование действий с аккаунтом"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.pool.connection() as conn:
                 cursor = conn.cursor()
                 
                 cursor.execute("""
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+⚡ Асинхронный фасад над Database
+Вызовы базы данных выполняются в пуле потоков и не блокируют event loop бота
+"""
+
+import asyncio
+import functools
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict
+from config import Config
+from database import Database
+
+class AsyncDatabase:
+    """
+    Асинхронная обертка с тем же набором методов, что и Database:
+    `await adb.get_account(1)` вместо `db.get_account(1)`.
+    Тяжелые отчетные запросы выполняются в отдельном пуле, чтобы статистика
+    администратора не занимала потоки, обслуживающие остальных пользователей.
+    """
+
+    # Методы с агрегатами и полными выборками
+    HEAVY_METHODS = {
+        'get_detailed_stats',
+        'get_stats_snapshot',
+        'get_statistics',
+        'get_users_list',
+        'get_all_accounts',
+        'get_recent_activity',
+    }
+
+    def __init__(self, db: Database = None, max_workers: int = None):
+        self.db = db or Database()
+        self.logger = logging.getLogger(__name__)
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers or Config.DATABASE_ASYNC_WORKERS,
+            thread_name_prefix="db"
+        )
+        self._heavy_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="db-heavy")
+        self._wrappers: Dict[str, Callable] = {}
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self.db, name)
+        if not callable(attr):
+            return attr
+
+        wrapper = self._wrappers.get(name)
+        if wrapper is None:
+            executor = self._heavy_executor if name in self.HEAVY_METHODS else self._executor
+
+            @functools.wraps(attr)
+            async def wrapper(*args, **kwargs):
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(executor, functools.partial(attr, *args, **kwargs))
+
+            self._wrappers[name] = wrapper
+        return wrapper
+
+    def close(self):
+        """Остановка пулов потоков"""
+        self._executor.shutdown(wait=False)
+        self._heavy_executor.shutdown(wait=False)
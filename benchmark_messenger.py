@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+⏱️ Замер сценариев мессенджера FunPay на локальных страницах
+Запуск: python benchmark_messenger.py [--messages 20] [--show]
+Нужны Chrome и selenium; страницы FunPay заменяются test_data/messenger
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List
+from browser_pool import BrowserPool
+from funpay_messenger import FunPayMessenger
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'test_data', 'messenger')
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    """Страницы FunPay из test_data/messenger"""
+
+    PAGES = {
+        '/account/login': 'login.html',
+        '/account/orders': 'account.html',
+        '/account/sells/add': 'sells_add.html',
+        '/chat': 'chat.html',
+    }
+
+    def do_GET(self):
+        if self.path == '/chat/list':
+            time.sleep(0.1)
+            body = json.dumps([{'name': 'buyer', 'message': 'Как войти в аккаунт?', 'time': '12:00'}])
+            return self._send(body.encode(), 'application/json')
+
+        page = self.PAGES.get(self.path)
+        if page is None and self.path.startswith('/orders/'):
+            page = 'order.html'
+        if page is None:
+            return self._send('<html><body>FunPay</body></html>'.encode(), 'text/html')
+        with open(os.path.join(FIXTURES_DIR, page), 'rb') as f:
+            self._send(f.read(), 'text/html; charset=utf-8')
+
+    def _send(self, body: bytes, content_type: str):
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+def timed(runs: int, flow: Callable[[int], object]) -> Dict:
+    """Время выполнения сценария runs раз"""
+    durations: List[float] = []
+    failures = 0
+    for i in range(runs):
+        started = time.perf_counter()
+        if not flow(i):
+            failures += 1
+        durations.append(time.perf_counter() - started)
+    durations.sort()
+    return {
+        'runs': runs,
+        'failures': failures,
+        'avg': sum(durations) / runs,
+        'p50': durations[runs // 2],
+        'max': durations[-1],
+    }
+
+def run_benchmark(messages: int = 20, headless: bool = True) -> Dict[str, Dict]:
+    """Замер входа, отправки сообщений, создания объявления и автоответа"""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), FixtureHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    pool = BrowserPool(size=1, headless=headless, base_url=base_url,
+                       cookies_path=os.path.join(tempfile.mkdtemp(), 'cookies.json'))
+    messenger = FunPayMessenger(headless=headless, pool=pool)
+    try:
+        results = {
+            'login_to_funpay': timed(1, lambda i: messenger.login_to_funpay('user', 'password')),
+            'send_message_to_order': timed(
+                messages, lambda i: messenger.send_message_to_order(f'order{i % 3}', f'Сообщение {i}')
+            ),
+            'create_rental_listing': timed(3, lambda i: messenger.create_rental_listing('Dota 2', 50)),
+            'auto_reply_to_messages': timed(
+                3, lambda i: messenger.auto_reply_to_messages({'войти': 'Данные для входа в заказе'})
+            ),
+        }
+    finally:
+        messenger.close()
+        server.shutdown()
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Замер сценариев мессенджера FunPay")
+    parser.add_argument('--messages', type=int, default=20, help="число отправляемых сообщений")
+    parser.add_argument('--show', action='store_true', help="показывать окно браузера")
+    args = parser.parse_args()
+
+    results = run_benchmark(args.messages, headless=not args.show)
+    print(f"{'Сценарий':<26}{'запусков':>9}{'ошибок':>8}{'сред., с':>10}{'p50, с':>9}{'макс., с':>10}")
+    for name, stats in results.items():
+        print(f"{name:<26}{stats['runs']:>9}{stats['failures']:>8}"
+              f"{stats['avg']:>10.3f}{stats['p50']:>9.3f}{stats['max']:>10.3f}")
+    return 1 if any(stats['failures'] for stats in results.values()) else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
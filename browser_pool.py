@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🌐 Пул браузеров для FunPay
+Прогретые сессии Chrome с сохранением cookies между перезапусками
+"""
+
+import os
+import json
+import queue
+import threading
+import logging
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional
+from config import Config
+from rate_limiter import TokenBucket, get_funpay_limiter
+
+_driver_path: Optional[str] = None
+_driver_path_lock = threading.Lock()
+
+def resolve_chromedriver() -> str:
+    """Путь к chromedriver; загрузка и проверка версии выполняются один раз на процесс"""
+    global _driver_path
+    with _driver_path_lock:
+        if _driver_path is None:
+            from webdriver_manager.chrome import ChromeDriverManager
+            _driver_path = ChromeDriverManager().install()
+        return _driver_path
+
+def create_chrome_driver(headless: bool = True):
+    """Запуск Chrome с настройками мессенджера"""
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
+    from selenium.webdriver.chrome.service import Service
+
+    chrome_options = Options()
+
+    if headless:
+        chrome_options.add_argument("--headless=new")
+
+    chrome_options.add_argument("--no-sandbox")
+    chrome_options.add_argument("--disable-dev-shm-usage")
+    chrome_options.add_argument("--disable-gpu")
+    chrome_options.add_argument("--window-size=1920,1080")
+    chrome_options.add_argument("--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36")
+
+    # Отключаем изображения для ускорения
+    prefs = {
+        "profile.managed_default_content_settings.images": 2,
+        "profile.default_content_setting_values.notifications": 2
+    }
+    chrome_options.add_experimental_option("prefs", prefs)
+
+    service = Service(resolve_chromedriver())
+    return webdriver.Chrome(service=service, options=chrome_options)
+
+class CookieStore:
+    """Cookies авторизованной сессии FunPay в файле"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self.version = 0  # растет при каждом сохранении
+
+    def load(self) -> List[Dict]:
+        with self._lock:
+            if not os.path.exists(self.path):
+                return []
+            try:
+                with open(self.path, encoding='utf-8') as f:
+                    return json.load(f)
+            except (OSError, ValueError) as e:
+                self.logger.warning(f"⚠️ Не удалось прочитать cookies {self.path}: {e}")
+                return []
+
+    def save(self, cookies: List[Dict]):
+        with self._lock:
+            tmp_path = self.path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(cookies, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+            self.version += 1
+
+    def apply(self, driver, base_url: str) -> bool:
+        """Загрузка cookies в браузер; False, если сохраненных cookies нет"""
+        cookies = self.load()
+        if not cookies:
+            return False
+        # Cookies можно добавить только на странице того же домена
+        driver.get(base_url)
+        for cookie in cookies:
+            cookie = {key: value for key, value in cookie.items() if key != 'sameSite'}
+            try:
+                driver.add_cookie(cookie)
+            except Exception as e:
+                self.logger.debug(f"Cookie {cookie.get('name')} пропущен: {e}")
+        return True
+
+class BrowserSession:
+    """Браузер пула и версия cookies, загруженных в него"""
+
+    def __init__(self, driver, cookies_version: int):
+        self.driver = driver
+        self.cookies_version = cookies_version
+        self.logged_in = False
+
+class BrowserPool:
+    """
+    Пул из size браузеров, которые создаются один раз и переиспользуются.
+    Новый браузер получает сохраненные cookies и входит заново только если они
+    устарели; после входа cookies сохраняются для остальных браузеров и следующего
+    запуска. Браузер, переставший отвечать, закрывается и при необходимости
+    создается заново.
+    """
+
+    def __init__(self, size: int = None, headless: bool = True,
+                 factory: Callable[[], object] = None, cookies_path: str = None,
+                 base_url: str = None, checkout_timeout: float = None, rate_limiter: TokenBucket = None):
+        self.size = size or Config.BROWSER_POOL_SIZE
+        self.base_url = base_url or Config.FUNPAY_BASE_URL
+        self.checkout_timeout = checkout_timeout or Config.BROWSER_CHECKOUT_TIMEOUT
+        self.cookies = CookieStore(cookies_path or Config.BROWSER_COOKIES_PATH)
+        self.rate_limiter = rate_limiter or get_funpay_limiter()
+        self.logger = logging.getLogger(__name__)
+
+        if factory is None:
+            # Драйвер определяется при запуске, а не при первой отправке
+            resolve_chromedriver()
+            factory = lambda: create_chrome_driver(headless)
+        self.factory = factory
+
+        self._idle: queue.LifoQueue = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(self.size)
+        self._lock = threading.Lock()
+        self._sessions: List[BrowserSession] = []
+        self._login: Optional[Callable[[object], bool]] = None
+        self.closed = False
+
+    def set_login(self, login: Callable[[object], bool]):
+        """Функция входа в FunPay для браузеров без действующих cookies"""
+        self._login = login
+
+    def warm_up(self):
+        """Создание всех браузеров заранее"""
+        sessions = [self._create() for _ in range(self.size - len(self._sessions))]
+        for session in sessions:
+            self._idle.put(session)
+
+    def _create(self) -> BrowserSession:
+        driver = self.factory()
+        session = BrowserSession(driver, self.cookies.version)
+        session.logged_in = self.cookies.apply(driver, self.base_url)
+        with self._lock:
+            self._sessions.append(session)
+        self.logger.info(f"🌐 Запущен браузер пула ({len(self._sessions)}/{self.size})")
+        return session
+
+    def _discard(self, session: BrowserSession):
+        with self._lock:
+            if session in self._sessions:
+                self._sessions.remove(session)
+        try:
+            session.driver.quit()
+        except Exception as e:
+            self.logger.debug(f"Ошибка закрытия браузера: {e}")
+
+    def _prepare(self, session: BrowserSession):
+        """Подтягивание свежих cookies и вход, если сессия не авторизована"""
+        if session.cookies_version != self.cookies.version:
+            session.logged_in = self.cookies.apply(session.driver, self.base_url)
+            session.cookies_version = self.cookies.version
+        if not session.logged_in and self._login:
+            session.logged_in = self.login(session)
+
+    def login(self, session: BrowserSession) -> bool:
+        """Вход в браузере и сохранение cookies для остальных"""
+        if not self._login(session.driver):
+            return False
+        self.cookies.save(session.driver.get_cookies())
+        session.cookies_version = self.cookies.version
+        return True
+
+    @staticmethod
+    def _is_alive(session: BrowserSession) -> bool:
+        try:
+            session.driver.current_url
+            return True
+        except Exception:
+            return False
+
+    @contextmanager
+    def _checkout(self, prepare: bool = True):
+        if self.closed:
+            raise RuntimeError("Пул браузеров закрыт")
+        if not self._slots.acquire(timeout=self.checkout_timeout):
+            raise TimeoutError("Нет свободного браузера в пуле")
+
+        session = None
+        try:
+            try:
+                session = self._idle.get_nowait()
+            except queue.Empty:
+                session = self._create()
+            if prepare:
+                self._prepare(session)
+            yield session
+        except Exception:
+            # Ошибка на странице не повод перезапускать браузер, упавший браузер — повод
+            if session is not None and not self._is_alive(session):
+                self._discard(session)
+                session = None
+            raise
+        finally:
+            if session is not None:
+                self._idle.put(session)
+            self._slots.release()
+
+    @contextmanager
+    def session(self):
+        """Выдача браузера из пула на время операции (операция занимает токен общей корзины)"""
+        self.rate_limiter.acquire()
+        with self._checkout() as session:
+            yield session.driver
+
+    def ensure_login(self) -> bool:
+        """Вход (или проверка входа) в одном браузере; остальные получат его cookies"""
+        with self._checkout(prepare=False) as session:
+            session.logged_in = self.login(session)
+            return session.logged_in
+
+    def close(self):
+        """Сохранение cookies и закрытие всех браузеров"""
+        self.closed = True
+        with self._lock:
+            sessions = list(self._sessions)
+        for session in sessions:
+            if session.logged_in:
+                try:
+                    self.cookies.save(session.driver.get_cookies())
+                    break
+                except Exception as e:
+                    self.logger.warning(f"⚠️ Не удалось сохранить cookies: {e}")
+        for session in sessions:
+            self._discard(session)
+        self.logger.info("🌐 Пул браузеров закрыт")
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+⏳ Ожидания состояний страницы для мессенджера FunPay
+Вместо фиксированных пауз — ожидание нужного состояния DOM с коротким таймаутом
+"""
+
+import time
+from typing import Tuple
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from config import Config
+
+Locator = Tuple[str, str]
+
+# Счетчик незавершенных fetch/XHR; устанавливается на страницу один раз
+_PENDING_REQUESTS_JS = """
+if (window.__pendingRequests === undefined) {
+    window.__pendingRequests = 0;
+    const done = () => { window.__pendingRequests = Math.max(0, window.__pendingRequests - 1); };
+    if (window.fetch) {
+        const originalFetch = window.fetch;
+        window.fetch = function () {
+            window.__pendingRequests++;
+            return originalFetch.apply(this, arguments).finally(done);
+        };
+    }
+    const originalSend = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.send = function () {
+        window.__pendingRequests++;
+        this.addEventListener('loadend', done);
+        return originalSend.apply(this, arguments);
+    };
+}
+return document.readyState === 'complete' ? window.__pendingRequests : -1;
+"""
+
+def text_option(text: str) -> Locator:
+    """Пункт выпадающего списка по тексту"""
+    return (By.XPATH, f"//div[contains(text(), '{text}')]")
+
+class PageWaits:
+    """Ожидания для одного браузера; таймаут по умолчанию короткий, опрос частый"""
+
+    def __init__(self, driver, timeout: float = None, poll: float = None):
+        self.driver = driver
+        self.timeout = timeout or Config.BROWSER_WAIT_TIMEOUT
+        self.poll = poll or Config.BROWSER_WAIT_POLL
+
+    def until(self, condition, timeout: float = None, message: str = ''):
+        """Ожидание произвольного условия WebDriverWait"""
+        wait = WebDriverWait(self.driver, timeout or self.timeout, poll_frequency=self.poll)
+        return wait.until(condition, message)
+
+    def present(self, locator: Locator, timeout: float = None):
+        """Элемент появился в DOM"""
+        return self.until(EC.presence_of_element_located(locator), timeout, f"нет элемента {locator}")
+
+    def visible(self, locator: Locator, timeout: float = None):
+        """Элемент отображается"""
+        return self.until(EC.visibility_of_element_located(locator), timeout, f"не виден {locator}")
+
+    def clickable(self, locator: Locator, timeout: float = None):
+        """Элемент отображается и доступен для нажатия"""
+        return self.until(EC.element_to_be_clickable(locator), timeout, f"не кликабелен {locator}")
+
+    def url_changes(self, url: str, timeout: float = None) -> bool:
+        """Страница ушла с указанного адреса"""
+        return self.until(EC.url_changes(url), timeout, f"адрес не изменился: {url}")
+
+    def document_ready(self, timeout: float = None) -> bool:
+        """Документ полностью загружен"""
+        return self.until(
+            lambda driver: driver.execute_script('return document.readyState') == 'complete',
+            timeout, "страница не загрузилась"
+        )
+
+    def network_idle(self, idle: float = None, timeout: float = None) -> bool:
+        """Документ загружен и fetch/XHR не выполняются в течение idle секунд"""
+        idle = Config.BROWSER_NETWORK_IDLE if idle is None else idle
+        state = {'since': None}
+
+        def is_idle(driver):
+            pending = driver.execute_script(_PENDING_REQUESTS_JS)
+            now = time.monotonic()
+            if pending != 0:
+                state['since'] = None
+                return False
+            if state['since'] is None:
+                state['since'] = now
+            return now - state['since'] >= idle
+
+        return self.until(is_idle, timeout, "сеть страницы не затихла")
+
+    def count(self, locator: Locator) -> int:
+        """Текущее число элементов"""
+        return len(self.driver.find_elements(*locator))
+
+    def appended(self, locator: Locator, previous_count: int, timeout: float = None):
+        """Добавился новый элемент (например, отправленное сообщение); возвращает последний"""
+        def grew(driver):
+            elements = driver.find_elements(*locator)
+            return elements[-1] if len(elements) > previous_count else False
+
+        return self.until(grew, timeout, f"не появился новый элемент {locator}")
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+📢 Массовые рассылки покупателям FunPay
+Параллельная отправка в пределах общей частоты запросов, повторы и продолжение после остановки
+"""
+
+import time
+import threading
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List
+from config import Config
+from database import Database
+
+class BulkMessageDispatcher:
+    """
+    Рассылка одного текста по многим заказам. Получатели и результаты хранятся
+    в базе, поэтому прерванная рассылка продолжается с неотправленных сообщений.
+    Сообщения уходят параллельно из workers потоков, а частоту задает общая
+    корзина токенов FunPay, а не паузы между сообщениями. Неудачные отправки
+    повторяются раундами с удваивающейся задержкой, пока не исчерпаны попытки.
+    """
+
+    def __init__(self, db: Database, send_message: Callable[[str, str], bool], workers: int = None,
+                 max_attempts: int = None, backoff_seconds: float = None):
+        self.db = db
+        self.send_message = send_message
+        self.workers = workers or Config.BULK_MESSAGE_WORKERS
+        self.max_attempts = max_attempts or Config.BULK_MESSAGE_MAX_ATTEMPTS
+        self.backoff_seconds = (Config.BULK_MESSAGE_BACKOFF_SECONDS
+                                if backoff_seconds is None else backoff_seconds)
+        self.logger = logging.getLogger(__name__)
+
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._stats = {'campaigns': 0, 'sent': 0, 'failed_attempts': 0, 'failed': 0}
+
+    def send(self, name: str, order_ids: Iterable[str], message: str) -> Dict:
+        """Создание и выполнение рассылки, возвращает отчет"""
+        campaign_id = self.db.create_message_campaign(name, message, list(order_ids))
+        return self.run(campaign_id)
+
+    def resume(self) -> List[Dict]:
+        """Продолжение рассылок, прерванных остановкой системы"""
+        return [self.run(campaign_id) for campaign_id in self.db.get_unfinished_message_campaign_ids()]
+
+    def run(self, campaign_id: int) -> Dict:
+        """Отправка неотправленных сообщений рассылки с повторами"""
+        campaign = self.db.get_message_campaign(campaign_id)
+        if campaign is None:
+            raise ValueError(f"Рассылка #{campaign_id} не найдена")
+
+        self.db.set_message_campaign_status(campaign_id, 'running')
+        self.logger.info(f"📢 Рассылка #{campaign_id} «{campaign['name']}» запущена")
+        started = time.monotonic()
+
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix=f"campaign-{campaign_id}") as executor:
+            while not self._stop.is_set():
+                pending = self.db.get_campaign_pending_recipients(campaign_id)
+                if not pending:
+                    break
+                # Попытки хранятся в базе, поэтому задержка повтора сохраняется и после перезапуска
+                attempts = min(attempts for _, attempts in pending)
+                if attempts and self._stop.wait(self.backoff_seconds * 2 ** (attempts - 1)):
+                    break
+                list(executor.map(
+                    lambda recipient: self._deliver(campaign_id, recipient[0], campaign['message']), pending
+                ))
+
+        if not self.db.get_campaign_pending_recipients(campaign_id):
+            self.db.set_message_campaign_status(campaign_id, 'completed')
+            with self._lock:
+                self._stats['campaigns'] += 1
+
+        report = self.report(campaign_id, time.monotonic() - started)
+        self.logger.info(f"📢 Рассылка #{campaign_id}: отправлено {report['sent']}, "
+                         f"ошибок {report['failed']}, осталось {report['pending']} "
+                         f"({report['messages_per_second']} сообщ./с)")
+        return report
+
+    def _deliver(self, campaign_id: int, order_id: str, message: str) -> str:
+        """Одна попытка отправки получателю; возвращает его новое состояние"""
+        if self._stop.is_set():
+            return 'pending'
+
+        try:
+            sent = bool(self.send_message(order_id, message))
+            error = None if sent else "сообщение не отправлено"
+        except Exception as e:
+            sent, error = False, str(e)
+
+        state = self.db.record_campaign_attempt(campaign_id, order_id, sent, error, self.max_attempts)
+        with self._lock:
+            if sent:
+                self._stats['sent'] += 1
+            else:
+                self._stats['failed_attempts'] += 1
+            if state == 'failed':
+                self._stats['failed'] += 1
+        if state == 'failed':
+            self.logger.error(f"❌ Рассылка #{campaign_id}: не удалось отправить сообщение "
+                              f"по заказу {order_id} за {self.max_attempts} попыток: {error}")
+        return state
+
+    def report(self, campaign_id: int, elapsed: float = None) -> Dict:
+        """Итог рассылки: число отправленных, неудачных и ожидающих, ошибки по заказам"""
+        campaign = self.db.get_message_campaign(campaign_id)
+        results = self.db.get_message_campaign_results(campaign_id)
+        states = [result['state'] for result in results.values()]
+        sent = states.count('sent')
+        return {
+            'campaign_id': campaign_id,
+            'name': campaign['name'],
+            'status': campaign['status'],
+            'total': len(results),
+            'sent': sent,
+            'failed': states.count('failed'),
+            'pending': states.count('pending'),
+            'results': {order_id: result['state'] for order_id, result in results.items()},
+            'failures': {order_id: result['error'] for order_id, result in results.items()
+                         if result['state'] == 'failed'},
+            'elapsed_seconds': None if elapsed is None else round(elapsed, 3),
+            'messages_per_second': round(sent / elapsed, 2) if elapsed else None,
+        }
+
+    def stop(self):
+        """Остановка рассылок; неотправленные сообщения останутся до следующего resume()"""
+        self._stop.set()
+
+    def get_metrics(self) -> Dict:
+        """Завершенные рассылки и результаты отправок"""
+        with self._lock:
+            return dict(self._stats)
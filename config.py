@@ -7,6 +7,28 @@ class Config:
     # Настройки FunPay
     FUNPAY_TOKEN = os.getenv('FUNPAY_TOKEN', 'your_funpay_token_here')
     FUNPAY_BASE_URL = 'https://funpay.com'
+    FUNPAY_MAX_CONNECTIONS = 10  # размер пула keep-alive соединений
+    FUNPAY_MAX_CONNECTIONS_PER_HOST = 4  # одновременных запросов к одному хосту
+    FUNPAY_REQUEST_TIMEOUT = 30  # секунды
+    FUNPAY_PAGE_CACHE_SECONDS = 60  # повторная загрузка страницы не чаще
+    FUNPAY_REQUESTS_PER_SECOND = 5  # средняя частота всех запросов к FunPay (HTTP и браузеры)
+    FUNPAY_REQUEST_BURST = 10  # запросов подряд без ожидания
+    MESSAGE_BACKEND = 'http'  # способ отправки сообщений: http или selenium
+    MESSAGE_FALLBACK = 'selenium'  # запасной способ ('' — без запасного)
+    BULK_MESSAGE_WORKERS = 8  # одновременных отправок рассылки
+    BULK_MESSAGE_MAX_ATTEMPTS = 3  # попыток отправки одному получателю
+    BULK_MESSAGE_BACKOFF_SECONDS = 10  # пауза перед повтором, удваивается с каждой попыткой
+    BROWSER_POOL_SIZE = 2  # браузеров мессенджера FunPay
+    BROWSER_COOKIES_PATH = 'funpay_cookies.json'  # cookies сессии FunPay между запусками
+    BROWSER_CHECKOUT_TIMEOUT = 60  # секунды ожидания свободного браузера
+    BROWSER_WAIT_TIMEOUT = 5  # секунды ожидания элемента на странице
+    BROWSER_WAIT_POLL = 0.05  # частота проверки состояния страницы
+    BROWSER_NETWORK_IDLE = 0.3  # секунды без запросов страницы
+    ORDER_POLL_MIN_SECONDS = 15  # опрос заказов сразу после активности
+    ORDER_POLL_MAX_SECONDS = 300  # опрос заказов в простое не реже
+    ORDER_POLL_BACKOFF = 2.0  # рост интервала после пустого опроса
+    ORDER_POLL_JITTER = 0.2  # случайный разброс интервала (доля)
+    ORDER_POLL_BUDGET_PER_HOUR = 240  # опросов заказов в час не больше
     
     # Настройки Telegram бота
     TELEGRAM_TOKEN = os.getenv('TELEGRAM_TOKEN', '8200815840:AAFUEvg-sNOvNctvqQ2yBrrpKBvJxlwKg5g')
@@ -22,6 +44,18 @@ class Config:
     
     # Настройки базы данных
     DATABASE_PATH = 'steam_rental.db'
+    DATABASE_BUSY_TIMEOUT = 5000  # мс ожидания блокировки
+    DATABASE_CACHE_SIZE_KB = 8192  # размер кэша страниц на соединение
+    BACKUP_DIR = 'backups'
+    BACKUP_GENERATIONS = 7  # хранимых резервных копий
+    BACKUP_PAGES_PER_STEP = 256  # страниц базы за один шаг копирования
+    BACKUP_STEP_SLEEP = 0.05  # секунды паузы между шагами
+    BACKUP_MAX_RESTARTS = 20  # перезапусков из-за записи до копирования одним шагом
+    INVENTORY_RELOAD_SECONDS = 300  # сверка индекса свободных аккаунтов с базой
+    DATABASE_ASYNC_WORKERS = 4  # потоки для запросов из обработчиков бота
+    STATS_CACHE_SECONDS = 15  # время жизни снимка статистики
+    BOT_PAGE_SIZE = 10  # записей на странице списков в боте
+    GAME_ALIASES_RELOAD_SECONDS = 300  # сверка псевдонимов игр с базой
     
     # Настройки браузера
     BROWSER_HEADLESS = os.getenv('BROWSER_HEADLESS', 'True').lower() == 'true'
@@ -30,6 +64,17 @@ class Config:
     # Настройки аренды
     DEFAULT_RENTAL_DURATION = 24  # часы
     PASSWORD_CHANGE_DELAY = 5  # минуты после окончания аренды
+    PASSWORD_ROTATION_WORKERS = 4  # одновременных смен пароля
+    PASSWORD_ROTATION_MAX_ATTEMPTS = 5  # попыток смены пароля одного аккаунта
+    PASSWORD_ROTATION_BACKOFF_SECONDS = 30  # задержка перед повтором, удваивается
+    RENTAL_EXPIRY_RESYNC_MINUTES = 60  # сверка очереди сроков аренд с базой
+    RENTAL_EXPIRY_RETRY_SECONDS = 30  # повтор завершения аренд после ошибки
+    ORDER_MAX_ATTEMPTS = 5  # попыток выдачи аккаунта по одному заказу
+    ORDER_NO_ACCOUNT_TIMEOUT_HOURS = 24  # заказ без свободного аккаунта ждет не дольше
+    ORDER_WORKERS = 4  # обработчиков конвейера заказов
+    ORDER_QUEUE_SIZE = 100  # заказов в очереди конвейера
+    ORDER_PROCESSING_TIMEOUT_MINUTES = 15  # заказ, зависший в обработке, берется повторно
+    JOB_TIMEOUT_SECONDS = 600  # предупреждение о зависшей периодической задаче
     
     # Часто задаваемые вопросы
     FAQ = {
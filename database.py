@@ -1,16 +1,33 @@
 import sqlite3
-import datetime
-from typing import List, Dict, Optional
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Callable, List, Dict, Optional, Tuple
 from config import Config
+from db_pool import get_pool
+from migrations import run_migrations
+from account_inventory import get_inventory
+from game_classifier import get_game_classifier, normalize_alias
 
 class Database:
+    # Подписчики на изменение сроков аренд: callback(db_path, rental_id, end_time).
+    # Общие для всех экземпляров, так как бот и система работают с разными объектами.
+    _rental_listeners: List[Callable[[str, int, datetime], None]] = []
+    
+    # Кэш снимков статистики по пути к базе: db_path -> (время расчета, статистика)
+    _stats_cache: Dict[str, Tuple[float, Dict]] = {}
+    _stats_lock = threading.Lock()
+    
     def __init__(self, db_path: str = None):
         self.db_path = db_path or Config.DATABASE_PATH
+        self.pool = get_pool(self.db_path)
+        self.inventory = get_inventory(self.db_path)
+        self.game_classifier = get_game_classifier(self.db_path)
         self.init_database()
     
     def init_database(self):
         """Инициализация базы данных и создание таблиц"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.pool.connection() as conn:
             cursor = conn.cursor()
             
             # Таблица аккаунтов Steam
@@ -107,21 +124,47 @@ class Database:
             ''')
             
             conn.commit()
+            
+            # Индексы и прочие изменения схемы
+            run_migrations(conn)
+    
+    @classmethod
+    def add_rental_listener(cls, callback: Callable[[str, int, datetime], None]):
+        """Подписка на создание и продление аренд"""
+        if callback not in cls._rental_listeners:
+            cls._rental_listeners.append(callback)
+    
+    @classmethod
+    def remove_rental_listener(cls, callback: Callable[[str, int, datetime], None]):
+        """Отписка от событий аренд"""
+        if callback in cls._rental_listeners:
+            cls._rental_listeners.remove(callback)
+    
+    def _notify_rental_deadline(self, rental_id: int, end_time: datetime):
+        """Уведомление подписчиков о новом сроке окончания аренды"""
+        for callback in list(self._rental_listeners):
+            try:
+                callback(self.db_path, rental_id, end_time)
+            except Exception as e:
+                print(f"Ошибка уведомления о сроке аренды: {e}")
     
     def add_steam_account(self, username: str, password: str, game_name: str) -> int:
         """Добавление нового аккаунта Steam"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.pool.connection() as conn:
             cursor = conn.cursor()
             cursor.execute('''
                 INSERT INTO steam_accounts (username, password, game_name)
                 VALUES (?, ?, ?)
             ''', (username, password, game_name))
             conn.commit()
-            return cursor.lastrowid
+        
+        self.inventory.add(cursor.lastrowid, game_name)
+        self._note_game(game_name)
+        return cursor.lastrowid
     
     def get_available_accounts(self, game_name: str = None) -> List[Dict]:
         """Получение доступных аккаунтов"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.pool.connection() as conn:
             cursor = conn.cursor()
             if game_name:
                 cursor.execute('''
@@ -138,48 +181,12 @@ class Database:
             return [dict(zip(columns, row)) for row in cursor.fetchall()]
     
     def rent_account(self, account_id: int, renter_id: str, duration_hours: int) -> bool:
-        """Аренда аккаунта"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            
-            # Проверяем, доступен ли аккаунт
-            cursor.execute('''
-                SELECT is_rented FROM steam_accounts WHERE id = ?
-            ''', (account_id,))
-            
-            result = cursor.fetchone()
-            if not result or result[0]:
-                return False
-            
-            start_time = datetime.now()
-            end_time = start_time + datetime.timedelta(hours=duration_hours)
-            
-            # Обновляем статус аккаунта
-            cursor.execute('''
-                UPDATE steam_accounts 
-                SET is_rented = TRUE, current_renter_id = ?, 
-                    rental_start_time = ?, rental_end_time = ?
-                WHERE id = ?
-            ''', (renter_id, start_time, end_time, account_id))
-            
-            # Создаем запись об аренде
-            cursor.execute('''
-                INSERT INTO rentals (account_id, renter_id, start_time, end_time, duration_hours)
-                VALUES (?, ?, ?, ?, ?)
-            ''', (account_id, renter_id, start_time, end_time, duration_hours))
-            
-            # Добавляем в историю операций
-            cursor.execute('''
-                INSERT INTO operation_history (user_id, operation_type, description)
-                VALUES (?, ?, ?)
-            ''', (renter_id, 'rental_start', f'Начата аренда аккаунта на {duration_hours} часов'))
-            
-            conn.commit()
-            return True
+        """Аренда аккаунта (то же, что create_rental)"""
+        return self.create_rental(account_id, renter_id, duration_hours)
     
     def get_rental_info(self, renter_id: str) -> Optional[Dict]:
         """Получение информации об аренде пользователя"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.pool.connection() as conn:
             cursor = conn.cursor()
             cursor.execute('''
                 SELECT sa.username, sa.game_name, r.start_time, r.end_time, r.duration_hours
@@ -221,100 +228,552 @@ class Database:
     
     def end_expired_rentals(self) -> int:
         """Завершение истекших аренд"""
+        return len(self.end_expired_rentals_batch())
+    
+    def end_expired_rentals_batch(self, hold_for_rotation: bool = False) -> List[int]:
+        """
+        Пакетное завершение истекших аренд.
+        Все истекшие аренды закрываются несколькими групповыми запросами в одной
+        транзакции. Возвращает ID освобожденных аккаунтов.
+        С hold_for_rotation аккаунты остаются недоступными до смены пароля
+        (см. complete_password_rotation).
+        """
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.pool.connection() as conn:
                 cursor = conn.cursor()
                 
+                # Берем блокировку записи сразу, чтобы набор истекших аренд не менялся
+                if not conn.in_transaction:
+                    cursor.execute('BEGIN IMMEDIATE')
+                
+                # Фиксируем момент времени, чтобы SELECT и UPDATE видели один набор
+                cursor.execute("SELECT datetime('now')")
+                now = cursor.fetchone()[0]
+                
                 # Находим истекшие аренды
                 cursor.execute('''
-                    SELECT r.id, r.account_id, r.renter_id
+                    SELECT r.id, r.account_id, r.renter_id, sa.game_name, r.duration_hours
                     FROM rentals r
-                    WHERE r.status = 'active' AND r.end_time < datetime('now')
-                ''')
+                    LEFT JOIN steam_accounts sa ON sa.id = r.account_id
+                    WHERE r.status = 'active' AND r.end_time < ?
+                ''', (now,))
                 
                 expired_rentals = cursor.fetchall()
-                expired_count = len(expired_rentals)
+                if not expired_rentals:
+                    return []
                 
-                for rental in expired_rentals:
-                    rental_id, account_id, renter_id = rental
-                    
-                    # Обновляем статус аренды
-                    cursor.execute('''
-                        UPDATE rentals 
-                        SET status = 'completed' 
-                        WHERE id = ?
-                    ''', (rental_id,))
-                    
-                    # Освобождаем аккаунт
-                    cursor.execute('''
+                # Обновляем статус всех истекших аренд одним запросом
+                cursor.execute('''
+                    UPDATE rentals 
+                    SET status = 'completed' 
+                    WHERE status = 'active' AND end_time < ?
+                ''', (now,))
+                
+                # Освобождаем аккаунты
+                account_ids = sorted({account_id for _, account_id, _, _, _ in expired_rentals})
+                for chunk in self._chunks(account_ids):
+                    placeholders = ','.join('?' * len(chunk))
+                    cursor.execute(f'''
                         UPDATE steam_accounts 
-                        SET is_rented = FALSE, current_renter_id = NULL,
+                        SET is_rented = ?, password_rotation_pending = ?, current_renter_id = NULL,
                             rental_start_time = NULL, rental_end_time = NULL
-                        WHERE id = ?
-                    ''', (account_id,))
-                    
-                    # Добавляем в историю операций
-                    cursor.execute('''
-                        INSERT INTO operation_history (user_id, operation_type, description)
-                        VALUES (?, ?, ?)
-                    ''', (renter_id, 'rental_end', f'Завершена аренда аккаунта #{account_id}'))
+                        WHERE id IN ({placeholders})
+                    ''', [hold_for_rotation, hold_for_rotation] + chunk)
                 
-                conn.commit()
-                return expired_count
+                # Добавляем в историю операций
+                cursor.executemany('''
+                    INSERT INTO operation_history (user_id, operation_type, description)
+                    VALUES (?, ?, ?)
+                ''', [
+                    (renter_id, 'rental_end', f'Завершена аренда аккаунта #{account_id}')
+                    for _, account_id, renter_id, _, _ in expired_rentals
+                ])
+                
+                # Доход по завершенным арендам в статистике игр
+                revenue_by_game: Dict[str, int] = {}
+                for _, _, _, game_name, duration_hours in expired_rentals:
+                    if game_name is not None:
+                        revenue_by_game[game_name] = revenue_by_game.get(game_name, 0) + (duration_hours or 0) * 50
+                cursor.executemany('''
+                    INSERT INTO statistics (game_name, total_revenue) VALUES (?, ?)
+                    ON CONFLICT (game_name) DO UPDATE SET
+                        total_revenue = total_revenue + excluded.total_revenue,
+                        last_updated = CURRENT_TIMESTAMP
+                ''', list(revenue_by_game.items()))
+            
+            # Возвращаем освобожденные аккаунты в индекс свободных
+            if not hold_for_rotation:
+                for _, account_id, _, game_name, _ in expired_rentals:
+                    if game_name is not None:
+                        self.inventory.add(account_id, game_name)
+            
+            return account_ids
                 
         except Exception as e:
             print(f"Ошибка завершения истекших аренд: {e}")
-            return 0
+            return []
+    
+    @staticmethod
+    def _chunks(items: List, size: int = 500):
+        """Разбиение списка на части (ограничение SQLite на число параметров)"""
+        for i in range(0, len(items), size):
+            yield items[i:i + size]
+    
+    def get_accounts_by_ids(self, account_ids: List[int]) -> List[Dict]:
+        """Получение аккаунтов по списку ID"""
+        accounts = []
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
+            for chunk in self._chunks(list(account_ids)):
+                placeholders = ','.join('?' * len(chunk))
+                cursor.execute(f'''
+                    SELECT id, username, password, game_name, is_rented, password_rotation_pending
+                    FROM steam_accounts
+                    WHERE id IN ({placeholders})
+                ''', chunk)
+                columns = [description[0] for description in cursor.description]
+                accounts.extend(dict(zip(columns, row)) for row in cursor.fetchall())
+        return accounts
+    
+    def _reserve_account(self, cursor, account_id: int, user_id: str, duration_hours: int) -> Optional[Tuple[int, datetime]]:
+        """
+        Атомарный захват аккаунта и создание записи об аренде.
+        Аккаунт занимается условным UPDATE, поэтому из нескольких потоков,
+        претендующих на один аккаунт, его получает только один.
+        Возвращает (rental_id, end_time) или None, если аккаунт уже занят.
+        """
+        start_time = datetime.now()
+        end_time = start_time + timedelta(hours=duration_hours)
+        
+        # Занимаем аккаунт, только если он все еще свободен
+        cursor.execute('''
+            UPDATE steam_accounts 
+            SET is_rented = TRUE, current_renter_id = ?, 
+                rental_start_time = ?, rental_end_time = ?
+            WHERE id = ? AND is_rented = FALSE
+        ''', (user_id, start_time, end_time, account_id))
+        
+        if cursor.rowcount != 1:
+            return None
+        
+        # Создаем запись об аренде
+        cursor.execute('''
+            INSERT INTO rentals (account_id, renter_id, start_time, end_time, duration_hours, status)
+            VALUES (?, ?, ?, ?, ?, 'active')
+        ''', (account_id, user_id, start_time, end_time, duration_hours))
+        rental_id = cursor.lastrowid
+        
+        # Учитываем аренду в статистике игры
+        cursor.execute('''
+            INSERT INTO statistics (game_name, total_rentals)
+            SELECT game_name, 1 FROM steam_accounts WHERE id = ?
+            ON CONFLICT (game_name) DO UPDATE SET
+                total_rentals = total_rentals + 1,
+                last_updated = CURRENT_TIMESTAMP
+        ''', (account_id,))
+        
+        # Добавляем в историю операций
+        cursor.execute('''
+            INSERT INTO operation_history (user_id, operation_type, description)
+            VALUES (?, ?, ?)
+        ''', (user_id, 'rental_start', f'Начата аренда аккаунта #{account_id} на {duration_hours} часов'))
+        
+        return rental_id, end_time
     
     def create_rental(self, account_id: int, user_id: str, duration_hours: int) -> bool:
         """Создание новой аренды"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.pool.connection() as conn:
                 cursor = conn.cursor()
-                
-                # Проверяем, доступен ли аккаунт
-                cursor.execute('''
-                    SELECT is_rented FROM steam_accounts WHERE id = ?
-                ''', (account_id,))
-                
-                result = cursor.fetchone()
-                if not result or result[0]:
-                    return False
-                
-                start_time = datetime.now()
-                end_time = start_time + datetime.timedelta(hours=duration_hours)
-                
-                # Обновляем статус аккаунта
-                cursor.execute('''
-                    UPDATE steam_accounts 
-                    SET is_rented = TRUE, current_renter_id = ?, 
-                        rental_start_time = ?, rental_end_time = ?
-                    WHERE id = ?
-                ''', (user_id, start_time, end_time, account_id))
-                
-                # Создаем запись об аренде
-                cursor.execute('''
-                    INSERT INTO rentals (account_id, renter_id, start_time, end_time, duration_hours, status)
-                    VALUES (?, ?, ?, ?, ?, 'active')
-                ''', (account_id, user_id, start_time, end_time, duration_hours))
-                
-                # Добавляем в историю операций
-                cursor.execute('''
-                    INSERT INTO operation_history (user_id, operation_type, description)
-                    VALUES (?, ?, ?)
-                ''', (user_id, 'rental_start', f'Начата аренда аккаунта #{account_id} на {duration_hours} часов'))
-                
-                conn.commit()
-                return True
+                reserved = self._reserve_account(cursor, account_id, user_id, duration_hours)
+            
+            if not reserved:
+                return False
+            
+            rental_id, end_time = reserved
+            self.inventory.discard(account_id)
+            self._notify_rental_deadline(rental_id, end_time)
+            return True
                 
         except Exception as e:
             print(f"Ошибка создания аренды: {e}")
             return False
     
+    def _load_inventory(self):
+        """Загрузка индекса свободных аккаунтов из базы"""
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT id, game_name FROM steam_accounts
+                WHERE is_rented = FALSE
+                ORDER BY id
+            ''')
+            self.inventory.load(cursor.fetchall())
+    
+    def claim_free_account(self, game_name: str, user_id: str, duration_hours: int) -> Optional[Dict]:
+        """
+        Выбор и захват свободного аккаунта для игры.
+        Кандидат берется из индекса свободных аккаунтов за O(1) и занимается
+        условным UPDATE; если индекс устарел, берется следующий кандидат.
+        Возвращает данные аккаунта с rental_id и end_time или None, если свободных нет.
+        """
+        if self.inventory.needs_reload():
+            self._load_inventory()
+        
+        while True:
+            account_id = self.inventory.pop(game_name)
+            if account_id is None:
+                return None
+            
+            try:
+                with self.pool.connection() as conn:
+                    cursor = conn.cursor()
+                    reserved = self._reserve_account(cursor, account_id, user_id, duration_hours)
+                    if not reserved:
+                        # Аккаунт занят в обход индекса, пробуем следующий
+                        continue
+                    
+                    cursor.execute('''
+                        SELECT id, username, password, game_name, price, description
+                        FROM steam_accounts
+                        WHERE id = ?
+                    ''', (account_id,))
+                    columns = [description[0] for description in cursor.description]
+                    account = dict(zip(columns, cursor.fetchone()))
+                    
+            except Exception as e:
+                # Транзакция откатилась, аккаунт остается свободным
+                self.inventory.add(account_id, game_name)
+                print(f"Ошибка захвата аккаунта для игры {game_name}: {e}")
+                return None
+            
+            account['rental_id'], account['end_time'] = reserved
+            self._notify_rental_deadline(account['rental_id'], account['end_time'])
+            return account
+    
+    def get_order_rental_account(self, order_id: str) -> Optional[Dict]:
+        """Аккаунт активной аренды, уже выданный по заказу (для повторной отправки)"""
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT sa.id, sa.username, sa.password, sa.game_name, sa.price, sa.description,
+                       r.id AS rental_id, r.end_time
+                FROM rentals r
+                JOIN steam_accounts sa ON sa.id = r.account_id
+                WHERE r.renter_id = ? AND r.status = 'active'
+                ORDER BY r.id DESC
+                LIMIT 1
+            ''', (order_id,))
+            row = cursor.fetchone()
+            if not row:
+                return None
+            columns = [description[0] for description in cursor.description]
+            return dict(zip(columns, row))
+    
+    def _get_unseen_items(self, items: List[Dict], mark_name: str, table: str, id_column: str) -> List[Dict]:
+        """
+        Новые элементы списка FunPay (от новых к старым).
+        Просмотр останавливается на последнем увиденном элементе или на первом
+        уже известном, поэтому каждый опрос обрабатывает только новые записи.
+        """
+        items = [item for item in items if item.get('id')]
+        if not items:
+            return []
+        
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT value FROM sync_state WHERE name = ?', (mark_name,))
+            row = cursor.fetchone()
+            if row and row[0] == items[0]['id']:
+                return []
+            
+            known = set()
+            item_ids = [item['id'] for item in items]
+            for chunk in self._chunks(item_ids):
+                placeholders = ','.join('?' * len(chunk))
+                cursor.execute(f'SELECT {id_column} FROM {table} WHERE {id_column} IN ({placeholders})', chunk)
+                known.update(item_id for item_id, in cursor.fetchall())
+        
+        unseen = []
+        for item in items:
+            if item['id'] in known:
+                break
+            unseen.append(item)
+        return unseen
+    
+    def _set_sync_mark(self, cursor, mark_name: str, value: str):
+        cursor.execute('''
+            INSERT INTO sync_state (name, value) VALUES (?, ?)
+            ON CONFLICT (name) DO UPDATE SET value = excluded.value, updated_at = CURRENT_TIMESTAMP
+        ''', (mark_name, value))
+    
+    def get_unseen_funpay_orders(self, orders: List[Dict]) -> List[Dict]:
+        """Заказы со страницы FunPay, появившиеся после последнего увиденного"""
+        return self._get_unseen_items(orders, 'funpay_orders_high_water', 'funpay_orders', 'order_id')
+    
+    def get_unseen_funpay_reviews(self, reviews: List[Dict]) -> List[Dict]:
+        """Отзывы со страницы FunPay, появившиеся после последнего обработанного"""
+        return self._get_unseen_items(reviews, 'funpay_reviews_high_water', 'funpay_reviews', 'review_id')
+    
+    def record_funpay_orders(self, orders: List[Dict]):
+        """
+        Запись увиденных заказов и отметки последнего заказа.
+        Заказы с определенной игрой ждут выдачи, остальные только запоминаются.
+        """
+        orders = [order for order in orders if order.get('id')]
+        if not orders:
+            return
+        
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
+            cursor.executemany('''
+                INSERT OR IGNORE INTO funpay_orders (order_id, title, status, game_name, duration, state)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', [
+                (order['id'], order.get('title'), order.get('status'), order.get('game_name'),
+                 order.get('duration', ''), 'new' if order.get('game_name') else 'ignored')
+                for order in orders
+            ])
+            self._set_sync_mark(cursor, 'funpay_orders_high_water', orders[0]['id'])
+    
+    def get_pending_funpay_orders(self, limit: int = 50) -> List[Dict]:
+        """Заказы, ожидающие выдачи аккаунта (новые и с неудачной попыткой)"""
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT order_id AS id, title, status, game_name, duration, state, attempts
+                FROM funpay_orders
+                WHERE state IN ('new', 'no_account', 'failed') AND attempts < ?
+                ORDER BY first_seen_at, order_id
+                LIMIT ?
+            ''', (Config.ORDER_MAX_ATTEMPTS, limit))
+            columns = [description[0] for description in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+    
+    def start_funpay_order(self, order_id: str) -> bool:
+        """
+        Захват заказа для обработки. Условный UPDATE гарантирует, что заказ
+        обрабатывает только один цикл; зависшая обработка берется повторно по таймауту.
+        """
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                UPDATE funpay_orders
+                SET state = 'processing', attempts = attempts + 1, updated_at = CURRENT_TIMESTAMP
+                WHERE order_id = ? AND attempts < ? AND (
+                    state IN ('new', 'no_account', 'failed')
+                    OR (state = 'processing' AND updated_at < datetime('now', ?))
+                )
+            ''', (order_id, Config.ORDER_MAX_ATTEMPTS, f'-{Config.ORDER_PROCESSING_TIMEOUT_MINUTES} minutes'))
+            return cursor.rowcount == 1
+    
+    def finish_funpay_order(self, order_id: str, state: str, rental_id: int = None):
+        """
+        Фиксация результата обработки заказа: delivered, no_account или failed.
+        Ожидание свободного аккаунта не расходует попытки: такой заказ ограничен
+        сроком ORDER_NO_ACCOUNT_TIMEOUT_HOURS (см. abandon_stale_funpay_orders).
+        """
+        with self.pool.connection() as conn:
+            conn.execute('''
+                UPDATE funpay_orders
+                SET state = ?, rental_id = COALESCE(?, rental_id), updated_at = CURRENT_TIMESTAMP,
+                    attempts = CASE WHEN ? = 'no_account' THEN MAX(attempts - 1, 0) ELSE attempts END,
+                    processed_at = CASE WHEN ? = 'delivered' THEN CURRENT_TIMESTAMP ELSE processed_at END
+                WHERE order_id = ?
+            ''', (state, rental_id, state, state, order_id))
+    
+    def abandon_stale_funpay_orders(self) -> List[Dict]:
+        """
+        Снятие с выдачи заказов, исчерпавших попытки или ждущих аккаунт дольше
+        ORDER_NO_ACCOUNT_TIMEOUT_HOURS. Возвращает снятые заказы для уведомления.
+        """
+        condition = '''
+            (state IN ('new', 'no_account', 'failed') AND attempts >= ?)
+            OR (state = 'no_account' AND first_seen_at < datetime('now', ?))
+        '''
+        params = (Config.ORDER_MAX_ATTEMPTS, f'-{Config.ORDER_NO_ACCOUNT_TIMEOUT_HOURS} hours')
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f'''
+                SELECT order_id AS id, title, game_name, state, attempts
+                FROM funpay_orders WHERE {condition}
+                ORDER BY first_seen_at, order_id
+            ''', params)
+            columns = [description[0] for description in cursor.description]
+            orders = [dict(zip(columns, row)) for row in cursor.fetchall()]
+            for chunk in self._chunks([order['id'] for order in orders]):
+                placeholders = ','.join('?' * len(chunk))
+                cursor.execute(f'''
+                    UPDATE funpay_orders SET state = 'abandoned', updated_at = CURRENT_TIMESTAMP
+                    WHERE order_id IN ({placeholders}) AND ({condition})
+                ''', (*chunk, *params))
+            return orders
+    
+    def get_rotation_pending_account_ids(self) -> List[int]:
+        """ID аккаунтов, ожидающих смены пароля после аренды"""
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT id FROM steam_accounts WHERE password_rotation_pending ORDER BY id
+            ''')
+            return [row[0] for row in cursor.fetchall()]
+    
+    def complete_password_rotation(self, account_id: int, new_password: str) -> bool:
+        """
+        Сохранение нового пароля и возврат аккаунта в свободные.
+        Пароль сохраняется в любом случае, так как Steam принимает уже только его;
+        возвращает False, если аккаунт при этом не ожидал смены пароля.
+        """
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                UPDATE steam_accounts SET password = ?, updated_at = datetime('now') WHERE id = ?
+            ''', (new_password, account_id))
+            cursor.execute('''
+                UPDATE steam_accounts
+                SET is_rented = FALSE, password_rotation_pending = FALSE
+                WHERE id = ? AND password_rotation_pending
+            ''', (account_id,))
+            if cursor.rowcount != 1:
+                return False
+            cursor.execute('SELECT game_name FROM steam_accounts WHERE id = ?', (account_id,))
+            game_name = cursor.fetchone()[0]
+        
+        self.inventory.add(account_id, game_name)
+        return True
+    
+    def get_active_rental_order_ids(self) -> List[str]:
+        """Заказы FunPay, по которым аренда сейчас активна"""
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT fo.order_id
+                FROM funpay_orders fo
+                JOIN rentals r ON r.id = fo.rental_id
+                WHERE r.status = 'active'
+                ORDER BY fo.order_id
+            ''')
+            return [row[0] for row in cursor.fetchall()]
+    
+    def create_message_campaign(self, name: str, message: str, order_ids: List[str]) -> int:
+        """Создание рассылки с получателями (повторы заказов отбрасываются)"""
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                INSERT INTO message_campaigns (name, message) VALUES (?, ?)
+            ''', (name, message))
+            campaign_id = cursor.lastrowid
+            cursor.executemany('''
+                INSERT OR IGNORE INTO message_campaign_recipients (campaign_id, order_id) VALUES (?, ?)
+            ''', [(campaign_id, order_id) for order_id in order_ids])
+            return campaign_id
+    
+    def get_message_campaign(self, campaign_id: int) -> Optional[Dict]:
+        """Рассылка по ID"""
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT id, name, message, status, created_at, finished_at
+                FROM message_campaigns WHERE id = ?
+            ''', (campaign_id,))
+            row = cursor.fetchone()
+            if not row:
+                return None
+            columns = [description[0] for description in cursor.description]
+            return dict(zip(columns, row))
+    
+    def get_unfinished_message_campaign_ids(self) -> List[int]:
+        """Рассылки, прерванные до завершения"""
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT id FROM message_campaigns WHERE status != 'completed' ORDER BY id
+            ''')
+            return [row[0] for row in cursor.fetchall()]
+    
+    def get_campaign_pending_recipients(self, campaign_id: int) -> List[Tuple[str, int]]:
+        """Получатели рассылки без результата: (заказ, число попыток)"""
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT order_id, attempts FROM message_campaign_recipients
+                WHERE campaign_id = ? AND state = 'pending'
+                ORDER BY order_id
+            ''', (campaign_id,))
+            return cursor.fetchall()
+    
+    def record_campaign_attempt(self, campaign_id: int, order_id: str, sent: bool,
+                                error: str = None, max_attempts: int = 1) -> str:
+        """
+        Фиксация попытки отправки получателю. Получатель остается в ожидании,
+        пока не исчерпаны попытки. Возвращает новое состояние: sent, pending или failed.
+        """
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                UPDATE message_campaign_recipients
+                SET attempts = attempts + 1,
+                    state = CASE WHEN ? THEN 'sent' WHEN attempts + 1 >= ? THEN 'failed' ELSE 'pending' END,
+                    last_error = ?,
+                    sent_at = CASE WHEN ? THEN CURRENT_TIMESTAMP END
+                WHERE campaign_id = ? AND order_id = ?
+            ''', (sent, max_attempts, None if sent else error, sent, campaign_id, order_id))
+            if cursor.rowcount != 1:
+                return 'failed'
+            cursor.execute('''
+                SELECT state FROM message_campaign_recipients WHERE campaign_id = ? AND order_id = ?
+            ''', (campaign_id, order_id))
+            return cursor.fetchone()[0]
+    
+    def set_message_campaign_status(self, campaign_id: int, status: str):
+        """Состояние рассылки: pending, running или completed"""
+        with self.pool.connection() as conn:
+            conn.execute('''
+                UPDATE message_campaigns
+                SET status = ?, finished_at = CASE WHEN ? = 'completed' THEN CURRENT_TIMESTAMP END
+                WHERE id = ?
+            ''', (status, status, campaign_id))
+    
+    def get_message_campaign_results(self, campaign_id: int) -> Dict[str, Dict]:
+        """Результат по каждому получателю рассылки: состояние, попытки и последняя ошибка"""
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT order_id, state, attempts, last_error FROM message_campaign_recipients
+                WHERE campaign_id = ?
+                ORDER BY order_id
+            ''', (campaign_id,))
+            return {
+                order_id: {'state': state, 'attempts': attempts, 'error': error}
+                for order_id, state, attempts, error in cursor.fetchall()
+            }
+    
+    def get_active_rental_ids(self, rental_ids: List[int]) -> List[int]:
+        """Аренды из списка, которые все еще активны"""
+        active = []
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
+            for chunk in self._chunks(list(rental_ids)):
+                placeholders = ','.join('?' * len(chunk))
+                cursor.execute(f'''
+                    SELECT id FROM rentals WHERE id IN ({placeholders}) AND status = 'active'
+                ''', chunk)
+                active.extend(row[0] for row in cursor.fetchall())
+        return sorted(active)
+    
+    def get_active_rental_deadlines(self) -> List[Tuple[int, str]]:
+        """Получение сроков окончания всех активных аренд"""
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT id, end_time FROM rentals WHERE status = 'active'
+            ''')
+            return cursor.fetchall()
+    
     def get_user_rentals(self, user_id: str) -> List[Dict]:
         """Получение аренд пользователя"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.pool.connection() as conn:
                 cursor = conn.cursor()
                 cursor.execute('''
                     SELECT r.id, r.account_id, sa.game_name, r.start_time, r.end_time, r.duration_hours, r.status
@@ -345,7 +804,7 @@ class Database:
     def add_bonus_time(self, user_id: str, bonus_minutes: int, reason: str) -> bool:
         """Добавление бонусного времени"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.pool.connection() as conn:
                 cursor = conn.cursor()
                 
                 # Добавляем бонус
@@ -368,7 +827,7 @@ class Database:
                     rental_id, current_end_time = result
                     
                     # Увеличиваем время аренды
-                    new_end_time = datetime.fromisoformat(current_end_time) + datetime.timedelta(minutes=bonus_minutes)
+                    new_end_time = datetime.fromisoformat(current_end_time) + timedelta(minutes=bonus_minutes)
                     
                     cursor.execute('''
                         UPDATE rentals 
@@ -384,16 +843,121 @@ class Database:
                     ''', (new_end_time, user_id))
                 
                 conn.commit()
-                return True
+            
+            if result:
+                self._notify_rental_deadline(rental_id, new_end_time)
+            return True
                 
         except Exception as e:
             print(f"Ошибка добавления бонусного времени: {e}")
             return False
     
+    def process_reviews_batch(self, reviews: List[Dict], bonus_minutes: int = 30, min_rating: int = 4) -> Dict:
+        """
+        Пакетная обработка новых отзывов в одной транзакции.
+        Арендаторы всех заказов находятся одним запросом (аренда оформляется
+        на ID заказа), бонусы и продления применяются групповыми запросами,
+        а обработанные отзывы запоминаются, чтобы не начислять бонус повторно.
+        Возвращает {'processed': N, 'bonuses': N, 'unmatched': [order_id, ...]}.
+        """
+        summary = {'processed': 0, 'bonuses': 0, 'unmatched': []}
+        reviews = [review for review in reviews if review.get('id')]
+        if not reviews:
+            return summary
+        newest_review_id = reviews[0]['id']
+        
+        extended = []
+        try:
+            with self.pool.connection() as conn:
+                cursor = conn.cursor()
+                if not conn.in_transaction:
+                    cursor.execute('BEGIN IMMEDIATE')
+                
+                # Отбрасываем уже обработанные отзывы
+                processed = set()
+                review_ids = [review['id'] for review in reviews]
+                for chunk in self._chunks(review_ids):
+                    placeholders = ','.join('?' * len(chunk))
+                    cursor.execute(f'SELECT review_id FROM funpay_reviews WHERE review_id IN ({placeholders})', chunk)
+                    processed.update(review_id for review_id, in cursor.fetchall())
+                reviews = [review for review in reviews if review['id'] not in processed]
+                if not reviews:
+                    return summary
+                
+                # Последняя аренда по каждому заказу
+                rentals = {}
+                order_ids = sorted({review.get('order_id') for review in reviews if review.get('order_id')})
+                for chunk in self._chunks(order_ids):
+                    placeholders = ','.join('?' * len(chunk))
+                    cursor.execute(f'''
+                        SELECT r.renter_id, r.id, r.account_id, r.end_time, r.status, sa.game_name
+                        FROM rentals r
+                        LEFT JOIN steam_accounts sa ON sa.id = r.account_id
+                        WHERE r.renter_id IN ({placeholders})
+                        ORDER BY r.id
+                    ''', chunk)
+                    for renter_id, rental_id, account_id, end_time, status, game_name in cursor.fetchall():
+                        rentals[renter_id] = (rental_id, account_id, end_time, status, game_name)
+                
+                bonuses = []
+                ratings = []
+                extensions: Dict[int, List] = {}
+                review_rows = []
+                for review in reviews:
+                    order_id = review.get('order_id')
+                    rental = rentals.get(order_id)
+                    granted = 0
+                    if rental is None:
+                        summary['unmatched'].append(order_id)
+                    else:
+                        rental_id, account_id, end_time, status, game_name = rental
+                        if game_name is not None:
+                            ratings.append((game_name, review['rating']))
+                        if review['rating'] >= min_rating:
+                            granted = bonus_minutes
+                            bonuses.append((order_id, bonus_minutes, 'Положительный отзыв'))
+                            if status == 'active':
+                                extensions.setdefault(rental_id, [account_id, end_time, 0])[2] += bonus_minutes
+                    review_rows.append((review['id'], order_id, review['rating'], order_id if rental else None, granted))
+                
+                cursor.executemany('''
+                    INSERT INTO bonuses (user_id, bonus_minutes, reason)
+                    VALUES (?, ?, ?)
+                ''', bonuses)
+                
+                # Продлеваем активные аренды на сумму бонусов
+                for rental_id, (account_id, end_time, minutes) in extensions.items():
+                    new_end_time = datetime.fromisoformat(end_time) + timedelta(minutes=minutes)
+                    extended.append((rental_id, account_id, new_end_time))
+                cursor.executemany('UPDATE rentals SET end_time = ? WHERE id = ?',
+                                   [(end_time, rental_id) for rental_id, _, end_time in extended])
+                cursor.executemany('UPDATE steam_accounts SET rental_end_time = ? WHERE id = ?',
+                                   [(end_time, account_id) for _, account_id, end_time in extended])
+                
+                # Оценки в статистике игр
+                self._record_game_ratings(cursor, ratings)
+                
+                cursor.executemany('''
+                    INSERT OR IGNORE INTO funpay_reviews (review_id, order_id, rating, renter_id, bonus_minutes)
+                    VALUES (?, ?, ?, ?, ?)
+                ''', review_rows)
+                self._set_sync_mark(cursor, 'funpay_reviews_high_water', newest_review_id)
+                
+                summary['processed'] = len(review_rows)
+                summary['bonuses'] = len(bonuses)
+            
+            for rental_id, _, end_time in extended:
+                self._notify_rental_deadline(rental_id, end_time)
+            return summary
+            
+        except Exception as e:
+            print(f"Ошибка пакетной обработки отзывов: {e}")
+            return {'processed': 0, 'bonuses': 0, 'unmatched': []}
+    
     def get_user_bonuses(self, user_id: str) -> List[Dict]:
         """Получение бонусов пользователя"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.pool.connection() as conn:
                 cursor = conn.cursor()
                 cursor.execute('''
                     SELECT bonus_minutes, reason, created_at, is_used
@@ -419,7 +983,7 @@ class Database:
     
     def get_accounts_count_by_game(self, game_name: str) -> int:
         """Получение количества доступных аккаунтов для конкретной игры"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.pool.connection() as conn:
             cursor = conn.cursor()
             cursor.execute('''
                 SELECT COUNT(*) FROM steam_accounts 
@@ -429,7 +993,7 @@ class Database:
     
     def get_all_games(self) -> List[str]:
         """Получение списка всех игр"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.pool.connection() as conn:
             cursor = conn.cursor()
             cursor.execute('''
                 SELECT DISTINCT game_name FROM steam_accounts
@@ -438,7 +1002,7 @@ class Database:
     
     def add_user(self, telegram_id: str, username: str = None, first_name: str = None, last_name: str = None):
         """Добавление нового пользователя"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.pool.connection() as conn:
             cursor = conn.cursor()
             cursor.execute('''
                 INSERT OR IGNORE INTO users (telegram_id, username, first_name, last_name)
@@ -450,7 +1014,7 @@ class Database:
     
     def get_total_bonus_time(self, user_id: str) -> int:
         """Получение общего количества бонусного времени пользователя"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.pool.connection() as conn:
             cursor = conn.cursor()
             cursor.execute('''
                 SELECT SUM(bonus_minutes) FROM bonuses 
@@ -462,7 +1026,7 @@ class Database:
     
     def add_notification(self, user_id: str, message: str, notification_type: str = "info"):
         """Добавление уведомления пользователю"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.pool.connection() as conn:
             cursor = conn.cursor()
             cursor.execute('''
                 INSERT INTO notifications (user_id, message, type)
@@ -472,7 +1036,7 @@ class Database:
     
     def get_user_notifications(self, user_id: str, unread_only: bool = True) -> List[Dict]:
         """Получение уведомлений пользователя"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.pool.connection() as conn:
             cursor = conn.cursor()
             if unread_only:
                 cursor.execute('''
@@ -493,7 +1057,7 @@ class Database:
     
     def mark_notification_read(self, notification_id: int):
         """Отметить уведомление как прочитанное"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.pool.connection() as conn:
             cursor = conn.cursor()
             cursor.execute('''
                 UPDATE notifications SET is_read = TRUE WHERE id = ?
@@ -502,7 +1066,7 @@ class Database:
     
     def get_operation_history(self, user_id: str, limit: int = 20) -> List[Dict]:
         """Получение истории операций пользователя"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.pool.connection() as conn:
             cursor = conn.cursor()
             cursor.execute('''
                 SELECT operation_type, description, created_at
@@ -517,30 +1081,30 @@ class Database:
     
     def get_statistics(self) -> Dict:
         """Получение общей статистики системы"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.pool.connection() as conn:
             cursor = conn.cursor()
             
-            # Общее количество аккаунтов
-            cursor.execute('SELECT COUNT(*) FROM steam_accounts')
-            total_accounts = cursor.fetchone()[0]
-            
-            # Активных аренд
-            cursor.execute('SELECT COUNT(*) FROM rentals WHERE status = "active"')
-            active_rentals = cursor.fetchone()[0]
-            
-            # Общее количество пользователей
-            cursor.execute('SELECT COUNT(*) FROM users')
-            total_users = cursor.fetchone()[0]
+            # Счетчики аккаунтов, активных аренд и пользователей одним запросом
+            cursor.execute('''
+                SELECT
+                    (SELECT COUNT(*) FROM steam_accounts),
+                    (SELECT COUNT(*) FROM rentals WHERE status = 'active'),
+                    (SELECT COUNT(*) FROM users)
+            ''')
+            total_accounts, active_rentals, total_users = cursor.fetchone()
             
-            # Популярные игры
+            # Популярные игры по числу аренд из накопленной статистики
             cursor.execute('''
-                SELECT game_name, COUNT(*) as count
-                FROM steam_accounts 
-                GROUP BY game_name 
-                ORDER BY count DESC 
+                SELECT game_name, total_rentals, total_revenue
+                FROM statistics 
+                WHERE total_rentals > 0
+                ORDER BY total_rentals DESC 
                 LIMIT 5
             ''')
-            popular_games = [{'game': row[0], 'count': row[1]} for row in cursor.fetchall()]
+            popular_games = [
+                {'game': row[0], 'count': row[1], 'revenue': row[2]}
+                for row in cursor.fetchall()
+            ]
             
             return {
                 'total_accounts': total_accounts,
@@ -549,9 +1113,55 @@ class Database:
                 'popular_games': popular_games
             }
     
+    def get_game_statistics(self) -> List[Dict]:
+        """Накопленная статистика по играм (одна строка на игру)"""
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT game_name, total_rentals, total_revenue, average_rating, total_reviews, last_updated
+                FROM statistics
+                ORDER BY total_rentals DESC, game_name
+            ''')
+            columns = [description[0] for description in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+    
+    @staticmethod
+    def _record_game_ratings(cursor, ratings: List[Tuple[str, int]]):
+        """Учет оценок (игра, оценка) в статистике игр; средняя пересчитывается инкрементально"""
+        cursor.executemany('''
+            INSERT INTO statistics (game_name, average_rating, total_reviews) VALUES (?, ?, 1)
+            ON CONFLICT (game_name) DO UPDATE SET
+                average_rating = (average_rating * total_reviews + excluded.average_rating) / (total_reviews + 1),
+                total_reviews = total_reviews + 1,
+                last_updated = CURRENT_TIMESTAMP
+        ''', ratings)
+    
+    def record_review(self, order_id: str, rating: int) -> bool:
+        """Учет оценки отзыва в статистике игры, арендованной по заказу"""
+        try:
+            with self.pool.connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute('''
+                    SELECT sa.game_name
+                    FROM rentals r
+                    JOIN steam_accounts sa ON sa.id = r.account_id
+                    WHERE r.renter_id = ?
+                    ORDER BY r.id DESC
+                    LIMIT 1
+                ''', (order_id,))
+                row = cursor.fetchone()
+                if not row:
+                    return False
+                self._record_game_ratings(cursor, [(row[0], rating)])
+                return True
+                
+        except Exception as e:
+            print(f"Ошибка учета отзыва в статистике: {e}")
+            return False
+    
     def get_user_statistics(self, user_id: str) -> Dict:
         """Получение статистики конкретного пользователя"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.pool.connection() as conn:
             cursor = conn.cursor()
             
             # Количество аренд
@@ -590,7 +1200,7 @@ class Database:
     
     def search_accounts(self, query: str) -> List[Dict]:
         """Поиск аккаунтов по названию игры"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.pool.connection() as conn:
             cursor = conn.cursor()
             cursor.execute('''
                 SELECT * FROM steam_accounts 
@@ -602,7 +1212,7 @@ class Database:
     
     def get_recent_activity(self, limit: int = 10) -> List[Dict]:
         """Получение последней активности в системе"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.pool.connection() as conn:
             cursor = conn.cursor()
             cursor.execute('''
                 SELECT user_id, operation_type, description, created_at
@@ -617,28 +1227,28 @@ class Database:
     # Методы для Telegram бота
     def get_total_accounts(self) -> int:
         """Получение общего количества аккаунтов"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.pool.connection() as conn:
             cursor = conn.cursor()
             cursor.execute('SELECT COUNT(*) FROM steam_accounts')
             return cursor.fetchone()[0]
     
     def get_available_accounts(self) -> int:
         """Получение количества доступных аккаунтов"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.pool.connection() as conn:
             cursor = conn.cursor()
             cursor.execute('SELECT COUNT(*) FROM steam_accounts WHERE is_rented = FALSE')
             return cursor.fetchone()[0]
     
     def get_active_rentals(self) -> int:
         """Получение количества активных аренд"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.pool.connection() as conn:
             cursor = conn.cursor()
             cursor.execute('SELECT COUNT(*) FROM rentals WHERE status = "active"')
             return cursor.fetchone()[0]
     
     def get_available_accounts_list(self) -> List[Dict]:
         """Получение списка доступных аккаунтов"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.pool.connection() as conn:
             cursor = conn.cursor()
             cursor.execute('''
                 SELECT id, username, game_name, created_at
@@ -658,9 +1268,69 @@ class Database:
             
             return accounts
     
+    def _fetch_keyset_page(self, select_sql: str, conditions: List[str], params: List,
+                           after_id: int, before_id: Optional[int], limit: int) -> Dict:
+        """
+        Чтение одной страницы по ключу id вместо OFFSET: WHERE id > ? ORDER BY id LIMIT ?.
+        Для перехода назад используется id < ? с обратной сортировкой.
+        Лишняя запись сверх limit показывает, есть ли следующая страница.
+        """
+        conditions = list(conditions)
+        params = list(params)
+        if before_id is not None:
+            conditions.append('id < ?')
+            params.append(before_id)
+            order = 'DESC'
+        else:
+            conditions.append('id > ?')
+            params.append(after_id or 0)
+            order = 'ASC'
+        
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                f'{select_sql} WHERE {" AND ".join(conditions)} ORDER BY id {order} LIMIT ?',
+                (*params, limit + 1)
+            )
+            columns = [description[0] for description in cursor.description]
+            items = [dict(zip(columns, row)) for row in cursor.fetchall()]
+        
+        has_more = len(items) > limit
+        items = items[:limit]
+        if before_id is not None:
+            items.reverse()
+            return {'items': items, 'has_prev': has_more, 'has_next': True}
+        return {'items': items, 'has_prev': bool(after_id), 'has_next': has_more}
+    
+    def get_accounts_page(self, after_id: int = 0, before_id: int = None, limit: int = 10,
+                          available_only: bool = False) -> Dict:
+        """
+        Страница аккаунтов, упорядоченных по ID.
+        Возвращает {'items': [...], 'has_prev': bool, 'has_next': bool}
+        """
+        conditions = ['is_rented = FALSE'] if available_only else []
+        page = self._fetch_keyset_page(
+            'SELECT id, username, game_name, is_rented, created_at, price, description FROM steam_accounts',
+            conditions, [], after_id, before_id, limit
+        )
+        for account in page['items']:
+            account['price'] = account['price'] or 50
+            account['description'] = account['description'] or f"Аккаунт для игры {account['game_name']}"
+        return page
+    
+    def get_active_rentals_page(self, after_id: int = 0, before_id: int = None, limit: int = 10) -> Dict:
+        """
+        Страница активных аренд, упорядоченных по ID.
+        Возвращает {'items': [...], 'has_prev': bool, 'has_next': bool}
+        """
+        return self._fetch_keyset_page(
+            'SELECT id, account_id, renter_id AS user_id, start_time, end_time FROM rentals',
+            ["status = 'active'"], [], after_id, before_id, limit
+        )
+    
     def get_user_rentals(self, user_id: str) -> List[Dict]:
         """Получение аренд пользователя"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.pool.connection() as conn:
             cursor = conn.cursor()
             cursor.execute('''
                 SELECT r.id, r.account_id, r.start_time, r.end_time, r.duration_hours, r.status,
@@ -676,7 +1346,7 @@ class Database:
     
     def get_total_users(self) -> int:
         """Получение общего количества пользователей"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.pool.connection() as conn:
             cursor = conn.cursor()
             cursor.execute('SELECT COUNT(*) FROM users')
             return cursor.fetchone()[0]
@@ -684,7 +1354,7 @@ class Database:
     def get_account(self, account_id: int) -> Optional[Dict]:
         """Получение аккаунта по ID"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.pool.connection() as conn:
                 cursor = conn.cursor()
                 cursor.execute('''
                     SELECT id, username, password, game_name, is_rented, created_at, price, description
@@ -711,52 +1381,50 @@ class Database:
     def get_detailed_stats(self) -> Dict:
         """Получение детальной статистики для админа"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.pool.connection() as conn:
                 cursor = conn.cursor()
                 
-                # Общая статистика аккаунтов
-                cursor.execute('SELECT COUNT(*) FROM steam_accounts')
-                total_accounts = cursor.fetchone()[0]
-                
-                cursor.execute('SELECT COUNT(*) FROM steam_accounts WHERE is_rented = FALSE')
-                available_accounts = cursor.fetchone()[0]
-                
-                cursor.execute('SELECT COUNT(*) FROM steam_accounts WHERE is_rented = TRUE')
-                rented_accounts = cursor.fetchone()[0]
-                
-                # Статистика аренд
-                cursor.execute('SELECT COUNT(*) FROM rentals WHERE status = "active" AND end_time > datetime("now")')
-                active_rentals = cursor.fetchone()[0]
-                
-                cursor.execute('SELECT COUNT(*) FROM rentals WHERE DATE(end_time) = DATE("now") AND status = "completed"')
-                completed_today = cursor.fetchone()[0]
-                
-                # Общий доход (примерный расчет)
-                cursor.execute('SELECT SUM(duration_hours * 50) FROM rentals WHERE status = "completed"')
-                total_revenue = cursor.fetchone()[0] or 0
-                
-                # Статистика пользователей
-                cursor.execute('SELECT COUNT(*) FROM users')
-                total_users = cursor.fetchone()[0]
-                
-                cursor.execute('SELECT COUNT(DISTINCT renter_id) FROM rentals WHERE DATE(start_time) = DATE("now")')
-                active_users_today = cursor.fetchone()[0]
-                
-                cursor.execute('SELECT COUNT(*) FROM users WHERE DATE(created_at) = DATE("now")')
-                new_users_today = cursor.fetchone()[0]
+                # Один проход по каждой таблице; вместо DATE(column) = DATE('now')
+                # используются диапазоны по времени, которые работают с индексами
+                cursor.execute('''
+                    WITH period AS (
+                        SELECT datetime('now') AS now,
+                               date('now') AS day_start,
+                               date('now', '+1 day') AS day_end
+                    ),
+                    accounts AS (
+                        SELECT COUNT(*) AS total_accounts,
+                               COALESCE(SUM(is_rented = FALSE), 0) AS available_accounts,
+                               COALESCE(SUM(is_rented = TRUE), 0) AS rented_accounts
+                        FROM steam_accounts
+                    ),
+                    rental_stats AS (
+                        SELECT COALESCE(SUM(r.status = 'active' AND r.end_time > p.now), 0) AS active_rentals,
+                               COALESCE(SUM(r.status = 'completed'
+                                            AND r.end_time >= p.day_start AND r.end_time < p.day_end), 0) AS completed_today,
+                               COUNT(DISTINCT CASE WHEN r.start_time >= p.day_start AND r.start_time < p.day_end
+                                                   THEN r.renter_id END) AS active_users_today
+                        FROM rentals r, period p
+                    ),
+                    revenue AS (
+                        SELECT COALESCE(SUM(total_revenue), 0) AS total_revenue
+                        FROM statistics
+                    ),
+                    user_stats AS (
+                        SELECT COUNT(*) AS total_users,
+                               COALESCE(SUM(u.created_at >= p.day_start AND u.created_at < p.day_end), 0) AS new_users_today
+                        FROM users u, period p
+                    )
+                    SELECT total_accounts, available_accounts, rented_accounts,
+                           active_rentals, completed_today, total_revenue,
+                           total_users, active_users_today, new_users_today
+                    FROM accounts, rental_stats, revenue, user_stats
+                ''')
                 
-                return {
-                    'total_accounts': total_accounts,
-                    'available_accounts': available_accounts,
-                    'rented_accounts': rented_accounts,
-                    'blocked_accounts': 0,  # Пока не реализовано
-                    'active_rentals': active_rentals,
-                    'completed_today': completed_today,
-                    'total_revenue': total_revenue,
-                    'total_users': total_users,
-                    'active_users_today': active_users_today,
-                    'new_users_today': new_users_today
-                }
+                columns = [description[0] for description in cursor.description]
+                stats = dict(zip(columns, cursor.fetchone()))
+                stats['blocked_accounts'] = 0  # Пока не реализовано
+                return stats
                 
         except Exception as e:
             print(f"Ошибка получения детальной статистики: {e}")
@@ -773,10 +1441,27 @@ class Database:
                 'new_users_today': 0
             }
     
+    def get_stats_snapshot(self, max_age: float = None) -> Dict:
+        """
+        Кэшированный снимок детальной статистики.
+        Общий для всех экземпляров Database процесса (бот, система, веб-сервер),
+        пересчитывается не чаще одного раза в max_age секунд.
+        """
+        max_age = Config.STATS_CACHE_SECONDS if max_age is None else max_age
+        
+        with Database._stats_lock:
+            cached = Database._stats_cache.get(self.db_path)
+            if cached and time.monotonic() - cached[0] < max_age:
+                return dict(cached[1])
+            
+            stats = self.get_detailed_stats()
+            Database._stats_cache[self.db_path] = (time.monotonic(), stats)
+            return dict(stats)
+    
     def get_users_list(self) -> List[Dict]:
         """Получение списка пользователей для админа"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.pool.connection() as conn:
                 cursor = conn.cursor()
                 cursor.execute('''
                     SELECT u.telegram_id, u.created_at, COUNT(r.id) as rentals_count
@@ -803,7 +1488,7 @@ class Database:
     def delete_account(self, account_id: int) -> bool:
         """Удаление аккаунта"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.pool.connection() as conn:
                 cursor = conn.cursor()
                 
                 # Проверяем, что аккаунт существует
@@ -824,7 +1509,9 @@ class Database:
                 cursor.execute('DELETE FROM rentals WHERE account_id = ?', (account_id,))
                 
                 conn.commit()
-                return True
+            
+            self.inventory.discard(account_id)
+            return True
                 
         except Exception as e:
             print(f"Ошибка удаления аккаунта: {e}")
@@ -833,7 +1520,7 @@ class Database:
     def get_all_accounts(self) -> List[Dict]:
         """Получение всех аккаунтов для админа"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.pool.connection() as conn:
                 cursor = conn.cursor()
                 cursor.execute('''
                     SELECT id, username, game_name, is_rented, created_at, price, description
@@ -862,7 +1549,7 @@ class Database:
     def add_account(self, username: str, password: str, game_name: str, price: float, description: str = "") -> bool:
         """Добавление нового аккаунта"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.pool.connection() as conn:
                 cursor = conn.cursor()
                 
                 # Проверяем, что аккаунт с таким логином не существует
@@ -877,16 +1564,83 @@ class Database:
                 ''', (username, password, game_name, price, description))
                 
                 conn.commit()
-                return True
+            
+            self.inventory.add(cursor.lastrowid, game_name)
+            self._note_game(game_name)
+            return True
                 
         except Exception as e:
             print(f"Ошибка добавления аккаунта: {e}")
             return False
     
+    def _note_game(self, game_name: str):
+        """Новая игра в каталоге сразу становится доступна классификатору заказов"""
+        if not self.game_classifier.has_game(game_name):
+            self.game_classifier.invalidate()
+    
+    def _load_game_classifier(self):
+        """Загрузка псевдонимов игр: реестр и названия игр из каталога аккаунтов"""
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT DISTINCT game_name, game_name FROM steam_accounts
+                UNION ALL
+                SELECT alias, game_name FROM game_aliases
+            ''')
+            self.game_classifier.load(cursor.fetchall())
+    
+    def classify_game(self, title: str) -> Optional[str]:
+        """Определение игры по названию заказа"""
+        if self.game_classifier.needs_reload():
+            self._load_game_classifier()
+        return self.game_classifier.classify(title)
+    
+    def get_game_aliases(self) -> Dict[str, str]:
+        """Реестр псевдонимов игр: псевдоним -> игра"""
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT alias, game_name FROM game_aliases ORDER BY game_name, alias')
+            return dict(cursor.fetchall())
+    
+    def add_game_alias(self, alias: str, game_name: str) -> bool:
+        """Добавление или изменение псевдонима игры"""
+        alias = normalize_alias(alias)
+        if not alias or not game_name:
+            return False
+        try:
+            with self.pool.connection() as conn:
+                conn.execute('''
+                    INSERT INTO game_aliases (alias, game_name) VALUES (?, ?)
+                    ON CONFLICT (alias) DO UPDATE SET game_name = excluded.game_name
+                ''', (alias, game_name))
+            
+            self.game_classifier.invalidate()
+            return True
+            
+        except Exception as e:
+            print(f"Ошибка добавления псевдонима игры: {e}")
+            return False
+    
+    def remove_game_alias(self, alias: str) -> bool:
+        """Удаление псевдонима игры"""
+        try:
+            with self.pool.connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute('DELETE FROM game_aliases WHERE alias = ?', (normalize_alias(alias),))
+                removed = cursor.rowcount > 0
+            
+            if removed:
+                self.game_classifier.invalidate()
+            return removed
+            
+        except Exception as e:
+            print(f"Ошибка удаления псевдонима игры: {e}")
+            return False
+    
     def save_token(self, token_type: str, token_value: str) -> bool:
         """Сохранение токена в базу данных"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.pool.connection() as conn:
                 cursor = conn.cursor()
                 
                 # Создаем таблицу токенов, если её нет
@@ -916,7 +1670,7 @@ class Database:
     def get_token(self, token_type: str) -> Optional[str]:
         """Получение токена из базы данных"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.pool.connection() as conn:
                 cursor = conn.cursor()
                 
                 # Создаем таблицу токенов, если её нет
@@ -942,7 +1696,7 @@ class Database:
     def delete_token(self, token_type: str) -> bool:
         """Удаление токена из базы данных"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.pool.connection() as conn:
                 cursor = conn.cursor()
                 cursor.execute('DELETE FROM api_tokens WHERE token_type = ?', (token_type,))
                 conn.commit()
@@ -955,7 +1709,7 @@ class Database:
     def get_all_tokens(self) -> Dict[str, str]:
         """Получение всех токенов"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.pool.connection() as conn:
                 cursor = conn.cursor()
                 
                 # Создаем таблицу токенов, если её нет
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+💾 Резервное копирование базы данных
+Онлайн-копия через backup API SQLite порциями страниц, сжатие и ротация копий
+"""
+
+import os
+import gzip
+import time
+import shutil
+import sqlite3
+import logging
+from datetime import datetime
+from typing import Dict, List
+from config import Config
+
+class BackupRestartLimit(Exception):
+    """Копирование слишком часто начиналось заново из-за записи в базу"""
+
+class DatabaseBackup:
+    """
+    Копия базы без остановки бота: backup API переносит по pages страниц за шаг
+    и делает паузу между шагами, поэтому блокировка базы никогда не бывает долгой.
+    Запись из других соединений перезапускает копирование; если это происходит
+    слишком часто, остаток копируется одним шагом — в режиме WAL это только
+    транзакция чтения, и запись заказов продолжается.
+    """
+
+    PREFIX = 'steam_rental_backup_'
+    SUFFIX = '.db.gz'
+
+    def __init__(self, db_path: str, backup_dir: str = None, generations: int = None,
+                 pages: int = None, sleep: float = None, max_restarts: int = None):
+        self.db_path = db_path
+        self.backup_dir = backup_dir or Config.BACKUP_DIR
+        self.generations = max(generations or Config.BACKUP_GENERATIONS, 1)
+        self.pages = pages or Config.BACKUP_PAGES_PER_STEP
+        self.sleep = Config.BACKUP_STEP_SLEEP if sleep is None else sleep
+        self.max_restarts = Config.BACKUP_MAX_RESTARTS if max_restarts is None else max_restarts
+        self.logger = logging.getLogger(__name__)
+
+    def create(self) -> Dict:
+        """Создание, проверка, сжатие копии и удаление старых поколений"""
+        os.makedirs(self.backup_dir, exist_ok=True)
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+        path = os.path.join(self.backup_dir, f"{self.PREFIX}{timestamp}{self.SUFFIX}")
+        raw_path = path[:-len('.gz')] + '.tmp'
+        started = time.monotonic()
+
+        try:
+            steps, restarts = self._copy(raw_path)
+
+            # Проверяется именно тот файл, который будет сжат
+            integrity = self._integrity_check(raw_path)
+            if integrity != 'ok':
+                raise sqlite3.DatabaseError(f"integrity_check: {integrity}")
+
+            with open(raw_path, 'rb') as src, gzip.open(path + '.part', 'wb', compresslevel=6) as dst:
+                shutil.copyfileobj(src, dst, 1024 * 1024)
+            os.replace(path + '.part', path)
+            raw_size = os.path.getsize(raw_path)
+        finally:
+            for leftover in (raw_path, path + '.part'):
+                if os.path.exists(leftover):
+                    os.remove(leftover)
+
+        removed = self.rotate()
+        result = {
+            'path': path,
+            'size': os.path.getsize(path),
+            'raw_size': raw_size,
+            'steps': steps,
+            'restarts': restarts,
+            'seconds': round(time.monotonic() - started, 3),
+            'removed': removed,
+        }
+        self.logger.info(f"💾 Резервная копия {path}: {result['size']} байт, шагов {steps}")
+        return result
+
+    def _copy(self, target_path: str):
+        """Постраничное копирование в файл, возвращает (шаги, перезапуски)"""
+        steps = 0
+        restarts = 0
+        last_remaining = None
+
+        def progress(status, remaining, total):
+            nonlocal steps, restarts, last_remaining
+            steps += 1
+            if last_remaining is not None and remaining > last_remaining:
+                restarts += 1
+                if restarts > self.max_restarts:
+                    raise BackupRestartLimit()
+            last_remaining = remaining
+
+        source = sqlite3.connect(self.db_path, timeout=Config.DATABASE_BUSY_TIMEOUT / 1000)
+        target = sqlite3.connect(target_path)
+        try:
+            try:
+                source.backup(target, pages=self.pages, progress=progress, sleep=self.sleep)
+            except BackupRestartLimit:
+                self.logger.warning(f"⚠️ Копирование перезапускалось {restarts} раз, копируем одним шагом")
+                source.backup(target)
+                steps += 1
+        finally:
+            target.close()
+            source.close()
+        return steps, restarts
+
+    @staticmethod
+    def _integrity_check(path: str) -> str:
+        conn = sqlite3.connect(path)
+        try:
+            rows = conn.execute('PRAGMA integrity_check').fetchall()
+            return '; '.join(row[0] for row in rows)
+        finally:
+            conn.close()
+
+    def list_backups(self) -> List[str]:
+        """Готовые копии, от новых к старым"""
+        if not os.path.isdir(self.backup_dir):
+            return []
+        names = [
+            name for name in os.listdir(self.backup_dir)
+            if name.startswith(self.PREFIX) and name.endswith(self.SUFFIX)
+        ]
+        return [os.path.join(self.backup_dir, name) for name in sorted(names, reverse=True)]
+
+    def rotate(self) -> List[str]:
+        """Удаление копий сверх заданного числа поколений"""
+        removed = self.list_backups()[self.generations:]
+        for path in removed:
+            os.remove(path)
+        return removed
+
+    @staticmethod
+    def restore(backup_path: str, db_path: str):
+        """Распаковка копии в файл базы (при остановленной системе)"""
+        with gzip.open(backup_path, 'rb') as src, open(db_path, 'wb') as dst:
+            shutil.copyfileobj(src, dst, 1024 * 1024)
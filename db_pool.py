@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🗄️ Пул долгоживущих соединений SQLite
+Одно настроенное соединение на поток, общее для Database, AccountManager и SettingsManager
+"""
+
+import sqlite3
+import threading
+import logging
+from contextlib import contextmanager
+from typing import Dict, List, Tuple
+from config import Config
+
+class ConnectionPool:
+    """Пул соединений SQLite: по одному постоянному соединению на поток"""
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self.logger = logging.getLogger(__name__)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections: List[Tuple[threading.Thread, sqlite3.Connection]] = []
+
+    def _create_connection(self) -> sqlite3.Connection:
+        """Создание и однократная настройка соединения"""
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=Config.DATABASE_BUSY_TIMEOUT / 1000,
+            check_same_thread=False
+        )
+        cursor = conn.cursor()
+        cursor.execute('PRAGMA journal_mode=WAL')
+        cursor.execute('PRAGMA synchronous=NORMAL')
+        cursor.execute(f'PRAGMA busy_timeout={int(Config.DATABASE_BUSY_TIMEOUT)}')
+        cursor.execute(f'PRAGMA cache_size=-{int(Config.DATABASE_CACHE_SIZE_KB)}')
+        cursor.execute('PRAGMA temp_store=MEMORY')
+        cursor.close()
+
+        with self._lock:
+            # Соединения завершившихся потоков больше никто не использует
+            alive = []
+            for thread, old_conn in self._connections:
+                if thread.is_alive():
+                    alive.append((thread, old_conn))
+                else:
+                    old_conn.close()
+            alive.append((threading.current_thread(), conn))
+            self._connections = alive
+
+        self.logger.debug(f"Открыто соединение с {self.db_path} для потока {threading.current_thread().name}")
+        return conn
+
+    def get_connection(self) -> sqlite3.Connection:
+        """Получение соединения текущего потока"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._create_connection()
+            self._local.conn = conn
+            self._local.depth = 0
+        return conn
+
+    @contextmanager
+    def connection(self):
+        """
+        Контекстный менеджер с семантикой `with sqlite3.connect(...) as conn`:
+        фиксирует транзакцию при успешном выходе и откатывает при исключении.
+        Вложенные блоки одного потока используют то же соединение, а фиксацию
+        выполняет только внешний блок. Между задачами asyncio соединение не
+        делится посреди транзакции, так как блок выполняется без await.
+        """
+        conn = self.get_connection()
+        self._local.depth += 1
+        try:
+            yield conn
+        except BaseException:
+            if self._local.depth == 1:
+                conn.rollback()
+            raise
+        else:
+            if self._local.depth == 1:
+                conn.commit()
+        finally:
+            self._local.depth -= 1
+
+    def close_all(self):
+        """Закрытие всех соединений пула"""
+        with self._lock:
+            for _, conn in self._connections:
+                try:
+                    conn.close()
+                except Exception as e:
+                    self.logger.error(f"Ошибка закрытия соединения: {e}")
+            self._connections = []
+        # Соединения других потоков уже закрыты, поэтому сбрасываем только свою ссылку
+        self._local = threading.local()
+
+
+_pools: Dict[str, ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+def get_pool(db_path: str) -> ConnectionPool:
+    """Получение общего пула для файла базы данных"""
+    with _pools_lock:
+        pool = _pools.get(db_path)
+        if pool is None:
+            pool = ConnectionPool(db_path)
+            _pools[db_path] = pool
+        return pool
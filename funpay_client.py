@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🌐 Асинхронный HTTP клиент FunPay
+Общий пул keep-alive соединений, ограничение параллельных запросов к одному хосту
+и частоты запросов, кэш страниц с условными запросами
+"""
+
+import time
+import asyncio
+import hashlib
+import logging
+import threading
+from typing import Any, Callable, Coroutine, Dict, List, Optional
+import httpx
+from config import Config
+from rate_limiter import TokenBucket, get_funpay_limiter
+
+class AsyncFunPayClient:
+    """
+    Клиент на httpx.AsyncClient с собственным циклом событий в фоновом потоке.
+    Цикл и пул соединений живут между вызовами планировщика, поэтому соединения
+    переиспользуются, а синхронный код вызывает корутины через run().
+    """
+
+    def __init__(self, headers: Dict[str, str] = None, cookies=None,
+                 max_connections: int = None, max_per_host: int = None, timeout: float = None,
+                 page_cache_seconds: float = None, rate_limiter: TokenBucket = None):
+        self.headers = dict(headers or {})
+        self.cookies = cookies  # общий CookieJar с requests.Session после входа
+        self.max_connections = max_connections or Config.FUNPAY_MAX_CONNECTIONS
+        self.max_per_host = max_per_host or Config.FUNPAY_MAX_CONNECTIONS_PER_HOST
+        self.timeout = timeout or Config.FUNPAY_REQUEST_TIMEOUT
+        self.page_cache_seconds = (Config.FUNPAY_PAGE_CACHE_SECONDS
+                                   if page_cache_seconds is None else page_cache_seconds)
+        self.rate_limiter = rate_limiter or get_funpay_limiter()
+        self.logger = logging.getLogger(__name__)
+
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        # Создаются и используются только в потоке цикла
+        self._client: Optional[httpx.AsyncClient] = None
+        self._host_limits: Dict[str, asyncio.Semaphore] = {}
+        self._pages: Dict[str, Dict] = {}
+        self._page_requests: Dict[str, asyncio.Future] = {}
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        """Запуск цикла событий клиента при первом обращении"""
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(target=loop.run_forever, name="funpay-http", daemon=True)
+                thread.start()
+                self._loop, self._thread = loop, thread
+            return self._loop
+
+    def run(self, coro: Coroutine) -> Any:
+        """Выполнение корутины в цикле клиента из синхронного кода (не из самого цикла)"""
+        loop = self._ensure_loop()
+        return asyncio.run_coroutine_threadsafe(coro, loop).result()
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                headers=self.headers,
+                cookies=self.cookies,
+                timeout=self.timeout,
+                follow_redirects=True,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                ),
+            )
+        return self._client
+
+    def _host_limit(self, url: str) -> asyncio.Semaphore:
+        host = httpx.URL(url).host
+        semaphore = self._host_limits.get(host)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.max_per_host)
+            self._host_limits[host] = semaphore
+        return semaphore
+
+    async def request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        """HTTP запрос с ограничением частоты и числа одновременных запросов к хосту"""
+        await self.rate_limiter.acquire_async()
+        async with self._host_limit(url):
+            return await self._get_client().request(method, url, **kwargs)
+
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request('GET', url, **kwargs)
+
+    async def post(self, url: str, data: Dict = None, **kwargs) -> httpx.Response:
+        return await self.request('POST', url, data=data, **kwargs)
+
+    async def fetch_page(self, url: str, parse: Callable[[bytes], List[Dict]],
+                         max_age: float = None) -> Optional[List[Dict]]:
+        """
+        Загрузка и разбор страницы со списком с кэшем по URL.
+        Свежий результат отдается без запроса, одновременные запросы одной страницы
+        объединяются, иначе отправляется условный GET, а разбор пропускается,
+        если тело не изменилось. Возвращает копию элементов или None при ошибке.
+        max_age переопределяет срок свежести кэша (0 — всегда условный GET).
+        """
+        max_age = self.page_cache_seconds if max_age is None else max_age
+        page = self._pages.get(url)
+        if page and time.monotonic() - page['fetched_at'] < max_age:
+            return [dict(item) for item in page['items']]
+
+        pending = self._page_requests.get(url)
+        if pending is None:
+            pending = asyncio.ensure_future(self._refresh_page(url, parse))
+            self._page_requests[url] = pending
+            pending.add_done_callback(lambda _: self._page_requests.pop(url, None))
+
+        items = await asyncio.shield(pending)
+        return None if items is None else [dict(item) for item in items]
+
+    async def _refresh_page(self, url: str, parse: Callable[[bytes], List[Dict]]) -> Optional[List[Dict]]:
+        page = self._pages.get(url)
+        headers = {}
+        if page and page['etag']:
+            headers['If-None-Match'] = page['etag']
+        if page and page['last_modified']:
+            headers['If-Modified-Since'] = page['last_modified']
+
+        response = await self.get(url, headers=headers)
+        if response.status_code == 304 and page:
+            self.logger.debug(f"Страница не изменилась (304): {url}")
+            page['fetched_at'] = time.monotonic()
+            return page['items']
+        if response.status_code != 200:
+            self.logger.error(f"❌ Ошибка загрузки страницы {url}: {response.status_code}")
+            return None
+
+        body_hash = hashlib.sha256(response.content).hexdigest()
+        if page and page['body_hash'] == body_hash:
+            self.logger.debug(f"Содержимое страницы не изменилось: {url}")
+            items = page['items']
+        else:
+            # Разбор HTML не должен задерживать другие запросы в цикле
+            items = await asyncio.to_thread(parse, response.content)
+
+        self._pages[url] = {
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'body_hash': body_hash,
+            'items': items,
+            'fetched_at': time.monotonic(),
+        }
+        return items
+
+    def close(self):
+        """Закрытие пула соединений и остановка цикла"""
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop = self._thread = None
+        if loop is None:
+            return
+
+        try:
+            if self._client is not None:
+                asyncio.run_coroutine_threadsafe(self._client.aclose(), loop).result()
+        except Exception as e:
+            self.logger.error(f"❌ Ошибка закрытия HTTP клиента: {e}")
+        finally:
+            self._client = None
+            self._host_limits = {}
+            self._page_requests = {}
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join(timeout=5)
+            loop.close()
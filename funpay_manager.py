@@ -1,16 +1,24 @@
 import time
 import random
-import requests
+import asyncio
 from bs4 import BeautifulSoup
 from config import Config
+from database import Database
+from funpay_client import AsyncFunPayClient
+from rate_limiter import RateLimitedSession, get_funpay_limiter
+import funpay_parser
 import logging
+from typing import Optional
 
 class FunPayManager:
-    def __init__(self):
+    def __init__(self, db: Database = None):
+        self.db = db or Database()
         self.base_url = Config.FUNPAY_BASE_URL
         self.login = Config.FUNPAY_LOGIN
         self.password = Config.FUNPAY_PASSWORD
-        self.session = requests.Session()
+        # Все запросы к FunPay делят одну корзину токенов
+        self.limiter = get_funpay_limiter()
+        self.session = RateLimitedSession(self.limiter)
         self.is_logged_in = False
         
         # Настройка логирования
@@ -25,6 +33,10 @@ class FunPayManager:
             'Connection': 'keep-alive',
             'Upgrade-Insecure-Requests': '1',
         })
+        
+        # Асинхронный клиент для параллельных запросов (cookies общие с сессией)
+        self.client = AsyncFunPayClient(headers=dict(self.session.headers), cookies=self.session.cookies,
+                                        rate_limiter=self.limiter)
     
     def login_to_funpay(self):
         """Вход в аккаунт FunPay через API"""
@@ -82,40 +94,30 @@ class FunPayManager:
             self.logger.error(f"❌ Ошибка при входе в FunPay: {e}")
             return False
     
-    def get_orders(self):
-        """Получение списка заказов"""
+    def _ensure_logged_in(self) -> bool:
+        """Вход в FunPay, если сессия еще не авторизована"""
+        return self.is_logged_in or self.login_to_funpay()
+    
+    def _parse_orders(self, content: bytes) -> list:
+        """Разбор страницы заказов"""
+        return funpay_parser.parse_orders(content)
+    
+    def _parse_reviews(self, content: bytes) -> list:
+        """Разбор страницы отзывов"""
+        return funpay_parser.parse_reviews(content)
+    
+    async def get_orders_async(self, max_age: float = None):
+        """Получение списка заказов (асинхронно)"""
         try:
-            if not self.is_logged_in:
-                if not self.login_to_funpay():
-                    return []
-            
             self.logger.info("📋 Получение списка заказов...")
             
-            response = self.session.get(f"{self.base_url}/account/orders")
-            if response.status_code != 200:
-                self.logger.error(f"❌ Ошибка получения заказов: {response.status_code}")
+            # Неизменившаяся страница не скачивается и не разбирается повторно
+            orders = await self.client.fetch_page(
+                f"{self.base_url}/account/orders", self._parse_orders, max_age=max_age
+            )
+            if orders is None:
                 return []
             
-            soup = BeautifulSoup(response.content, 'html.parser')
-            orders = []
-            
-            # Парсим заказы
-            order_elements = soup.find_all('div', {'class': 'order-item'})
-            
-            for order_elem in order_elements:
-                try:
-                    order = {
-                        'id': order_elem.get('data-order-id', ''),
-                        'title': order_elem.find('div', {'class': 'order-title'}).text.strip(),
-                        'status': order_elem.find('div', {'class': 'order-status'}).text.strip(),
-                        'price': order_elem.find('div', {'class': 'order-price'}).text.strip(),
-                        'date': order_elem.find('div', {'class': 'order-date'}).text.strip()
-                    }
-                    orders.append(order)
-                except Exception as e:
-                    self.logger.warning(f"⚠️ Ошибка парсинга заказа: {e}")
-                    continue
-            
             self.logger.info(f"✅ Получено {len(orders)} заказов")
             return orders
             
@@ -123,40 +125,21 @@ class FunPayManager:
             self.logger.error(f"❌ Ошибка получения заказов: {e}")
             return []
     
-    def get_reviews(self):
-        """Получение списка отзывов"""
+    def get_orders(self, max_age: float = None):
+        """Получение списка заказов"""
+        if not self._ensure_logged_in():
+            return []
+        return self.client.run(self.get_orders_async(max_age))
+    
+    async def get_reviews_async(self):
+        """Получение списка отзывов (асинхронно)"""
         try:
-            if not self.is_logged_in:
-                if not self.login_to_funpay():
-                    return []
-            
             self.logger.info("⭐ Получение списка отзывов...")
             
-            response = self.session.get(f"{self.base_url}/account/reviews")
-            if response.status_code != 200:
-                self.logger.error(f"❌ Ошибка получения отзывов: {response.status_code}")
+            reviews = await self.client.fetch_page(f"{self.base_url}/account/reviews", self._parse_reviews)
+            if reviews is None:
                 return []
             
-            soup = BeautifulSoup(response.content, 'html.parser')
-            reviews = []
-            
-            # Парсим отзывы
-            review_elements = soup.find_all('div', {'class': 'review-item'})
-            
-            for review_elem in review_elements:
-                try:
-                    review = {
-                        'id': review_elem.get('data-review-id', ''),
-                        'order_id': review_elem.get('data-order-id', ''),
-                        'rating': int(review_elem.find('div', {'class': 'rating'}).get('data-rating', 0)),
-                        'comment': review_elem.find('div', {'class': 'comment'}).text.strip(),
-                        'date': review_elem.find('div', {'class': 'review-date'}).text.strip()
-                    }
-                    reviews.append(review)
-                except Exception as e:
-                    self.logger.warning(f"⚠️ Ошибка парсинга отзыва: {e}")
-                    continue
-            
             self.logger.info(f"✅ Получено {len(reviews)} отзывов")
             return reviews
             
@@ -164,62 +147,81 @@ class FunPayManager:
             self.logger.error(f"❌ Ошибка получения отзывов: {e}")
             return []
     
-    def send_message(self, order_id: str, message: str) -> bool:
-        """Отправка сообщения в чат заказа"""
+    def get_reviews(self):
+        """Получение списка отзывов"""
+        if not self._ensure_logged_in():
+            return []
+        return self.client.run(self.get_reviews_async())
+    
+    async def fetch_orders_and_reviews_async(self):
+        """Параллельная загрузка страниц заказов и отзывов"""
+        orders, reviews = await asyncio.gather(self.get_orders_async(), self.get_reviews_async())
+        return orders, reviews
+    
+    def fetch_orders_and_reviews(self):
+        """Загрузка заказов и отзывов одновременно: (orders, reviews)"""
+        if not self._ensure_logged_in():
+            return [], []
+        return self.client.run(self.fetch_orders_and_reviews_async())
+    
+    async def _submit_order_form(self, page_url: str, order_id: str, message: str) -> bool:
+        """Отправка сообщения через форму на странице заказа или чата"""
+        response = await self.client.get(page_url)
+        if response.status_code != 200:
+            self.logger.error(f"❌ Ошибка получения страницы заказа: {response.status_code}")
+            return False
+        
+        soup = BeautifulSoup(response.content, 'html.parser')
+        
+        # Ищем форму отправки сообщения
+        form = soup.find('form', {'action': lambda x: x and 'send' in x})
+        if not form:
+            self.logger.error("❌ Форма отправки сообщения не найдена")
+            return False
+        
+        # Получаем CSRF токен
+        csrf_token = None
+        csrf_input = form.find('input', {'name': '_token'})
+        if csrf_input:
+            csrf_token = csrf_input.get('value')
+        
+        # Данные для отправки
+        send_data = {
+            'message': message,
+            'order_id': order_id
+        }
+        
+        if csrf_token:
+            send_data['_token'] = csrf_token
+        
+        # Отправляем сообщение (action формы может быть относительным)
+        response = await self.client.post(str(response.url.join(form.get('action'))), data=send_data)
+        
+        if response.status_code == 200:
+            return True
+        self.logger.error(f"❌ Ошибка отправки сообщения: {response.status_code}")
+        return False
+    
+    async def send_message_async(self, order_id: str, message: str) -> bool:
+        """Отправка сообщения в чат заказа (асинхронно)"""
         try:
-            if not self.is_logged_in:
-                if not self.login_to_funpay():
-                    return False
-            
             self.logger.info(f"📤 Отправка сообщения для заказа {order_id}")
             
-            # Получаем страницу чата заказа
-            response = self.session.get(f"{self.base_url}/account/orders/{order_id}/chat")
-            if response.status_code != 200:
-                self.logger.error(f"❌ Ошибка получения чата: {response.status_code}")
-                return False
-            
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # Ищем форму отправки сообщения
-            form = soup.find('form', {'action': lambda x: x and 'send' in x})
-            if not form:
-                self.logger.error("❌ Форма отправки сообщения не найдена")
-                return False
-            
-            # Получаем CSRF токен
-            csrf_token = None
-            csrf_input = form.find('input', {'name': '_token'})
-            if csrf_input:
-                csrf_token = csrf_input.get('value')
-            
-            # Данные для отправки
-            send_data = {
-                'message': message,
-                'order_id': order_id
-            }
-            
-            if csrf_token:
-                send_data['_token'] = csrf_token
-            
-            # Отправляем сообщение
-            response = self.session.post(
-                form.get('action'),
-                data=send_data,
-                allow_redirects=True
-            )
-            
-            if response.status_code == 200:
+            if await self._submit_order_form(f"{self.base_url}/account/orders/{order_id}/chat", order_id, message):
                 self.logger.info(f"✅ Сообщение отправлено для заказа {order_id}")
                 return True
-            else:
-                self.logger.error(f"❌ Ошибка отправки сообщения: {response.status_code}")
-                return False
+            return False
                 
         except Exception as e:
             self.logger.error(f"❌ Ошибка отправки сообщения: {e}")
             return False
     
+    def send_message(self, order_id: str, message: str) -> bool:
+        """Отправка сообщения в чат заказа"""
+        if not self._ensure_logged_in():
+            return False
+        return self.client.run(self.send_message_async(order_id, message))
+    
     def update_listing(self, listing_id: str, data: dict) -> bool:
         """Обновление объявления на FunPay"""
         try:
@@ -323,11 +325,8 @@ class FunPayManager:
         try:
             self.logger.info("🔄 Синхронизация с FunPay...")
             
-            # Получаем заказы
-            orders = self.get_orders()
-            
-            # Получаем отзывы
-            reviews = self.get_reviews()
+            # Заказы и отзывы загружаются параллельно
+            orders, reviews = self.fetch_orders_and_reviews()
             
             self.logger.info(f"✅ Синхронизация завершена. Заказов: {len(orders)}, отзывов: {len(reviews)}")
             
@@ -349,11 +348,23 @@ class FunPayManager:
     def close(self):
         """Закрытие сессии"""
         try:
+            self.client.close()
             self.session.close()
             self.logger.info("🔒 Сессия FunPay закрыта")
         except Exception as e:
             self.logger.error(f"❌ Ошибка закрытия сессии: {e}")
     
+    def filter_new_orders(self, orders: list) -> list:
+        """Отбор заказов, ожидающих выдачи, с определением игры"""
+        new_orders = []
+        for order in orders:
+            if order.get('status', '').lower() in ['new', 'pending', 'новый', 'в обработке']:
+                game_name = self.extract_game_from_order(order)
+                if game_name:
+                    order['game_name'] = game_name
+                    new_orders.append(order)
+        return new_orders
+    
     def check_new_orders(self):
         """Проверка новых заказов"""
         try:
@@ -362,97 +373,26 @@ class FunPayManager:
                     return []
             self.logger.info("🆕 Проверка новых заказов...")
             orders = self.get_orders()
-            new_orders = []
-            for order in orders:
-                if order.get('status', '').lower() in ['new', 'pending', 'новый', 'в обработке']:
-                    game_name = self.extract_game_from_order(order)
-                    if game_name:
-                        order['game_name'] = game_name
-                        new_orders.append(order)
+            new_orders = self.filter_new_orders(orders)
             self.logger.info(f"✅ Найдено {len(new_orders)} новых заказов")
             return new_orders
         except Exception as e:
             self.logger.error(f"❌ Ошибка проверки новых заказов: {e}")
             return []
     
-    def extract_game_from_order(self, order: dict) -> str:
-        """Извлечение названия игры из заказа"""
+    def extract_game_from_order(self, order: dict) -> Optional[str]:
+        """Извлечение названия игры из заказа; None, если игра не определена"""
         try:
-            title = order.get('title', '').lower()
-            game_mapping = {
-                'cs2': 'Counter-Strike 2', 'cs:go': 'Counter-Strike 2', 'counter-strike': 'Counter-Strike 2',
-                'dota': 'Dota 2', 'dota 2': 'Dota 2', 'pubg': 'PUBG', 'playerunknown': 'PUBG',
-                'valorant': 'Valorant', 'lol': 'League of Legends', 'league of legends': 'League of Legends',
-                'fortnite': 'Fortnite', 'minecraft': 'Minecraft', 'gta': 'GTA V', 'grand theft auto': 'GTA V',
-                'fifa': 'FIFA 24', 'cod': 'Call of Duty', 'call of duty': 'Call of Duty',
-                'overwatch': 'Overwatch', 'apex': 'Apex Legends', 'apex legends': 'Apex Legends'
-            }
-            for keyword, game_name in game_mapping.items():
-                if keyword in title:
-                    self.logger.info(f"🎮 Определена игра: {game_name} из заказа '{order.get('title', '')}'")
-                    return game_name
+            # Псевдонимы игр хранятся в базе (game_aliases) и перечитываются при изменении
+            game_name = self.db.classify_game(order.get('title', ''))
+            if game_name:
+                self.logger.info(f"🎮 Определена игра: {game_name} из заказа '{order.get('title', '')}'")
+                return game_name
             self.logger.warning(f"⚠️ Не удалось определить игру из заказа: {order.get('title', '')}")
-            return 'Unknown Game'
+            return None
         except Exception as e:
             self.logger.error(f"❌ Ошибка извлечения игры из заказа: {e}")
-            return 'Unknown Game'
-    
-    def process_order(self, order_id: str, account_data: dict) -> bool:
-        """Обработка заказа - отправка данных аккаунта"""
-        try:
-            self.logger.info(f"📤 Отправка данных аккаунта для заказа {order_id}")
-            response = self.session.get(f"{self.base_url}/account/orders/{order_id}")
-            if response.status_code != 200:
-                self.logger.error(f"❌ Ошибка получения страницы заказа: {response.status_code}")
-                return False
-            soup = BeautifulSoup(response.content, 'html.parser')
-            form = soup.find('form', {'action': lambda x: x and 'send' in x})
-            if not form:
-                self.logger.error("❌ Форма отправки данных не найдена")
-                return False
-            csrf_token = None
-            csrf_input = form.find('input', {'name': '_token'})
-            if csrf_input:
-                csrf_token = csrf_input.get('value')
-            message = f"""
-🎮 Данные аккаунта для игры {account_data['game_name']}
-
-👤 Логин: {account_data['username']}
-🔑 Пароль: {account_data['password']}
-⏰ Время аренды: {account_data['duration']} часов
-🕐 Начало: {account_data['start_time']}
-
-📋 Инструкции:
-1. Войдите в Steam
-2. Введите логин и пароль
-3. При запросе Steam Guard код будет отправлен отдельно
-4. Не меняйте пароль от аккаунта
-5. Используйте аккаунт только для игр
-
-⭐ Оставьте отзыв 5 звезд для получения +30 минут бонусного времени!
-
-🆘 При проблемах обращайтесь в поддержку.
-            """.strip()
-            send_data = {
-                'message': message,
-                'order_id': order_id
-            }
-            if csrf_token:
-                send_data['_token'] = csrf_token
-            response = self.session.post(
-                form.get('action'),
-                data=send_data,
-                allow_redirects=True
-            )
-            if response.status_code == 200:
-                self.logger.info(f"✅ Данные аккаунта отправлены для заказа {order_id}")
-                return True
-            else:
-                self.logger.error(f"❌ Ошибка отправки данных: {response.status_code}")
-                return False
-        except Exception as e:
-            self.logger.error(f"❌ Ошибка обработки заказа {order_id}: {e}")
-            return False
+            return None
     
     def check_reviews(self):
         """Проверка новых отзывов"""
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🧩 Разбор страниц заказов и отзывов FunPay
+Быстрый разбор на lxml с заранее скомпилированными XPath выражениями
+"""
+
+import logging
+from typing import Callable, Dict, List, Optional, Union
+from bs4 import BeautifulSoup, SoupStrainer
+from lxml import etree, html
+
+logger = logging.getLogger(__name__)
+
+# Разбор через lxml; 'bs4' — прежний разбор BeautifulSoup для сверки
+DEFAULT_BACKEND = 'lxml'
+
+def _has_class(name: str) -> str:
+    """XPath условие на наличие класса в списке классов элемента"""
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+_ORDER_ITEMS = etree.XPath(f"//div[{_has_class('order-item')}]")
+_REVIEW_ITEMS = etree.XPath(f"//div[{_has_class('review-item')}]")
+_FIELDS = {
+    name: etree.XPath(f".//div[{_has_class(name)}][1]")
+    for name in ('order-title', 'order-status', 'order-price', 'order-date', 'rating', 'comment', 'review-date')
+}
+
+def _class_filter(name: str) -> Callable[[Optional[str]], bool]:
+    # При разборе SoupStrainer сравнивает атрибут class целой строкой, а не по классам
+    return lambda value: bool(value) and name in value.split()
+
+# Для BeautifulSoup строится дерево только из элементов списка
+_ORDER_STRAINER = SoupStrainer('div', attrs={'class': _class_filter('order-item')})
+_REVIEW_STRAINER = SoupStrainer('div', attrs={'class': _class_filter('review-item')})
+
+def _parse_tree(content: Union[bytes, str]) -> Optional[etree._Element]:
+    if isinstance(content, bytes):
+        content = content.decode('utf-8', errors='replace')
+    if not content.strip():
+        return None
+    return html.document_fromstring(content)
+
+def _field(item: etree._Element, name: str) -> etree._Element:
+    """Первый вложенный div с классом; как и find() в BeautifulSoup, отсутствие — ошибка элемента"""
+    found = _FIELDS[name](item)
+    if not found:
+        raise AttributeError(f"нет элемента {name}")
+    return found[0]
+
+def _text(item: etree._Element, name: str) -> str:
+    return _field(item, name).text_content().strip()
+
+def _parse_items(items: List, parse_item: Callable, kind: str) -> List[Dict]:
+    result = []
+    for item in items:
+        try:
+            result.append(parse_item(item))
+        except Exception as e:
+            logger.warning(f"⚠️ Ошибка парсинга {kind}: {e}")
+    return result
+
+def _order_lxml(item: etree._Element) -> Dict:
+    return {
+        'id': item.get('data-order-id', ''),
+        'title': _text(item, 'order-title'),
+        'status': _text(item, 'order-status'),
+        'price': _text(item, 'order-price'),
+        'date': _text(item, 'order-date')
+    }
+
+def _review_lxml(item: etree._Element) -> Dict:
+    return {
+        'id': item.get('data-review-id', ''),
+        'order_id': item.get('data-order-id', ''),
+        'rating': int(_field(item, 'rating').get('data-rating', 0)),
+        'comment': _text(item, 'comment'),
+        'date': _text(item, 'review-date')
+    }
+
+def _order_bs4(order_elem) -> Dict:
+    return {
+        'id': order_elem.get('data-order-id', ''),
+        'title': order_elem.find('div', {'class': 'order-title'}).text.strip(),
+        'status': order_elem.find('div', {'class': 'order-status'}).text.strip(),
+        'price': order_elem.find('div', {'class': 'order-price'}).text.strip(),
+        'date': order_elem.find('div', {'class': 'order-date'}).text.strip()
+    }
+
+def _review_bs4(review_elem) -> Dict:
+    return {
+        'id': review_elem.get('data-review-id', ''),
+        'order_id': review_elem.get('data-order-id', ''),
+        'rating': int(review_elem.find('div', {'class': 'rating'}).get('data-rating', 0)),
+        'comment': review_elem.find('div', {'class': 'comment'}).text.strip(),
+        'date': review_elem.find('div', {'class': 'review-date'}).text.strip()
+    }
+
+def parse_orders(content: Union[bytes, str], backend: str = None) -> List[Dict]:
+    """Разбор страницы заказов в список словарей id/title/status/price/date"""
+    if (backend or DEFAULT_BACKEND) == 'bs4':
+        soup = BeautifulSoup(content, 'html.parser', parse_only=_ORDER_STRAINER)
+        return _parse_items(soup.find_all('div', {'class': 'order-item'}), _order_bs4, 'заказа')
+
+    tree = _parse_tree(content)
+    if tree is None:
+        return []
+    return _parse_items(_ORDER_ITEMS(tree), _order_lxml, 'заказа')
+
+def parse_reviews(content: Union[bytes, str], backend: str = None) -> List[Dict]:
+    """Разбор страницы отзывов в список словарей id/order_id/rating/comment/date"""
+    if (backend or DEFAULT_BACKEND) == 'bs4':
+        soup = BeautifulSoup(content, 'html.parser', parse_only=_REVIEW_STRAINER)
+        return _parse_items(soup.find_all('div', {'class': 'review-item'}), _review_bs4, 'отзыва')
+
+    tree = _parse_tree(content)
+    if tree is None:
+        return []
+    return _parse_items(_REVIEW_ITEMS(tree), _review_lxml, 'отзыва')
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🎯 Определение игры по названию заказа
+Все псевдонимы игр собираются в одно регулярное выражение с границами слов
+"""
+
+import re
+import time
+import threading
+import logging
+from typing import Dict, Iterable, Optional, Pattern, Tuple
+from config import Config
+
+def normalize_alias(alias: str) -> str:
+    """Приведение псевдонима к виду ключа: нижний регистр, одиночные пробелы"""
+    return ' '.join(alias.lower().split())
+
+def _trie_regex(aliases: Iterable[str]) -> str:
+    """
+    Выражение в виде префиксного дерева: общие префиксы псевдонимов проверяются
+    один раз, а жадные необязательные хвосты дают самое длинное совпадение в позиции.
+    Каждая ветка начинается с литерала, поэтому re ищет кандидатов по набору первых
+    символов; граница слова слева проверяется уже после первого символа.
+    """
+    root: Dict = {}
+    for alias in aliases:
+        node = root
+        for char in alias:
+            node = node.setdefault(char, {})
+        node[''] = {}
+
+    def build(node: Dict) -> str:
+        branches = [
+            (r'\s+' if char == ' ' else re.escape(char)) + build(child)
+            for char, child in sorted(node.items()) if char
+        ]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        return f'(?:{body})?' if '' in node else body
+
+    return '|'.join(
+        re.escape(char) + r'(?<!\w.)' + build(child)
+        for char, child in sorted(root.items())
+    )
+
+class GameClassifier:
+    """
+    Кэш псевдонимов игр процесса, скомпилированный в одно выражение.
+    Псевдонимы совпадают только целыми словами ('lol' не найдется в 'lollipop'),
+    а при нескольких совпадениях выбирается самое длинное ('call of duty' важнее 'cod').
+    """
+
+    def __init__(self, db_path: str, reload_seconds: int = None):
+        self.db_path = db_path
+        self.reload_seconds = reload_seconds or Config.GAME_ALIASES_RELOAD_SECONDS
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._pattern: Optional[Pattern] = None
+        self._games: Dict[str, str] = {}
+        self._loaded_at: Optional[float] = None
+
+    def load(self, aliases: Iterable[Tuple[str, str]]):
+        """Компиляция выражения из пар (псевдоним, игра)"""
+        games: Dict[str, str] = {}
+        for alias, game_name in aliases:
+            key = normalize_alias(alias)
+            if key:
+                games[key] = game_name
+
+        pattern = None
+        if games:
+            # Псевдонимы хранятся в нижнем регистре, название заказа приводится к нему же
+            pattern = re.compile(rf'(?:{_trie_regex(games)})(?!\w)')
+
+        with self._lock:
+            self._pattern = pattern
+            self._games = games
+            self._loaded_at = time.monotonic()
+        self.logger.debug(f"Псевдонимы игр загружены: {len(games)}")
+
+    def needs_reload(self) -> bool:
+        """Нужна ли перезагрузка псевдонимов из базы"""
+        with self._lock:
+            return self._loaded_at is None or time.monotonic() - self._loaded_at > self.reload_seconds
+
+    def invalidate(self):
+        """Пометить псевдонимы устаревшими"""
+        with self._lock:
+            self._loaded_at = None
+
+    def has_game(self, game_name: str) -> bool:
+        """Известна ли игра классификатору"""
+        with self._lock:
+            return game_name in self._games.values()
+
+    def classify(self, title: str) -> Optional[str]:
+        """Игра по названию заказа или None"""
+        with self._lock:
+            pattern, games = self._pattern, self._games
+        if pattern is None or not title:
+            return None
+
+        best = None
+        for match in pattern.finditer(title.lower()):
+            if best is None or len(match.group()) > len(best.group()):
+                best = match
+        return games[normalize_alias(best.group())] if best else None
+
+
+_classifiers: Dict[str, GameClassifier] = {}
+_classifiers_lock = threading.Lock()
+
+def get_game_classifier(db_path: str) -> GameClassifier:
+    """Получение общего классификатора для файла базы данных"""
+    with _classifiers_lock:
+        classifier = _classifiers.get(db_path)
+        if classifier is None:
+            classifier = GameClassifier(db_path)
+            _classifiers[db_path] = classifier
+        return classifier
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🧵 Исполнитель периодических задач
+Каждая задача выполняется в своем потоке, не дольше одного экземпляра одновременно
+"""
+
+import time
+import bisect
+import threading
+import logging
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import Callable, Dict, Optional
+from config import Config
+
+# Верхние границы корзин гистограммы длительности, секунды
+DURATION_BUCKETS = (0.1, 0.5, 1, 5, 15, 60, 300, 900)
+
+class Job:
+    """Задача со своим потоком, счетчиками и гистограммой длительности"""
+
+    def __init__(self, name: str, func: Callable, timeout: float):
+        self.name = name
+        self.func = func
+        self.timeout = timeout
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"job-{name}")
+        self.future: Optional[Future] = None
+        self.started_at: Optional[float] = None
+        self.timed_out = False
+        self.stats = {'runs': 0, 'skipped': 0, 'errors': 0, 'timeouts': 0, 'last_seconds': None}
+        self.histogram = [0] * (len(DURATION_BUCKETS) + 1)
+
+    def observe(self, seconds: float):
+        self.stats['last_seconds'] = round(seconds, 3)
+        self.histogram[bisect.bisect_left(DURATION_BUCKETS, seconds)] += 1
+
+    def snapshot(self) -> Dict:
+        labels = [f'<={bound}s' for bound in DURATION_BUCKETS] + [f'>{DURATION_BUCKETS[-1]}s']
+        return {
+            **self.stats,
+            'running': self.future is not None and not self.future.done(),
+            'histogram': dict(zip(labels, self.histogram)),
+        }
+
+class JobExecutor:
+    """
+    Запуск задач планировщика вне основного цикла. Задачи не ждут друг друга:
+    медленная синхронизация с FunPay не задерживает резервное копирование.
+    Запуск, пока предыдущий еще идет, пропускается, а не ставится в очередь.
+    Поток Python нельзя прервать, поэтому превышение таймаута фиксируется
+    в журнале и метриках, а новый запуск пропускается до завершения текущего.
+    """
+
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+        self._jobs: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+
+    def job(self, name: str, func: Callable, timeout: float = None) -> Callable[[], Optional[Future]]:
+        """Регистрация задачи; возвращает функцию запуска для schedule"""
+        with self._lock:
+            self._jobs[name] = Job(name, func, timeout or Config.JOB_TIMEOUT_SECONDS)
+        return lambda: self.submit(name)
+
+    def submit(self, name: str) -> Optional[Future]:
+        """Запуск задачи, если она не выполняется; None, если запуск пропущен"""
+        with self._lock:
+            job = self._jobs[name]
+            if job.future is not None and not job.future.done():
+                job.stats['skipped'] += 1
+                self.logger.warning(f"⚠️ Задача {name} еще выполняется, запуск пропущен")
+                return None
+            job.started_at = time.monotonic()
+            job.timed_out = False
+            job.future = job.executor.submit(self._run, job)
+            return job.future
+
+    def _run(self, job: Job):
+        started = time.monotonic()
+        try:
+            return job.func()
+        except Exception as e:
+            with self._lock:
+                job.stats['errors'] += 1
+            self.logger.error(f"❌ Ошибка задачи {job.name}: {e}")
+        finally:
+            with self._lock:
+                job.stats['runs'] += 1
+                job.observe(time.monotonic() - started)
+
+    def check_timeouts(self):
+        """Отметка задач, выполняющихся дольше таймаута"""
+        now = time.monotonic()
+        with self._lock:
+            for job in self._jobs.values():
+                running = job.future is not None and not job.future.done()
+                if running and not job.timed_out and now - job.started_at > job.timeout:
+                    job.timed_out = True
+                    job.stats['timeouts'] += 1
+                    self.logger.error(f"⏱️ Задача {job.name} выполняется дольше {job.timeout:.0f}с")
+
+    def shutdown(self, wait: bool = False):
+        """Остановка потоков задач"""
+        with self._lock:
+            jobs = list(self._jobs.values())
+        for job in jobs:
+            job.executor.shutdown(wait=wait)
+
+    def get_metrics(self) -> Dict:
+        """Метрики всех задач"""
+        with self._lock:
+            return {name: job.snapshot() for name, job in self._jobs.items()}
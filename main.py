@@ -23,6 +23,16 @@ app = Flask(__name__)
 # Глобальные переменные для бота и системы
 bot = None
 system = None
+db = None
+
+def get_db():
+    """Общий экземпляр базы данных для веб-сервера"""
+    global db
+    if db is None:
+        # Импортируем здесь, чтобы избежать ошибок при деплое
+        from database import Database
+        db = Database()
+    return db
 
 @app.route('/')
 def home():
@@ -46,9 +56,18 @@ def health():
 @app.route('/status')
 def status():
     """Статус системы"""
+    try:
+        # Тот же кэшированный снимок, что и в боте
+        stats = get_db().get_stats_snapshot()
+    except Exception as e:
+        logger.error(f"Ошибка получения статистики: {e}")
+        stats = {}
+    
     return jsonify({
         "status": "running",
-        "message": "Steam Rental System готов к работе"
+        "message": "Steam Rental System готов к работе",
+        "stats": stats,
+        "metrics": system.get_metrics() if system else {}
     })
 
 def start_bot():
@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+📝 Шаблоны сообщений покупателям FunPay
+Общий шаг подстановки для отправки по HTTP и через браузер
+"""
+
+from typing import Dict
+
+MESSAGE_TEMPLATES: Dict[str, str] = {
+    "account_data": """🎮 Данные аккаунта для игры {game_name}
+
+👤 Логин: {username}
+🔑 Пароль: {password}
+⏰ Время аренды: {duration} часов
+🕐 Начало: {start_time}
+
+📋 Инструкции:
+1. Войдите в Steam
+2. Введите логин и пароль
+3. При запросе Steam Guard код будет отправлен отдельно
+4. Не меняйте пароль от аккаунта
+5. Используйте аккаунт только для игр
+
+⭐ Оставьте отзыв 5 звезд для получения +30 минут бонусного времени!
+
+🆘 При проблемах обращайтесь в поддержку.""",
+
+    "listing_description": """🎮 **Аренда Steam аккаунта | {game_name}**
+
+✅ **Что вы получаете:**
+• Полный доступ к Steam аккаунту
+• Игра {game_name} уже установлена
+• Возможность играть в любое время
+• Мгновенная доставка после оплаты
+
+💰 **Стоимость:** {price_per_hour}₽/час
+
+⏰ **Как работает аренда:**
+1. Оплачиваете нужное количество часов
+2. Получаете данные для входа мгновенно
+3. Играете в течение оплаченного времени
+4. По истечении времени доступ автоматически закрывается
+
+🔐 **Безопасность:**
+• Аккаунт проверен и работает стабильно
+• Пароль меняется после каждой аренды
+• Гарантия возврата средств при проблемах
+
+📱 **Поддержка:**
+• Telegram бот для управления арендой
+• Проверка оставшегося времени
+• Техническая поддержка 24/7
+
+🎁 **Бонус за отзыв:**
+• Оставьте отзыв на FunPay
+• Получите +30 минут бонусного времени
+• Бонус применяется к текущей аренде
+
+⚠️ **Важно:**
+• Не меняйте пароль от аккаунта
+• Не добавляйте друзей
+• Не используйте читы
+• Соблюдайте правила Steam
+
+🚀 **Начните играть прямо сейчас!**
+Оплачивайте и получайте доступ к {game_name} в течение 1 минуты!""",
+
+    "steam_guard_instructions": """Здравствуйте! Я бот-помощник Steam Rental System.
+
+🎮 Ваш аккаунт Steam готов к использованию!
+
+📱 **Steam Guard Mobile App:**
+1. Скачайте приложение Steam Guard в App Store или Google Play
+2. Войдите в аккаунт Steam
+3. В настройках включите Steam Guard Mobile
+4. При входе в Steam введите код из приложения
+
+💻 **Steam Guard для ПК:**
+1. Откройте Steam
+2. Перейдите в Настройки → Безопасность
+3. Включите Steam Guard
+4. Следуйте инструкциям по настройке
+
+🔑 **Данные для входа:**
+Логин: {login}
+Пароль: {password}
+Email: {email}
+
+⏰ **Время аренды:** {rental_time}
+
+❓ **Нужна помощь?** Напишите в поддержку или используйте команду /support
+
+⭐ **Оставьте отзыв и получите +30 минут бонусного времени!**
+Команда для получения бонуса: /bonus
+
+Удачной игры! 🎯""",
+
+    "welcome_message": """Здравствуйте! Добро пожаловать в Steam Rental System! 🎮
+
+Я автоматический бот-помощник, который поможет вам:
+✅ Получить доступ к Steam аккаунту
+✅ Настроить Steam Guard
+✅ Получить бонусное время за отзыв
+✅ Решить любые вопросы
+
+📱 **Основные команды:**
+/start - Главное меню
+/help - Справка
+/time - Оставшееся время
+/accounts - Доступные аккаунты
+/support - Поддержка
+/bonus - Получить бонус за отзыв
+
+🚀 Готовы начать? Выберите игру и время аренды!""",
+
+    "rental_confirmation": """✅ **Аренда подтверждена!**
+
+🎮 Игра: {game}
+⏰ Время: {rental_time}
+💰 Стоимость: {price} ₽
+
+📱 **Следующий шаг:**
+1. Скачайте Steam Guard Mobile
+2. Войдите в аккаунт
+3. Получите данные для входа
+
+💬 Напишите "готов" когда будете готовы получить данные аккаунта.
+
+⭐ **Не забудьте оставить отзыв для получения +30 минут бонуса!**""",
+
+    "steam_guard_ready": """🎯 **Steam Guard готов!**
+
+📱 **Данные аккаунта:**
+Логин: {login}
+Пароль: {password}
+Email: {email}
+
+🔐 **Steam Guard код:**
+{steam_guard_code}
+
+⚠️ **Важно:**
+• Не передавайте код третьим лицам
+• Код действителен 30 секунд
+• При проблемах используйте резервные коды
+
+🎮 **Время аренды:** {rental_time}
+
+❓ **Нужна помощь?** Команда /support
+
+⭐ **Оставьте отзыв для бонуса +30 минут!** Команда /bonus""",
+
+    "rental_expired": """⏰ **Время аренды истекло!**
+
+🎮 Игра: {game}
+📅 Дата окончания: {end_date}
+
+🔒 **Аккаунт заблокирован для изменения пароля**
+
+💡 **Хотите продлить аренду?**
+• Используйте команду /extend
+• Или арендуйте новый аккаунт
+
+⭐ **Оставьте отзыв о сервисе для получения скидки на следующую аренду!**
+
+Спасибо за использование Steam Rental System! 🎯""",
+
+    "bonus_reminder": """🎁 **Напоминание о бонусе!**
+
+⭐ **Оставьте отзыв и получите +30 минут бонусного времени!**
+
+📝 **Как получить бонус:**
+1. Напишите команду /review
+2. Оцените сервис от 1 до 5 звезд
+3. Напишите комментарий
+4. Получите +30 минут на следующий аккаунт!
+
+🎯 **Бонус можно использовать:**
+• При следующей аренде
+• Для продления текущей аренды
+• Накопить для VIP аккаунта
+
+💬 Команда: /bonus""",
+
+    "support_message": """🆘 **Поддержка Steam Rental System**
+
+📞 **Способы связи:**
+• Telegram: @steam_rental_support
+• Email: support@steamrental.com
+• Чат: /chat
+
+🔧 **Частые проблемы:**
+• Steam Guard не работает → /steamguard_help
+• Не могу войти → /login_help
+• Проблемы с оплатой → /payment_help
+• Технические вопросы → /tech_help
+
+⏰ **Время ответа:** до 5 минут
+
+💡 **Пока ждете ответа:**
+• Проверьте FAQ: /faq
+• Посмотрите видео-инструкции: /tutorials
+• Изучите базу знаний: /knowledge
+
+🎯 **Номер обращения:** #{ticket_id}""",
+
+    "review_request": """⭐ **Пожалуйста, оставьте отзыв!**
+
+🎮 **Ваша аренда завершена:**
+Игра: {game}
+Время: {rental_time}
+Дата: {date}
+
+📝 **Оцените наш сервис:**
+1 ⭐ - Плохо
+2 ⭐ - Неудовлетворительно  
+3 ⭐ - Удовлетворительно
+4 ⭐ - Хорошо
+5 ⭐ - Отлично!
+
+🎁 **За отзыв получите:**
+• +30 минут бонусного времени
+• Скидку 10% на следующую аренду
+• Приоритетную поддержку
+
+💬 **Команда для отзыва:** /review
+
+Спасибо за доверие! 🙏""",
+
+    "bonus_activated": """🎉 **Бонус активирован!**
+
+⭐ **Ваш отзыв принят!**
+
+🎁 **Получено:**
+• +30 минут бонусного времени
+• Скидка 10% на следующую аренду
+• Статус "Постоянный клиент"
+
+💳 **Бонусное время:** {bonus_time}
+
+📱 **Использовать бонус:**
+• При аренде: /rent
+• Для продления: /extend
+• Обмен на скидку: /exchange
+
+🎯 **Следующая аренда со скидкой!**
+
+Спасибо за отзыв! 🙏""",
+
+    "maintenance_notice": """🔧 **Техническое обслуживание**
+
+⚠️ **Внимание!** Система временно недоступна.
+
+🕐 **Время:** {maintenance_time}
+📋 **Работы:** {maintenance_type}
+
+💡 **Что происходит:**
+• Обновление безопасности
+• Улучшение производительности
+• Добавление новых функций
+
+📱 **Уведомления:**
+• О завершении работ
+• О компенсации времени
+• О специальных предложениях
+
+⏰ **Ожидаемое время:** {estimated_duration}
+
+🎯 **Следите за обновлениями!**"""
+}
+
+def render_message(name: str, **values) -> str:
+    """Текст сообщения по шаблону; отсутствующее значение вызывает KeyError"""
+    return MESSAGE_TEMPLATES[name].format(**values)
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+✉️ Единая отправка сообщений покупателям FunPay
+HTTP-отправка по умолчанию, браузер — только запасной путь
+"""
+
+import threading
+import logging
+from typing import Callable, Dict, Optional
+from config import Config
+from message_templates import render_message
+
+class HttpMessageBackend:
+    """Отправка формой чата заказа через HTTP-сессию FunPayManager"""
+
+    name = 'http'
+
+    def __init__(self, funpay_manager):
+        self.funpay_manager = funpay_manager
+
+    def send(self, order_id: str, text: str) -> bool:
+        return self.funpay_manager.send_message(order_id, text)
+
+    def close(self):
+        pass
+
+class SeleniumMessageBackend:
+    """
+    Отправка через браузер FunPayMessenger. Браузер и selenium загружаются
+    только при первой отправке, поэтому без использования запасного пути
+    процесс не тратит память на Chrome.
+    """
+
+    name = 'selenium'
+
+    def __init__(self, login: str, password: str, headless: bool = True,
+                 messenger_factory: Callable[[], object] = None, db=None):
+        self.login = login
+        self.password = password
+        self.headless = headless
+        self.db = db
+        self.messenger_factory = messenger_factory
+        self.messenger = None
+        self._lock = threading.Lock()
+
+    def _get_messenger(self):
+        with self._lock:
+            if self.messenger is None:
+                if self.messenger_factory:
+                    messenger = self.messenger_factory()
+                else:
+                    from funpay_messenger import FunPayMessenger
+                    messenger = FunPayMessenger(headless=self.headless, db=self.db)
+                messenger.login_to_funpay(self.login, self.password)
+                self.messenger = messenger
+            return self.messenger
+
+    def send(self, order_id: str, text: str) -> bool:
+        return self._get_messenger().send_message_to_order(order_id, text)
+
+    def close(self):
+        with self._lock:
+            if self.messenger is not None:
+                self.messenger.close()
+                self.messenger = None
+
+class MessageSender:
+    """
+    Отправка текста или шаблона покупателю: сначала основной способ,
+    при неудаче — запасной. Текст по шаблону собирается один раз для обоих.
+    """
+
+    def __init__(self, primary, fallback=None):
+        self.primary = primary
+        self.fallback = fallback
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._stats: Dict[str, int] = {}
+
+    def _count(self, key: str):
+        with self._lock:
+            self._stats[key] = self._stats.get(key, 0) + 1
+
+    def _try(self, backend, order_id: str, text: str) -> bool:
+        try:
+            sent = bool(backend.send(order_id, text))
+        except Exception as e:
+            self.logger.error(f"❌ Ошибка отправки ({backend.name}) по заказу {order_id}: {e}")
+            sent = False
+        self._count(f"{backend.name}_{'sent' if sent else 'failed'}")
+        return sent
+
+    def send(self, order_id: str, text: str) -> bool:
+        """Отправка готового текста в чат заказа"""
+        if self._try(self.primary, order_id, text):
+            return True
+        if self.fallback is None:
+            return False
+        self.logger.warning(f"⚠️ Заказ {order_id}: отправка через {self.fallback.name}")
+        return self._try(self.fallback, order_id, text)
+
+    def send_template(self, order_id: str, template: str, **values) -> bool:
+        """Отправка сообщения по шаблону message_templates"""
+        return self.send(order_id, render_message(template, **values))
+
+    def get_metrics(self) -> Dict[str, int]:
+        """Отправленные и неудачные сообщения по способам отправки"""
+        with self._lock:
+            return dict(self._stats)
+
+    def close(self):
+        for backend in (self.primary, self.fallback):
+            if backend is not None:
+                backend.close()
+
+def create_message_sender(funpay_manager, backend: str = None, fallback: Optional[str] = None) -> MessageSender:
+    """Отправитель с основным и запасным способом из Config (MESSAGE_BACKEND, MESSAGE_FALLBACK)"""
+    backend = backend or Config.MESSAGE_BACKEND
+    fallback = Config.MESSAGE_FALLBACK if fallback is None else fallback
+
+    def build(name: str):
+        if name == 'http':
+            return HttpMessageBackend(funpay_manager)
+        if name == 'selenium':
+            return SeleniumMessageBackend(funpay_manager.login, funpay_manager.password, db=funpay_manager.db)
+        raise ValueError(f"Неизвестный способ отправки сообщений: {name}")
+
+    return MessageSender(build(backend), build(fallback) if fallback and fallback != backend else None)
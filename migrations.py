@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🧱 Версионные миграции схемы базы данных
+Упорядоченные идемпотентные шаги с учетом в таблице schema_version
+"""
+
+import sqlite3
+import logging
+from typing import Callable, List, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+# Шаг миграции: SQL-выражение или функция, принимающая курсор
+MigrationStep = Union[str, Callable[[sqlite3.Cursor], None]]
+
+def _backfill_game_statistics(cursor: sqlite3.Cursor):
+    """Заполнение таблицы statistics по уже накопленным арендам"""
+    cursor.execute('''
+        INSERT INTO statistics (game_name, total_rentals, total_revenue)
+        SELECT sa.game_name,
+               COUNT(*),
+               COALESCE(SUM(CASE WHEN r.status = 'completed' THEN r.duration_hours * 50 END), 0)
+        FROM rentals r
+        JOIN steam_accounts sa ON sa.id = r.account_id
+        WHERE TRUE
+        GROUP BY sa.game_name
+        ON CONFLICT (game_name) DO UPDATE SET
+            total_rentals = excluded.total_rentals,
+            total_revenue = excluded.total_revenue,
+            last_updated = CURRENT_TIMESTAMP
+    ''')
+
+# Псевдонимы игр, ранее зашитые в FunPayManager.extract_game_from_order
+DEFAULT_GAME_ALIASES = [
+    ('cs2', 'Counter-Strike 2'), ('cs 2', 'Counter-Strike 2'), ('cs:go', 'Counter-Strike 2'),
+    ('csgo', 'Counter-Strike 2'), ('counter-strike', 'Counter-Strike 2'), ('кс2', 'Counter-Strike 2'),
+    ('dota', 'Dota 2'), ('dota 2', 'Dota 2'), ('дота', 'Dota 2'), ('дота 2', 'Dota 2'),
+    ('pubg', 'PUBG'), ('playerunknown', 'PUBG'), ('пабг', 'PUBG'),
+    ('valorant', 'Valorant'), ('валорант', 'Valorant'),
+    ('lol', 'League of Legends'), ('league of legends', 'League of Legends'),
+    ('fortnite', 'Fortnite'), ('фортнайт', 'Fortnite'),
+    ('minecraft', 'Minecraft'), ('майнкрафт', 'Minecraft'),
+    ('gta', 'GTA V'), ('gta 5', 'GTA V'), ('gta v', 'GTA V'), ('grand theft auto', 'GTA V'), ('гта', 'GTA V'),
+    ('fifa', 'FIFA 24'), ('cod', 'Call of Duty'), ('call of duty', 'Call of Duty'),
+    ('overwatch', 'Overwatch'), ('apex', 'Apex Legends'), ('apex legends', 'Apex Legends'),
+]
+
+def _seed_game_aliases(cursor: sqlite3.Cursor):
+    """Начальное заполнение реестра псевдонимов игр"""
+    cursor.executemany(
+        'INSERT OR IGNORE INTO game_aliases (alias, game_name) VALUES (?, ?)',
+        DEFAULT_GAME_ALIASES
+    )
+
+def _add_password_rotation_column(cursor: sqlite3.Cursor):
+    """Признак ожидания смены пароля (ALTER TABLE не поддерживает IF NOT EXISTS)"""
+    cursor.execute('PRAGMA table_info(steam_accounts)')
+    if 'password_rotation_pending' not in {row[1] for row in cursor.fetchall()}:
+        cursor.execute('ALTER TABLE steam_accounts ADD COLUMN password_rotation_pending BOOLEAN DEFAULT FALSE')
+
+# Список миграций: (версия, описание, шаги). Новые миграции добавляются только в конец.
+MIGRATIONS: List[Tuple[int, str, List[MigrationStep]]] = [
+    (1, 'Индексы для аренд, аккаунтов, истории операций и бонусов', [
+        # end_expired_rentals (покрывающий), get_active_rentals, get_detailed_stats
+        'CREATE INDEX IF NOT EXISTS idx_rentals_status_end_time ON rentals (status, end_time, account_id, renter_id)',
+        # get_user_rentals, get_rental_info, add_bonus_time
+        'CREATE INDEX IF NOT EXISTS idx_rentals_renter_status_end_time ON rentals (renter_id, status, end_time)',
+        # JOIN с steam_accounts и delete_account
+        'CREATE INDEX IF NOT EXISTS idx_rentals_account_id ON rentals (account_id)',
+        # get_available_accounts, get_accounts_count_by_game
+        'CREATE INDEX IF NOT EXISTS idx_steam_accounts_rented_game ON steam_accounts (is_rented, game_name)',
+        # get_operation_history
+        'CREATE INDEX IF NOT EXISTS idx_operation_history_user_created ON operation_history (user_id, created_at)',
+        # get_total_bonus_time, get_user_bonuses
+        'CREATE INDEX IF NOT EXISTS idx_bonuses_user_used ON bonuses (user_id, is_used)',
+        # get_user_notifications
+        'CREATE INDEX IF NOT EXISTS idx_notifications_user_read ON notifications (user_id, is_read)',
+    ]),
+    (2, 'Инкрементальная статистика по играм', [
+        # Одна строка на игру, чтобы обновлять ее через UPSERT
+        'DELETE FROM statistics WHERE id NOT IN (SELECT MIN(id) FROM statistics GROUP BY game_name)',
+        'CREATE UNIQUE INDEX IF NOT EXISTS idx_statistics_game_name ON statistics (game_name)',
+        _backfill_game_statistics,
+    ]),
+    (3, 'Учет обработанных заказов FunPay', [
+        '''
+        CREATE TABLE IF NOT EXISTS funpay_orders (
+            order_id TEXT PRIMARY KEY,
+            title TEXT,
+            status TEXT,
+            game_name TEXT,
+            duration TEXT,
+            state TEXT NOT NULL DEFAULT 'new',
+            rental_id INTEGER,
+            attempts INTEGER DEFAULT 0,
+            first_seen_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            updated_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            processed_at DATETIME
+        )
+        ''',
+        'CREATE INDEX IF NOT EXISTS idx_funpay_orders_state ON funpay_orders (state, first_seen_at)',
+        # Отметки синхронизации (последний увиденный заказ и т.п.)
+        '''
+        CREATE TABLE IF NOT EXISTS sync_state (
+            name TEXT PRIMARY KEY,
+            value TEXT,
+            updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+        ''',
+    ]),
+    (4, 'Учет обработанных отзывов FunPay', [
+        '''
+        CREATE TABLE IF NOT EXISTS funpay_reviews (
+            review_id TEXT PRIMARY KEY,
+            order_id TEXT,
+            rating INTEGER,
+            renter_id TEXT,
+            bonus_minutes INTEGER DEFAULT 0,
+            processed_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+        ''',
+    ]),
+    (5, 'Реестр псевдонимов игр', [
+        '''
+        CREATE TABLE IF NOT EXISTS game_aliases (
+            alias TEXT PRIMARY KEY,
+            game_name TEXT NOT NULL,
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+        ''',
+        _seed_game_aliases,
+    ]),
+    (6, 'Смена пароля освобожденных аккаунтов перед повторной выдачей', [
+        _add_password_rotation_column,
+        # get_rotation_pending_account_ids
+        '''
+        CREATE INDEX IF NOT EXISTS idx_steam_accounts_rotation_pending
+        ON steam_accounts (id) WHERE password_rotation_pending
+        ''',
+    ]),
+    (7, 'Массовые рассылки с сохранением прогресса', [
+        '''
+        CREATE TABLE IF NOT EXISTS message_campaigns (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            message TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'pending',
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            finished_at DATETIME
+        )
+        ''',
+        # get_unfinished_message_campaign_ids
+        'CREATE INDEX IF NOT EXISTS idx_message_campaigns_status ON message_campaigns (status)',
+        '''
+        CREATE TABLE IF NOT EXISTS message_campaign_recipients (
+            campaign_id INTEGER NOT NULL,
+            order_id TEXT NOT NULL,
+            state TEXT NOT NULL DEFAULT 'pending',
+            attempts INTEGER DEFAULT 0,
+            last_error TEXT,
+            sent_at DATETIME,
+            PRIMARY KEY (campaign_id, order_id)
+        )
+        ''',
+    ]),
+]
+
+def get_schema_version(cursor: sqlite3.Cursor) -> int:
+    """Получение текущей версии схемы"""
+    cursor.execute('SELECT MAX(version) FROM schema_version')
+    result = cursor.fetchone()
+    return result[0] if result and result[0] else 0
+
+def run_migrations(conn: sqlite3.Connection) -> int:
+    """
+    Применение недостающих миграций.
+    Каждая миграция выполняется в отдельной транзакции BEGIN IMMEDIATE, поэтому
+    несколько процессов, стартующих одновременно, не применят шаг дважды.
+    Возвращает количество примененных миграций.
+    """
+    cursor = conn.cursor()
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            description TEXT NOT NULL,
+            applied_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    conn.commit()
+
+    applied = 0
+    for version, description, steps in MIGRATIONS:
+        cursor.execute('BEGIN IMMEDIATE')
+        try:
+            if version <= get_schema_version(cursor):
+                conn.commit()
+                continue
+
+            for step in steps:
+                if callable(step):
+                    step(cursor)
+                else:
+                    cursor.execute(step)
+
+            cursor.execute('''
+                INSERT INTO schema_version (version, description)
+                VALUES (?, ?)
+            ''', (version, description))
+            conn.commit()
+            applied += 1
+            logger.info(f"Применена миграция {version}: {description}")
+
+        except Exception:
+            conn.rollback()
+            raise
+
+    if applied:
+        # Обновляем статистику планировщика запросов под новые индексы
+        cursor.execute('ANALYZE')
+        conn.commit()
+
+    return applied
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+📦 Конвейер обработки заказов
+Опрос FunPay ставит заказы в ограниченную очередь, пул потоков выдает аккаунты
+"""
+
+import time
+import queue
+import threading
+import logging
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional
+from config import Config
+
+class StageMetrics:
+    """Счетчики и время выполнения одного этапа"""
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+
+    def observe(self, seconds: float, error: bool = False):
+        self.count += 1
+        self.errors += int(error)
+        self.total_seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+
+    def snapshot(self) -> Dict:
+        return {
+            'count': self.count,
+            'errors': self.errors,
+            'avg_seconds': round(self.total_seconds / self.count, 4) if self.count else 0.0,
+            'max_seconds': round(self.max_seconds, 4),
+        }
+
+class OrderPipeline:
+    """
+    Очередь заказов с пулом обработчиков: захват заказа → выдача аккаунта → отправка данных.
+    Медленная отправка по одному заказу не задерживает остальные, а заполненная
+    очередь отклоняет новые заказы (они остаются в базе до следующего опроса).
+    """
+
+    STAGES = ('queue_wait', 'claim', 'allocate', 'deliver', 'finish')
+
+    def __init__(self, claim: Callable[[str], bool], allocate: Callable[[Dict], Optional[Dict]],
+                 deliver: Callable[[str, Dict], bool], finish: Callable[[str, str, Optional[Dict]], None],
+                 workers: int = None, queue_size: int = None):
+        self.claim = claim
+        self.allocate = allocate
+        self.deliver = deliver
+        self.finish = finish
+        self.workers = workers or Config.ORDER_WORKERS
+        self.logger = logging.getLogger(__name__)
+
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size or Config.ORDER_QUEUE_SIZE)
+        self._lock = threading.Lock()
+        self._threads: List[threading.Thread] = []
+        self._in_flight: Dict[str, float] = {}
+        self._stages = {name: StageMetrics() for name in self.STAGES}
+        self._counters = {'submitted': 0, 'rejected': 0, 'duplicates': 0}
+        self._results: Dict[str, int] = {}
+
+    def start(self):
+        """Запуск обработчиков"""
+        with self._lock:
+            if self._threads:
+                return
+            self._threads = [
+                threading.Thread(target=self._worker, name=f"order-worker-{i}", daemon=True)
+                for i in range(self.workers)
+            ]
+        for thread in self._threads:
+            thread.start()
+        self.logger.info(f"📦 Конвейер заказов запущен: {self.workers} обработчиков")
+
+    def stop(self, timeout: float = 10):
+        """Остановка обработчиков после завершения текущих заказов"""
+        with self._lock:
+            threads, self._threads = self._threads, []
+        for _ in threads:
+            self._queue.put(None)
+        for thread in threads:
+            thread.join(timeout)
+
+    def submit(self, order: Dict) -> bool:
+        """
+        Постановка заказа в очередь без ожидания.
+        Возвращает False, если заказ уже в работе или очередь заполнена.
+        """
+        with self._lock:
+            if order['id'] in self._in_flight:
+                self._counters['duplicates'] += 1
+                return False
+            self._in_flight[order['id']] = time.monotonic()
+
+        try:
+            self._queue.put_nowait(order)
+        except queue.Full:
+            with self._lock:
+                self._in_flight.pop(order['id'], None)
+                self._counters['rejected'] += 1
+            return False
+
+        with self._lock:
+            self._counters['submitted'] += 1
+        return True
+
+    def has_capacity(self) -> bool:
+        """Есть ли место в очереди"""
+        return not self._queue.full()
+
+    def join(self):
+        """Ожидание обработки всех поставленных заказов"""
+        self._queue.join()
+
+    @contextmanager
+    def _stage(self, name: str):
+        started = time.monotonic()
+        error = False
+        try:
+            yield
+        except Exception:
+            error = True
+            raise
+        finally:
+            elapsed = time.monotonic() - started
+            with self._lock:
+                self._stages[name].observe(elapsed, error)
+
+    def _worker(self):
+        while True:
+            order = self._queue.get()
+            try:
+                if order is None:
+                    return
+                self._process(order)
+            except Exception as e:
+                self.logger.error(f"❌ Ошибка обработки заказа {order['id']}: {e}")
+                self._record_result('error')
+            finally:
+                if order is not None:
+                    with self._lock:
+                        self._in_flight.pop(order['id'], None)
+                self._queue.task_done()
+
+    def _process(self, order: Dict):
+        order_id = order['id']
+        with self._lock:
+            enqueued_at = self._in_flight.get(order_id, time.monotonic())
+            self._stages['queue_wait'].observe(time.monotonic() - enqueued_at)
+
+        # Заказ, уже взятый другим циклом или процессом, пропускается
+        with self._stage('claim'):
+            claimed = self.claim(order_id)
+        if not claimed:
+            self._record_result('skipped')
+            return
+
+        with self._stage('allocate'):
+            account_data = self.allocate(order)
+        if not account_data:
+            with self._stage('finish'):
+                self.finish(order_id, 'no_account', None)
+            self._record_result('no_account')
+            return
+
+        try:
+            with self._stage('deliver'):
+                delivered = self.deliver(order_id, account_data)
+        except Exception as e:
+            self.logger.error(f"❌ Ошибка отправки данных по заказу {order_id}: {e}")
+            delivered = False
+
+        state = 'delivered' if delivered else 'failed'
+        with self._stage('finish'):
+            self.finish(order_id, state, account_data)
+        self._record_result(state)
+
+    def _record_result(self, state: str):
+        with self._lock:
+            self._results[state] = self._results.get(state, 0) + 1
+
+    def get_metrics(self) -> Dict:
+        """Метрики очереди и этапов обработки"""
+        with self._lock:
+            return {
+                'workers': len(self._threads),
+                'queue_size': self._queue.qsize(),
+                'queue_capacity': self._queue.maxsize,
+                'in_flight': len(self._in_flight),
+                **self._counters,
+                'results': dict(self._results),
+                'stages': {name: metrics.snapshot() for name, metrics in self._stages.items()},
+            }
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+📡 Адаптивный опрос заказов FunPay
+Интервал сокращается после новых заказов и растет экспоненциально в простое
+"""
+
+import time
+import random
+import threading
+import logging
+from collections import deque
+from typing import Callable, Dict, Optional
+from config import Config
+
+class RequestBudget:
+    """Скользящее окно: не больше max_requests запросов за period секунд"""
+
+    def __init__(self, max_requests: int, period: float = 3600):
+        self.max_requests = max_requests
+        self.period = period
+        self._requests: deque = deque()
+        self._lock = threading.Lock()
+
+    def _trim(self, now: float):
+        while self._requests and now - self._requests[0] >= self.period:
+            self._requests.popleft()
+
+    def acquire(self, now: float = None) -> float:
+        """
+        Занимает место под запрос. Возвращает 0, если запрос можно отправить,
+        иначе число секунд до освобождения места (место не занимается).
+        """
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            self._trim(now)
+            if len(self._requests) < self.max_requests:
+                self._requests.append(now)
+                return 0.0
+            return self._requests[0] + self.period - now
+
+    def used(self, now: float = None) -> int:
+        """Запросов в текущем окне"""
+        with self._lock:
+            self._trim(time.monotonic() if now is None else now)
+            return len(self._requests)
+
+class AdaptiveOrderPoller:
+    """
+    Фоновый опрос заказов: после найденных заказов следующий опрос идет через
+    минимальный интервал, каждый пустой опрос умножает интервал на коэффициент
+    до максимума. Случайный разброс не дает опросам совпадать по времени, а бюджет
+    запросов ограничивает их число в час независимо от активности.
+    Параметры читаются из категории "funpay" SettingsManager перед каждым опросом.
+    """
+
+    def __init__(self, poll: Callable[[], int], settings=None):
+        self.poll = poll
+        self.settings = settings
+        self.logger = logging.getLogger(__name__)
+
+        self.config = self._load_settings()
+        self.interval = self.config['min_seconds']
+        self.budget = RequestBudget(self.config['budget_per_hour'])
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._stats = {'polls': 0, 'active_polls': 0, 'errors': 0, 'budget_waits': 0}
+
+    def _load_settings(self) -> Dict:
+        """Параметры опроса из настроек с откатом на значения Config"""
+        defaults = {
+            'min_seconds': Config.ORDER_POLL_MIN_SECONDS,
+            'max_seconds': Config.ORDER_POLL_MAX_SECONDS,
+            'backoff': Config.ORDER_POLL_BACKOFF,
+            'jitter': Config.ORDER_POLL_JITTER,
+            'budget_per_hour': Config.ORDER_POLL_BUDGET_PER_HOUR,
+        }
+        values = self.settings.get_category_settings('funpay') if self.settings else {}
+
+        config = {}
+        for name, default in defaults.items():
+            raw = values.get(f'order_poll_{name}')
+            try:
+                config[name] = type(default)(float(raw)) if raw else default
+            except ValueError:
+                self.logger.warning(f"⚠️ Некорректная настройка funpay.order_poll_{name}: {raw}")
+                config[name] = default
+
+        config['min_seconds'] = max(config['min_seconds'], 1)
+        config['max_seconds'] = max(config['max_seconds'], config['min_seconds'])
+        config['backoff'] = max(config['backoff'], 1.0)
+        config['jitter'] = min(max(config['jitter'], 0.0), 0.5)
+        config['budget_per_hour'] = max(config['budget_per_hour'], 1)
+        return config
+
+    def reload_settings(self):
+        """Применение измененных настроек"""
+        self.config = self._load_settings()
+        self.budget.max_requests = self.config['budget_per_hour']
+        self.interval = min(max(self.interval, self.config['min_seconds']), self.config['max_seconds'])
+
+    def next_interval(self, found: int) -> float:
+        """Интервал до следующего опроса после опроса с found новыми заказами"""
+        if found:
+            self.interval = self.config['min_seconds']
+        else:
+            self.interval = min(self.interval * self.config['backoff'], self.config['max_seconds'])
+
+        jitter = self.config['jitter']
+        return self.interval * random.uniform(1 - jitter, 1 + jitter)
+
+    def start(self):
+        """Запуск потока опроса"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="order-poller", daemon=True)
+        self._thread.start()
+        self.logger.info(f"📡 Опрос заказов запущен: {self.config['min_seconds']}–{self.config['max_seconds']}с")
+
+    def stop(self):
+        """Остановка опроса"""
+        self._stop.set()
+        self._wake.set()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout=5)
+
+    def wake(self):
+        """Внеочередной опрос (например, после уведомления о заказе)"""
+        self.interval = self.config['min_seconds']
+        self._wake.set()
+
+    def _sleep(self, seconds: float):
+        self._wake.wait(seconds)
+        self._wake.clear()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.reload_settings()
+            except Exception as e:
+                self.logger.error(f"❌ Ошибка чтения настроек опроса: {e}")
+
+            wait = self.budget.acquire()
+            if wait > 0:
+                self._stats['budget_waits'] += 1
+                self.logger.warning(f"⚠️ Бюджет запросов исчерпан, опрос через {wait:.0f}с")
+                self._sleep(wait)
+                continue
+
+            found = 0
+            try:
+                found = self.poll() or 0
+            except Exception as e:
+                self._stats['errors'] += 1
+                self.logger.error(f"❌ Ошибка опроса заказов: {e}")
+
+            self._stats['polls'] += 1
+            self._stats['active_polls'] += int(found > 0)
+            self._sleep(self.next_interval(found))
+
+    def get_metrics(self) -> Dict:
+        """Метрики опроса"""
+        return {
+            **self._stats,
+            'interval_seconds': round(self.interval, 1),
+            'budget_used': self.budget.used(),
+            'budget_per_hour': self.budget.max_requests,
+        }
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🔑 Смена паролей освобожденных аккаунтов
+Очередь только из аккаунтов после аренды, пул потоков и повторы с задержкой
+"""
+
+import time
+import heapq
+import itertools
+import threading
+import logging
+from typing import Dict, Iterable, List, Optional, Tuple
+from config import Config
+from database import Database
+from steam_manager import SteamManager
+
+class PasswordRotator:
+    """
+    Аккаунт после аренды попадает в очередь и остается недоступным для выдачи,
+    пока пароль не сменен. Неудачная попытка повторяется с экспоненциальной
+    задержкой; после последней попытки аккаунт остается в ожидании смены
+    пароля и снова ставится в очередь при следующем запуске. Аккаунт, который
+    перестал ожидать смены пароля (удален или освобожден вручную), пропускается.
+    """
+
+    def __init__(self, db: Database, steam_manager: SteamManager, workers: int = None,
+                 max_attempts: int = None, backoff_seconds: float = None):
+        self.db = db
+        self.steam_manager = steam_manager
+        self.workers = workers or Config.PASSWORD_ROTATION_WORKERS
+        self.max_attempts = max_attempts or Config.PASSWORD_ROTATION_MAX_ATTEMPTS
+        self.backoff_seconds = (Config.PASSWORD_ROTATION_BACKOFF_SECONDS
+                                if backoff_seconds is None else backoff_seconds)
+        self.logger = logging.getLogger(__name__)
+
+        self._heap: List[Tuple[float, int, int, int]] = []  # (время готовности, порядок, аккаунт, попытка)
+        self._seq = itertools.count()
+        self._queued: Dict[int, float] = {}  # аккаунт -> время постановки в очередь
+        self._cond = threading.Condition()
+        self._threads: List[threading.Thread] = []
+        self.running = False
+        self._stats = {'rotated': 0, 'skipped': 0, 'failed_attempts': 0, 'given_up': 0, 'in_progress': 0,
+                       'latency_total': 0.0, 'latency_max': 0.0}
+
+    def start(self):
+        """Запуск обработчиков и постановка в очередь аккаунтов, ожидающих смены пароля"""
+        with self._cond:
+            if self.running:
+                return
+            self.running = True
+            self._threads = [
+                threading.Thread(target=self._worker, name=f"password-rotation-{i}", daemon=True)
+                for i in range(self.workers)
+            ]
+        for thread in self._threads:
+            thread.start()
+
+        pending = self.db.get_rotation_pending_account_ids()
+        if pending:
+            self.logger.info(f"🔑 Аккаунтов, ожидающих смены пароля: {len(pending)}")
+            self.submit(pending)
+
+    def stop(self, timeout: float = 5):
+        """Остановка обработчиков (незавершенные аккаунты остаются в ожидании в базе)"""
+        with self._cond:
+            self.running = False
+            self._cond.notify_all()
+        for thread in self._threads:
+            if thread is not threading.current_thread():
+                thread.join(timeout)
+        self._threads = []
+
+    def submit(self, account_ids: Iterable[int]) -> int:
+        """Постановка освобожденных аккаунтов в очередь, возвращает число новых"""
+        added = 0
+        now = time.monotonic()
+        with self._cond:
+            for account_id in account_ids:
+                if account_id in self._queued:
+                    continue
+                self._queued[account_id] = now
+                heapq.heappush(self._heap, (now, next(self._seq), account_id, 1))
+                added += 1
+            self._cond.notify_all()
+        return added
+
+    def _next_task(self) -> Optional[Tuple[int, int]]:
+        """Ожидание аккаунта, время попытки которого наступило"""
+        with self._cond:
+            while self.running:
+                if self._heap:
+                    ready_at, _, account_id, attempt = self._heap[0]
+                    wait = ready_at - time.monotonic()
+                    if wait <= 0:
+                        heapq.heappop(self._heap)
+                        self._stats['in_progress'] += 1
+                        return account_id, attempt
+                    self._cond.wait(wait)
+                else:
+                    self._cond.wait()
+            return None
+
+    def _worker(self):
+        while True:
+            task = self._next_task()
+            if task is None:
+                return
+            account_id, attempt = task
+            try:
+                result = self._rotate(account_id)
+            except Exception as e:
+                self.logger.error(f"❌ Ошибка смены пароля аккаунта #{account_id}: {e}")
+                result = 'failed'
+            self._finish(account_id, attempt, result)
+
+    def _rotate(self, account_id: int) -> str:
+        """Одна попытка смены пароля: rotated, skipped (смена не нужна) или failed"""
+        accounts = self.db.get_accounts_by_ids([account_id])
+        if not accounts or not accounts[0]['password_rotation_pending']:
+            return 'skipped'
+        account = accounts[0]
+
+        new_password = self.steam_manager.generate_password()
+        if not self.steam_manager.change_steam_password(account['username'], account['password'], new_password):
+            return 'failed'
+
+        # Аккаунт возвращается в свободные только вместе с новым паролем
+        if not self.db.complete_password_rotation(account_id, new_password):
+            self.logger.warning(f"⚠️ Аккаунт {account['username']} перестал ожидать смены пароля "
+                                f"во время смены, новый пароль сохранен")
+            return 'failed'
+        self.logger.info(f"✅ Пароль изменен для аккаунта {account['username']}")
+        return 'rotated'
+
+    def _finish(self, account_id: int, attempt: int, result: str):
+        with self._cond:
+            self._stats['in_progress'] -= 1
+            if result == 'skipped':
+                self._queued.pop(account_id, None)
+                self._stats['skipped'] += 1
+                return
+            if result == 'rotated':
+                latency = time.monotonic() - self._queued.pop(account_id)
+                self._stats['rotated'] += 1
+                self._stats['latency_total'] += latency
+                self._stats['latency_max'] = max(self._stats['latency_max'], latency)
+                return
+
+            self._stats['failed_attempts'] += 1
+            if attempt >= self.max_attempts:
+                self._queued.pop(account_id, None)
+                self._stats['given_up'] += 1
+                self.logger.error(f"❌ Не удалось сменить пароль аккаунта #{account_id} "
+                                  f"за {attempt} попыток, аккаунт не выдается")
+                return
+
+            delay = self.backoff_seconds * 2 ** (attempt - 1)
+            heapq.heappush(self._heap, (time.monotonic() + delay, next(self._seq), account_id, attempt + 1))
+            self._cond.notify_all()
+
+    def get_metrics(self) -> Dict:
+        """Глубина очереди, результаты и задержка смены паролей"""
+        with self._cond:
+            rotated = self._stats['rotated']
+            return {
+                'queue_depth': len(self._heap),
+                'in_progress': self._stats['in_progress'],
+                'rotated': rotated,
+                'skipped': self._stats['skipped'],
+                'failed_attempts': self._stats['failed_attempts'],
+                'given_up': self._stats['given_up'],
+                'avg_latency_seconds': round(self._stats['latency_total'] / rotated, 3) if rotated else 0.0,
+                'max_latency_seconds': round(self._stats['latency_max'], 3),
+            }
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🚦 Ограничение частоты запросов к FunPay
+Одна корзина токенов на все исходящие запросы: HTTP клиенты и браузеры
+"""
+
+import time
+import asyncio
+import threading
+from typing import Dict, Optional
+import requests
+from config import Config
+
+class TokenBucket:
+    """
+    Корзина токенов: в среднем rate запросов в секунду, подряд без ожидания —
+    до capacity. Токен резервируется сразу, а вызывающий ждет до его появления,
+    поэтому одновременные запросы выстраиваются в очередь без опроса.
+    """
+
+    def __init__(self, rate: float, capacity: float = None):
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+        self._stats = {'acquired': 0, 'throttled': 0, 'waited_seconds': 0.0}
+
+    def reserve(self, tokens: float = 1, now: float = None) -> float:
+        """Резервирует токены, возвращает число секунд до их появления (0 — сразу)"""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= tokens
+            wait = max(0.0, -self._tokens / self.rate)
+            self._stats['acquired'] += 1
+            if wait:
+                self._stats['throttled'] += 1
+                self._stats['waited_seconds'] += wait
+            return wait
+
+    def acquire(self, tokens: float = 1) -> float:
+        """Ожидание токенов в потоке, возвращает время ожидания"""
+        wait = self.reserve(tokens)
+        if wait:
+            time.sleep(wait)
+        return wait
+
+    async def acquire_async(self, tokens: float = 1) -> float:
+        """Ожидание токенов в цикле событий без блокировки других задач"""
+        wait = self.reserve(tokens)
+        if wait:
+            await asyncio.sleep(wait)
+        return wait
+
+    def get_metrics(self) -> Dict:
+        """Выданные токены и время, проведенное в ожидании"""
+        with self._lock:
+            return {
+                'rate': self.rate,
+                'capacity': self.capacity,
+                'acquired': self._stats['acquired'],
+                'throttled': self._stats['throttled'],
+                'waited_seconds': round(self._stats['waited_seconds'], 3),
+            }
+
+class RateLimitedSession(requests.Session):
+    """requests.Session, каждый запрос которой занимает токен корзины"""
+
+    def __init__(self, limiter: TokenBucket):
+        super().__init__()
+        self.limiter = limiter
+
+    def request(self, method, url, *args, **kwargs):
+        self.limiter.acquire()
+        return super().request(method, url, *args, **kwargs)
+
+_funpay_limiter: Optional[TokenBucket] = None
+_funpay_limiter_lock = threading.Lock()
+
+def get_funpay_limiter() -> TokenBucket:
+    """Общая для процесса корзина запросов к FunPay (FUNPAY_REQUESTS_PER_SECOND, FUNPAY_REQUEST_BURST)"""
+    global _funpay_limiter
+    with _funpay_limiter_lock:
+        if _funpay_limiter is None:
+            _funpay_limiter = TokenBucket(Config.FUNPAY_REQUESTS_PER_SECOND, Config.FUNPAY_REQUEST_BURST)
+        return _funpay_limiter
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+⏰ Планировщик окончания аренд по срокам
+Мин-куча сроков окончания аренд вместо периодического опроса базы данных
+"""
+
+import heapq
+import threading
+import time
+import logging
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+from config import Config
+from database import Database
+
+class RentalExpiryScheduler:
+    """
+    Планировщик, просыпающийся точно к ближайшему сроку окончания аренды.
+    Аренды с наступившим сроком, оставшиеся активными после on_expire (ошибка
+    завершения), повторяются через retry_seconds, а не ждут пересинхронизации.
+    """
+
+    # Запас после срока: datetime('now') в SQLite имеет точность до секунды
+    GRACE_SECONDS = 1.0
+
+    def __init__(self, db: Database, on_expire: Callable[[], None],
+                 resync_minutes: int = None, retry_seconds: float = None):
+        self.db = db
+        self.on_expire = on_expire
+        self.resync_seconds = (resync_minutes or Config.RENTAL_EXPIRY_RESYNC_MINUTES) * 60
+        self.retry_seconds = retry_seconds or Config.RENTAL_EXPIRY_RETRY_SECONDS
+        self.logger = logging.getLogger(__name__)
+
+        self._heap: List[Tuple[float, int]] = []  # (срок, rental_id)
+        self._deadlines: Dict[int, float] = {}  # актуальный срок каждой аренды
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self.running = False
+
+    @staticmethod
+    def _to_timestamp(end_time) -> float:
+        """Перевод срока аренды в unix-время (сроки сравниваются с datetime('now'), т.е. в UTC)"""
+        if isinstance(end_time, str):
+            end_time = datetime.fromisoformat(end_time)
+        return end_time.replace(tzinfo=timezone.utc).timestamp()
+
+    def start(self):
+        """Загрузка сроков из базы и запуск потока планировщика"""
+        if self.running:
+            return
+        self.reload()
+        Database.add_rental_listener(self._on_rental_deadline)
+        self.running = True
+        self._thread = threading.Thread(target=self._run, name="rental-expiry", daemon=True)
+        self._thread.start()
+        self.logger.info(f"⏰ Планировщик окончания аренд запущен, сроков в очереди: {len(self._deadlines)}")
+
+    def stop(self):
+        """Остановка планировщика"""
+        Database.remove_rental_listener(self._on_rental_deadline)
+        with self._cond:
+            self.running = False
+            self._cond.notify_all()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout=5)
+
+    def reload(self):
+        """Полная пересборка очереди по активным арендам в базе"""
+        deadlines = {}
+        for rental_id, end_time in self.db.get_active_rental_deadlines():
+            try:
+                deadlines[rental_id] = self._to_timestamp(end_time)
+            except (TypeError, ValueError) as e:
+                self.logger.warning(f"⚠️ Некорректный срок аренды #{rental_id}: {end_time} ({e})")
+
+        with self._cond:
+            self._deadlines = deadlines
+            self._heap = [(deadline, rental_id) for rental_id, deadline in deadlines.items()]
+            heapq.heapify(self._heap)
+            self._cond.notify_all()
+
+    def schedule(self, rental_id: int, end_time):
+        """Добавление или перенос срока окончания аренды"""
+        deadline = self._to_timestamp(end_time)
+        with self._cond:
+            self._deadlines[rental_id] = deadline
+            heapq.heappush(self._heap, (deadline, rental_id))
+            # Будим поток только если новый срок стал ближайшим
+            if self._heap[0] == (deadline, rental_id):
+                self._cond.notify_all()
+
+    def pending_count(self) -> int:
+        """Количество аренд в очереди"""
+        with self._cond:
+            return len(self._deadlines)
+
+    def _on_rental_deadline(self, db_path: str, rental_id: int, end_time: datetime):
+        """Обработчик событий Database о создании и продлении аренд"""
+        if db_path == self.db.db_path:
+            self.schedule(rental_id, end_time)
+
+    def _next_deadline(self) -> Optional[float]:
+        """Ближайший актуальный срок (устаревшие записи кучи отбрасываются)"""
+        while self._heap:
+            deadline, rental_id = self._heap[0]
+            if self._deadlines.get(rental_id) == deadline:
+                return deadline
+            heapq.heappop(self._heap)
+        return None
+
+    def _pop_due(self, now: float) -> List[int]:
+        """Извлечение всех аренд, срок которых наступил"""
+        due = []
+        while True:
+            deadline = self._next_deadline()
+            if deadline is None or deadline + self.GRACE_SECONDS > now:
+                return due
+            _, rental_id = heapq.heappop(self._heap)
+            del self._deadlines[rental_id]
+            due.append(rental_id)
+
+    def _retry(self, rental_ids: List[int]):
+        """Повторная постановка наступивших сроков, не завершенных из-за ошибки"""
+        deadline = time.time() + self.retry_seconds - self.GRACE_SECONDS
+        with self._cond:
+            for rental_id in rental_ids:
+                # Аренда, продленная за это время, уже в очереди с новым сроком
+                if rental_id not in self._deadlines:
+                    self._deadlines[rental_id] = deadline
+                    heapq.heappush(self._heap, (deadline, rental_id))
+            self._cond.notify_all()
+
+    def _run(self):
+        """Основной цикл: сон до ближайшего срока или до пересинхронизации"""
+        next_resync = time.monotonic() + self.resync_seconds
+
+        while True:
+            with self._cond:
+                if not self.running:
+                    return
+
+                deadline = self._next_deadline()
+                wait = next_resync - time.monotonic()
+                if deadline is not None:
+                    wait = min(wait, deadline + self.GRACE_SECONDS - time.time())
+
+                if wait > 0:
+                    self._cond.wait(wait)
+                    continue
+
+                due = self._pop_due(time.time())
+
+            try:
+                if due:
+                    self.logger.info(f"⏰ Наступил срок окончания {len(due)} аренд")
+                    try:
+                        self.on_expire()
+                    except Exception as e:
+                        self.logger.error(f"❌ Ошибка завершения аренд: {e}")
+                    # Аренды, уже завершенные раньше, не повторяются; проверяются только наступившие
+                    try:
+                        still_active = self.db.get_active_rental_ids(due)
+                    except Exception as e:
+                        self.logger.error(f"❌ Ошибка проверки завершенных аренд: {e}")
+                        still_active = due
+                    if still_active:
+                        self.logger.warning(f"⚠️ Не завершено {len(still_active)} из {len(due)} аренд, "
+                                            f"повтор через {self.retry_seconds} с")
+                        self._retry(still_active)
+
+                if time.monotonic() >= next_resync:
+                    # Подхватываем аренды, созданные в обход Database (другой процесс, ручной SQL)
+                    self.reload()
+                    next_resync = time.monotonic() + self.resync_seconds
+
+            except Exception as e:
+                self.logger.error(f"❌ Ошибка планировщика окончания аренд: {e}")
@@ -14,12 +14,15 @@ import logging
 from cryptography.fernet import Fernet
 import base64
 from pathlib import Path
+from db_pool import get_pool
+from config import Config
 
 class SettingsManager:
     """Менеджер настроек и токенов"""
     
     def __init__(self, db_path: str = "steam_rental.db"):
         self.db_path = db_path
+        self.pool = get_pool(self.db_path)
         self.logger = logging.getLogger(__name__)
         self.encryption_key = self._get_or_create_encryption_key()
         self.setup_database()
@@ -49,7 +52,7 @@ class SettingsManager:
     
     def setup_database(self):
         """Настройка базы данных для настроек"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.pool.connection() as conn:
             cursor = conn.cursor()
             
             # Таблица настроек
@@ -144,7 +147,12 @@ class SettingsManager:
                 "password": "",
                 "auto_login": "1",
                 "headless_mode": "1",
-                "message_delay": "3"
+                "message_delay": "3",
+                "order_poll_min_seconds": str(Config.ORDER_POLL_MIN_SECONDS),
+                "order_poll_max_seconds": str(Config.ORDER_POLL_MAX_SECONDS),
+                "order_poll_backoff": str(Config.ORDER_POLL_BACKOFF),
+                "order_poll_jitter": str(Config.ORDER_POLL_JITTER),
+                "order_poll_budget_per_hour": str(Config.ORDER_POLL_BUDGET_PER_HOUR)
             },
             "steam": {
                 "api_key": "",
@@ -184,15 +192,22 @@ class SettingsManager:
             }
         }
         
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT category, key FROM application_settings")
+            existing = set(cursor.fetchall())
+        
+        # Добавляем только отсутствующие настройки, измененные значения сохраняются
         for category, settings in default_settings.items():
             for key, value in settings.items():
-                self.set_setting(category, key, value, description=f"Базовая настройка {category}.{key}")
+                if (category, key) not in existing:
+                    self.set_setting(category, key, value, description=f"Базовая настройка {category}.{key}")
     
     def set_setting(self, category: str, key: str, value: str, 
                    encrypted: bool = False, description: str = "", user_id: str = "system") -> bool:
         """Установка настройки"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.pool.connection() as conn:
                 cursor = conn.cursor()
                 
                 # Получаем старое значение для истории
@@ -234,7 +249,7 @@ class SettingsManager:
     def get_setting(self, category: str, key: str, default: str = "") -> str:
         """Получение настройки"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.pool.connection() as conn:
                 cursor = conn.cursor()
                 
                 cursor.execute("""
@@ -258,7 +273,7 @@ class SettingsManager:
     def get_category_settings(self, category: str) -> Dict[str, str]:
         """Получение всех настроек категории"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.pool.connection() as conn:
                 cursor = conn.cursor()
                 
                 cursor.execute("""
@@ -282,7 +297,7 @@ class SettingsManager:
     def get_all_settings(self) -> Dict[str, Dict[str, str]]:
         """Получение всех настроек"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.pool.connection() as conn:
                 cursor = conn.cursor()
                 
                 cursor.execute("""
@@ -311,7 +326,7 @@ class SettingsManager:
     def delete_setting(self, category: str, key: str) -> bool:
         """Удаление настройки"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.pool.connection() as conn:
                 cursor = conn.cursor()
                 
                 # Получаем значение для истории
@@ -351,7 +366,7 @@ class SettingsManager:
                   expires_at: Optional[datetime] = None, description: str = "") -> bool:
         """Установка API токена"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.pool.connection() as conn:
                 cursor = conn.cursor()
                 
                 # Шифруем токен
@@ -375,7 +390,7 @@ class SettingsManager:
     def get_token(self, service_name: str, token_type: str) -> Optional[str]:
         """Получение API токена"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.pool.connection() as conn:
                 cursor = conn.cursor()
                 
                 cursor.execute("""
@@ -417,7 +432,7 @@ class SettingsManager:
     def get_all_tokens(self) -> List[Dict[str, Any]]:
         """Получение всех токенов"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.pool.connection() as conn:
                 cursor = conn.cursor()
                 
                 cursor.execute("""
@@ -448,7 +463,7 @@ class SettingsManager:
     def delete_token(self, service_name: str, token_type: str) -> bool:
         """Удаление API токена"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.pool.connection() as conn:
                 cursor = conn.cursor()
                 
                 cursor.execute("""
@@ -468,7 +483,7 @@ class SettingsManager:
                               created_by: str = "system") -> int:
         """Создание профиля настроек"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.pool.connection() as conn:
                 cursor = conn.cursor()
                 
                 cursor.execute("""
@@ -488,7 +503,7 @@ class SettingsManager:
     def save_settings_to_profile(self, profile_id: int, settings: Dict[str, Dict[str, str]]) -> bool:
         """Сохранение настроек в профиль"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.pool.connection() as conn:
                 cursor = conn.cursor()
                 
                 # Очищаем старые настройки профиля
@@ -513,7 +528,7 @@ class SettingsManager:
     def load_settings_from_profile(self, profile_id: int) -> Dict[str, Dict[str, str]]:
         """Загрузка настроек из профиля"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.pool.connection() as conn:
                 cursor = conn.cursor()
                 
                 cursor.execute("""
@@ -539,7 +554,7 @@ class SettingsManager:
     def get_settings_profiles(self) -> List[Dict[str, Any]]:
         """Получение всех профилей настроек"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.pool.connection() as conn:
                 cursor = conn.cursor()
                 
                 cursor.execute("""
@@ -677,7 +692,7 @@ class SettingsManager:
     def _get_last_modified_setting(self) -> Optional[str]:
         """Получение времени последнего изменения настроек"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.pool.connection() as conn:
                 cursor = conn.cursor()
                 
                 cursor.execute("""
@@ -8,18 +8,41 @@
 import time
 import schedule
 import threading
-import sqlite3
 from datetime import datetime, timedelta
+from typing import List
 from config import Config
 from database import Database
 from steam_manager import SteamManager
 from funpay_manager import FunPayManager
+from rental_expiry_scheduler import RentalExpiryScheduler
+from order_pipeline import OrderPipeline
+from order_poller import AdaptiveOrderPoller
+from settings_manager import SettingsManager
+from job_executor import JobExecutor
+from db_backup import DatabaseBackup
+from password_rotation import PasswordRotator
+from messaging import create_message_sender
+from bulk_messaging import BulkMessageDispatcher
 
 class SteamRentalSystem:
     def __init__(self):
         self.db = Database()
         self.steam_manager = SteamManager()
-        self.funpay_manager = FunPayManager()
+        self.funpay_manager = FunPayManager(self.db)
+        self.expiry_scheduler = RentalExpiryScheduler(self.db, self.check_expired_rentals)
+        # Сообщения покупателям: HTTP, браузер только при неудаче
+        self.messages = create_message_sender(self.funpay_manager)
+        self.bulk_messages = BulkMessageDispatcher(self.db, self.messages.send)
+        self.order_pipeline = OrderPipeline(
+            claim=self.db.start_funpay_order,
+            allocate=self.allocate_order,
+            deliver=self.deliver_order,
+            finish=self.finish_order
+        )
+        self.settings = SettingsManager(self.db.db_path)
+        self.order_poller = AdaptiveOrderPoller(self.check_new_orders, self.settings)
+        self.jobs = JobExecutor()
+        self.password_rotator = PasswordRotator(self.db, self.steam_manager)
         self.running = False
         
     def start(self):
@@ -35,20 +58,30 @@ class SteamRentalSystem:
     
     def setup_scheduler(self):
         """Настройка планировщика задач"""
-        # Проверка истекших аренд каждые 5 минут
-        schedule.every(5).minutes.do(self.check_expired_rentals)
+        # Окончание аренд обрабатывается точно в срок, без периодического опроса
+        self.expiry_scheduler.start()
         
-        # Проверка новых заказов каждые 10 минут
-        schedule.every(10).minutes.do(self.check_new_orders)
+        # Обработчики заказов забирают заказы из очереди по мере поступления
+        self.order_pipeline.start()
         
+        # Смена паролей освобожденных аккаунтов
+        self.password_rotator.start()
+        
+        # Проверка новых заказов с интервалом, подстраивающимся под активность
+        self.order_poller.start()
+        
+        # Рассылки, прерванные прошлой остановкой, продолжаются в фоне
+        self.jobs.job('resume_campaigns', self.bulk_messages.resume)()
+        
+        # Остальные задачи выполняются в отдельных потоках, основной цикл только запускает их
         # Проверка новых отзывов каждые 15 минут
-        schedule.every(15).minutes.do(self.check_new_reviews)
+        schedule.every(15).minutes.do(self.jobs.job('check_new_reviews', self.check_new_reviews, timeout=300))
         
         # Синхронизация с FunPay каждые 30 минут
-        schedule.every(30).minutes.do(self.sync_with_funpay)
+        schedule.every(30).minutes.do(self.jobs.job('sync_with_funpay', self.sync_with_funpay, timeout=900))
         
         # Резервное копирование базы данных каждый день в 3:00
-        schedule.every().day.at("03:00").do(self.backup_database)
+        schedule.every().day.at("03:00").do(self.jobs.job('backup_database', self.backup_database, timeout=1800))
         
         print("📅 Планировщик задач настроен")
     
@@ -58,8 +91,9 @@ class SteamRentalSystem:
         
         try:
             while self.running:
-                # Выполняем запланированные задачи
+                # Запускаем наступившие задачи и отмечаем зависшие
                 schedule.run_pending()
+                self.jobs.check_timeouts()
                 
                 # Небольшая пауза
                 time.sleep(1)
@@ -76,14 +110,14 @@ class SteamRentalSystem:
         try:
             print("⏰ Проверка истекших аренд...")
             
-            # Получаем количество истекших аренд
-            expired_count = self.db.end_expired_rentals()
+            # Завершаем истекшие аренды одной транзакцией; аккаунты выдаются снова только после смены пароля
+            freed_account_ids = self.db.end_expired_rentals_batch(hold_for_rotation=True)
             
-            if expired_count > 0:
-                print(f"🔄 Обработано {expired_count} истекших аренд")
+            if freed_account_ids:
+                print(f"🔄 Освобождено {len(freed_account_ids)} аккаунтов после истекших аренд")
                 
-                # Изменяем пароли для освобожденных аккаунтов
-                self.change_passwords_for_expired_accounts()
+                # Изменяем пароли только для освобожденных аккаунтов
+                self.change_passwords_for_expired_accounts(freed_account_ids)
                 
                 # Обновляем объявления на FunPay
                 self.update_funpay_listings()
@@ -93,37 +127,15 @@ class SteamRentalSystem:
         except Exception as e:
             print(f"❌ Ошибка при проверке истекших аренд: {e}")
     
-    def change_passwords_for_expired_accounts(self):
-        """Изменение паролей для истекших аккаунтов"""
-        try:
-            print("🔑 Изменение паролей для истекших аккаунтов...")
-            
-            # Получаем список освобожденных аккаунтов
-            available_accounts = self.db.get_available_accounts_list()
-            
-            for account in available_accounts:
-                # Генерируем новый пароль
-                new_password = self.steam_manager.generate_password()
-                
-                # Изменяем пароль в Steam
-                if self.steam_manager.change_steam_password(
-                    account['username'], 
-                    account['password'], 
-                    new_password
-                ):
-                    # Обновляем пароль в базе данных
-                    self.update_account_password(account['id'], new_password)
-                    print(f"✅ Пароль изменен для аккаунта {account['username']}")
-                else:
-                    print(f"❌ Не удалось изменить пароль для {account['username']}")
-                    
-        except Exception as e:
-            print(f"❌ Ошибка при изменении паролей: {e}")
+    def change_passwords_for_expired_accounts(self, account_ids: List[int]):
+        """Постановка освобожденных аккаунтов в очередь смены пароля"""
+        queued = self.password_rotator.submit(account_ids)
+        print(f"🔑 В очереди смены пароля: {queued} аккаунтов")
     
     def update_account_password(self, account_id: int, new_password: str):
         """Обновление пароля аккаунта в базе данных"""
         try:
-            with sqlite3.connect(self.db.db_path) as conn:
+            with self.db.pool.connection() as conn:
                 cursor = conn.cursor()
                 cursor.execute('''
                     UPDATE steam_accounts 
@@ -135,65 +147,113 @@ class SteamRentalSystem:
         except Exception as e:
             print(f"❌ Ошибка при обновлении пароля в БД: {e}")
     
-    def check_new_orders(self):
-        """Проверка новых заказов на FunPay"""
+    def check_new_orders(self) -> int:
+        """Проверка новых заказов на FunPay, возвращает число новых заказов"""
+        new_orders = []
         try:
             print("📋 Проверка новых заказов...")
             
-            # Проверяем новые заказы через FunPay
-            new_orders = self.funpay_manager.check_new_orders()
-            
-            if new_orders:
+            # Разбираем только заказы, появившиеся после последнего увиденного;
+            # опрос частый, поэтому страница всегда проверяется условным запросом
+            fresh_orders = self.db.get_unseen_funpay_orders(self.funpay_manager.get_orders(max_age=0))
+            if fresh_orders:
+                new_orders = self.funpay_manager.filter_new_orders(fresh_orders)
+                self.db.record_funpay_orders(fresh_orders)
                 print(f"🆕 Найдено {len(new_orders)} новых заказов")
-                
-                for order in new_orders:
-                    # Обрабатываем заказ
-                    self.process_new_order(order)
-            else:
+            
+            # Заказы, которые так и не удалось выдать, снимаются с выдачи явно
+            for order in self.db.abandon_stale_funpay_orders():
+                print(f"🚫 Заказ {order['id']} ({order['game_name']}) снят с выдачи: "
+                      f"{'нет свободного аккаунта' if order['state'] == 'no_account' else 'исчерпаны попытки'}")
+            
+            # Новые заказы и заказы с неудачной попыткой выдачи
+            pending_orders = self.db.get_pending_funpay_orders()
+            if not pending_orders:
                 print("✅ Новых заказов не найдено")
+                return 0
+            
+            # Выдачу выполняют обработчики конвейера; при заполненной очереди
+            # оставшиеся заказы ждут следующего опроса в базе
+            queued = 0
+            for order in pending_orders:
+                if not self.order_pipeline.has_capacity():
+                    print("⚠️ Очередь заказов заполнена, остальные заказы будут взяты позже")
+                    break
+                queued += int(self.order_pipeline.submit(order))
+            print(f"📦 Поставлено в очередь заказов: {queued}")
                 
         except Exception as e:
             print(f"❌ Ошибка при проверке заказов: {e}")
+        
+        return len(new_orders)
     
-    def process_new_order(self, order: dict):
-        """Обработка нового заказа"""
+    def allocate_order(self, order: dict):
+        """Выбор и захват аккаунта под заказ, возвращает данные для отправки"""
         try:
             print(f"🔄 Обработка заказа {order['id']} для игры {order['game_name']}")
             
-            # Ищем доступный аккаунт для игры
-            available_accounts = self.db.get_available_accounts_list()
-            # Фильтруем по игре
-            available_accounts = [acc for acc in available_accounts if acc['game_name'] == order['game_name']]
+            # Парсим длительность аренды
+            duration_hours = self.parse_duration(order.get('duration', ''))
             
-            if available_accounts:
-                # Берем первый доступный аккаунт
-                account = available_accounts[0]
-                
-                # Парсим длительность аренды
-                duration_hours = self.parse_duration(order['duration'])
-                
-                # Арендуем аккаунт
-                if self.db.create_rental(account['id'], order['id'], duration_hours):
-                    # Отправляем данные аккаунта через FunPay
-                    account_data = {
-                        'username': account['username'],
-                        'password': account['password'],
-                        'game_name': account['game_name'],
-                        'duration': duration_hours,
-                        'start_time': datetime.now().strftime("%Y-%m-%d %H:%M")
-                    }
-                    
-                    if self.funpay_manager.process_order(order['id'], account_data):
-                        print(f"✅ Заказ {order['id']} обработан успешно")
-                    else:
-                        print(f"❌ Не удалось отправить данные для заказа {order['id']}")
-                else:
-                    print(f"❌ Не удалось арендовать аккаунт для заказа {order['id']}")
-            else:
+            # Повторная попытка по заказу отправляет уже выданный аккаунт,
+            # иначе выбираем и занимаем свободный аккаунт за одну транзакцию
+            account = (self.db.get_order_rental_account(order['id'])
+                       or self.db.claim_free_account(order['game_name'], order['id'], duration_hours))
+            
+            if not account:
                 print(f"❌ Нет доступных аккаунтов для игры {order['game_name']}")
+                return None
+            
+            return {
+                'username': account['username'],
+                'password': account['password'],
+                'game_name': account['game_name'],
+                'duration': duration_hours,
+                'start_time': datetime.now().strftime("%Y-%m-%d %H:%M"),
+                'rental_id': account['rental_id']
+            }
                 
         except Exception as e:
             print(f"❌ Ошибка при обработке заказа {order['id']}: {e}")
+            return None
+    
+    def deliver_order(self, order_id: str, account_data: dict) -> bool:
+        """Отправка данных аккаунта покупателю"""
+        return self.messages.send_template(order_id, 'account_data', **account_data)
+    
+    def finish_order(self, order_id: str, state: str, account_data: dict = None):
+        """Фиксация результата обработки заказа"""
+        self.db.finish_funpay_order(order_id, state, account_data['rental_id'] if account_data else None)
+        if state in ('delivered', 'failed'):
+            self.report_deliveries({order_id: state == 'delivered'})
+    
+    def get_metrics(self) -> dict:
+        """Метрики фоновой обработки"""
+        return {
+            'order_pipeline': self.order_pipeline.get_metrics(),
+            'order_poller': self.order_poller.get_metrics(),
+            'jobs': self.jobs.get_metrics(),
+            'password_rotation': self.password_rotator.get_metrics(),
+            'messages': self.messages.get_metrics(),
+            'bulk_messages': self.bulk_messages.get_metrics(),
+            'funpay_rate_limiter': self.funpay_manager.limiter.get_metrics()
+        }
+    
+    def notify_active_renters(self, message: str, name: str = "Уведомление арендаторам") -> dict:
+        """Рассылка сообщения по заказам всех активных аренд, возвращает отчет"""
+        order_ids = self.db.get_active_rental_order_ids()
+        print(f"📢 Рассылка «{name}»: получателей {len(order_ids)}")
+        report = self.bulk_messages.send(name, order_ids, message)
+        print(f"✅ Отправлено {report['sent']}/{report['total']}, ошибок {report['failed']}")
+        return report
+    
+    def report_deliveries(self, results: dict):
+        """Вывод результатов отправки данных по заказам"""
+        for order_id, success in results.items():
+            if success:
+                print(f"✅ Заказ {order_id} обработан успешно")
+            else:
+                print(f"❌ Не удалось отправить данные для заказа {order_id}")
     
     def parse_duration(self, duration_str: str) -> int:
         """Парсинг длительности аренды"""
@@ -214,39 +274,30 @@ class SteamRentalSystem:
         try:
             print("⭐ Проверка новых отзывов...")
             
-            # Проверяем новые отзывы через FunPay
-            new_reviews = self.funpay_manager.check_reviews()
+            # Берем только отзывы, появившиеся после последнего обработанного
+            new_reviews = self.db.get_unseen_funpay_reviews(self.funpay_manager.get_reviews())
             
             if new_reviews:
                 print(f"🆕 Найдено {len(new_reviews)} новых отзывов")
-                
-                for review in new_reviews:
-                    # Обрабатываем отзыв
-                    self.process_new_review(review)
+                self.process_reviews(new_reviews)
             else:
                 print("✅ Новых отзывов не найдено")
                 
         except Exception as e:
             print(f"❌ Ошибка при проверке отзывов: {e}")
     
+    def process_reviews(self, reviews: List[dict]):
+        """Пакетная обработка отзывов: бонус +30 минут за оценку 4-5 звезд"""
+        result = self.db.process_reviews_batch(reviews, bonus_minutes=30)
+        print(f"✅ Обработано отзывов: {result['processed']}, начислено бонусов: {result['bonuses']}")
+        for order_id in result['unmatched']:
+            print(f"❌ Не удалось найти пользователя для заказа {order_id}")
+    
     def process_new_review(self, review: dict):
         """Обработка нового отзыва"""
         try:
             print(f"🔄 Обработка отзыва {review['id']}")
-            
-            # Если отзыв положительный (4-5 звезд), добавляем бонусное время
-            if review['rating'] >= 4:
-                # Находим пользователя по order_id
-                user_id = self.find_user_by_order(review['order_id'])
-                
-                if user_id:
-                    # Добавляем бонусное время (30 минут)
-                    self.add_bonus_time_to_user(user_id, 30)
-                    print(f"🎁 Добавлено 30 минут бонусного времени для пользователя {user_id}")
-                else:
-                    print(f"❌ Не удалось найти пользователя для заказа {review['order_id']}")
-            else:
-                print(f"📝 Отзыв {review['id']} не подходит для бонуса (оценка: {review['rating']})")
+            self.process_reviews([review])
                 
         except Exception as e:
             print(f"❌ Ошибка при обработке отзыва {review['id']}: {e}")
@@ -254,7 +305,7 @@ class SteamRentalSystem:
     def find_user_by_order(self, order_id: str) -> str:
         """Поиск пользователя по ID заказа"""
         try:
-            with sqlite3.connect(self.db.db_path) as conn:
+            with self.db.pool.connection() as conn:
                 cursor = conn.cursor()
                 cursor.execute('''
                     SELECT renter_id FROM rentals 
@@ -286,13 +337,10 @@ class SteamRentalSystem:
         try:
             print("🔄 Синхронизация с FunPay...")
             
-            # Проверяем статус заказов
-            orders = self.funpay_manager.check_new_orders()
-            
-            # Проверяем отзывы
-            reviews = self.funpay_manager.check_reviews()
+            # Заказы и отзывы загружаются параллельно
+            result = self.funpay_manager.sync_with_funpay()
             
-            print(f"✅ Синхронизация завершена. Заказов: {len(orders)}, отзывов: {len(reviews)}")
+            print(f"✅ Синхронизация завершена. Заказов: {len(result['orders'])}, отзывов: {len(result['reviews'])}")
             
         except Exception as e:
             print(f"❌ Ошибка при синхронизации с FunPay: {e}")
@@ -302,12 +350,13 @@ class SteamRentalSystem:
         try:
             print("💾 Создание резервной копии базы данных...")
             
-            # Здесь должна быть логика создания резервной копии
-            # Для демонстрации просто логируем
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            backup_filename = f"steam_rental_backup_{timestamp}.db"
+            # Копирование порциями не блокирует бота и обработку заказов
+            generations = self.settings.get_setting('database', 'max_backups', str(Config.BACKUP_GENERATIONS))
+            backup = DatabaseBackup(self.db.db_path, generations=int(generations))
+            result = backup.create()
             
-            print(f"✅ Резервная копия создана: {backup_filename}")
+            print(f"✅ Резервная копия создана: {result['path']} "
+                  f"({result['size'] // 1024} КБ, удалено старых: {len(result['removed'])})")
             
         except Exception as e:
             print(f"❌ Ошибка при создании резервной копии: {e}")
@@ -318,7 +367,30 @@ class SteamRentalSystem:
         
         self.running = False
         
+        # Останавливаем планировщик окончания аренд
+        self.expiry_scheduler.stop()
+        
+        # Останавливаем периодические задачи
+        schedule.clear()
+        self.jobs.shutdown()
+        
+        # Останавливаем опрос заказов
+        self.order_poller.stop()
+        
+        # Дожидаемся заказов, уже взятых обработчиками
+        self.order_pipeline.stop()
+        
+        # Аккаунты без смены пароля остаются в ожидании до следующего запуска
+        self.password_rotator.stop()
+        
+        # Неотправленные сообщения рассылок продолжатся при следующем запуске
+        self.bulk_messages.stop()
+        
         # Закрываем FunPay менеджер
+        self.messages.close()
         self.funpay_manager.close()
         
+        # Закрываем соединения с базой данных
+        self.db.pool.close_all()
+        
         print("✅ Система остановлена")
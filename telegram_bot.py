@@ -11,12 +11,13 @@ from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import Application, CommandHandler, MessageHandler, CallbackQueryHandler, filters, ContextTypes
 from config import Config
 from database import Database
+from async_database import AsyncDatabase
 
 class SteamRentalBot:
     def __init__(self):
         self.token = Config.TELEGRAM_TOKEN
         self.admin_id = Config.TELEGRAM_ADMIN_ID
-        self.db = Database()
+        self.db = AsyncDatabase(Database())
         self.application = None
         
         # Настройка логирования
@@ -90,7 +91,7 @@ class SteamRentalBot:
         user = update.effective_user
         
         # Добавляем пользователя в базу данных
-        self.db.add_user(
+        await self.db.add_user(
             telegram_id=str(user.id),
             username=user.username,
             first_name=user.first_name,
@@ -156,10 +157,11 @@ class SteamRentalBot:
     async def status_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Обработчик команды /status"""
         try:
-            # Получаем статистику из базы данных
-            total_accounts = self.db.get_total_accounts()
-            available_accounts = self.db.get_available_accounts()
-            active_rentals = self.db.get_active_rentals()
+            # Получаем статистику из общего кэшированного снимка
+            stats = await self.db.get_stats_snapshot()
+            total_accounts = stats['total_accounts']
+            available_accounts = stats['available_accounts']
+            active_rentals = stats['active_rentals']
             
             status_text = f"""
 📊 Статус системы
@@ -184,19 +186,45 @@ class SteamRentalBot:
         
         await update.message.reply_text(status_text)
     
-    async def accounts_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+    async def _reply(self, update: Update, text: str, reply_markup: InlineKeyboardMarkup = None):
+        """Ответ на команду или редактирование сообщения при нажатии кнопки"""
+        if update.callback_query:
+            await update.callback_query.edit_message_text(text, reply_markup=reply_markup)
+        else:
+            await update.message.reply_text(text, reply_markup=reply_markup)
+    
+    def _page_buttons(self, prefix: str, page: dict) -> list:
+        """Кнопки перехода между страницами списка"""
+        items = page['items']
+        buttons = []
+        if items and page['has_prev']:
+            buttons.append(InlineKeyboardButton("⬅️ Назад", callback_data=f"{prefix}_prev_{items[0]['id']}"))
+        if items and page['has_next']:
+            buttons.append(InlineKeyboardButton("Далее ➡️", callback_data=f"{prefix}_next_{items[-1]['id']}"))
+        return [buttons] if buttons else []
+    
+    def _parse_page_callback(self, data: str) -> tuple:
+        """Разбор callback_data страницы: (after_id, before_id)"""
+        _, direction, item_id = data.rsplit("_", 2)
+        if direction == "prev":
+            return 0, int(item_id)
+        return int(item_id), None
+    
+    async def accounts_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE,
+                               after_id: int = 0, before_id: int = None):
         """Обработчик команды /accounts"""
         try:
-            accounts = self.db.get_available_accounts_list()
+            page = await self.db.get_accounts_page(after_id, before_id, Config.BOT_PAGE_SIZE, available_only=True)
+            accounts = page['items']
             
             if not accounts:
-                await update.message.reply_text("❌ Нет доступных аккаунтов в данный момент.")
+                await self._reply(update, "❌ Нет доступных аккаунтов в данный момент.")
                 return
             
             text = "📋 Доступные аккаунты:\n\n"
             keyboard = []
             
-            for i, account in enumerate(accounts[:10]):  # Показываем максимум 10
+            for account in accounts:
                 text += f"🎮 Аккаунт #{account['id']}\n"
                 text += f"📝 Описание: {account.get('description', 'Нет описания')}\n"
                 text += f"💰 Цена: {account.get('price', 'Не указана')} руб/час\n\n"
@@ -206,21 +234,20 @@ class SteamRentalBot:
                     callback_data=f"rent_account_{account['id']}"
                 )])
             
-            if len(accounts) > 10:
-                text += f"... и еще {len(accounts) - 10} аккаунтов"
+            keyboard.extend(self._page_buttons("accounts_page", page))
             
             reply_markup = InlineKeyboardMarkup(keyboard)
-            await update.message.reply_text(text, reply_markup=reply_markup)
+            await self._reply(update, text, reply_markup)
             
         except Exception as e:
-            await update.message.reply_text(f"❌ Ошибка получения аккаунтов: {e}")
+            await self._reply(update, f"❌ Ошибка получения аккаунтов: {e}")
     
     async def rentals_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Обработчик команды /rentals"""
         user_id = update.effective_user.id
         
         try:
-            rentals = self.db.get_user_rentals(user_id)
+            rentals = await self.db.get_user_rentals(user_id)
             
             if not rentals:
                 await update.message.reply_text("📭 У вас нет активных аренд.")
@@ -289,10 +316,11 @@ class SteamRentalBot:
         """
         
         try:
-            total_accounts = self.db.get_total_accounts()
-            available_accounts = self.db.get_available_accounts()
-            active_rentals = self.db.get_active_rentals()
-            total_users = self.db.get_total_users()
+            stats = await self.db.get_stats_snapshot()
+            total_accounts = stats['total_accounts']
+            available_accounts = stats['available_accounts']
+            active_rentals = stats['active_rentals']
+            total_users = stats['total_users']
             
             admin_text += f"""
 • Всего аккаунтов: {total_accounts}
@@ -321,6 +349,9 @@ class SteamRentalBot:
         
         if data == "show_accounts":
             await self.accounts_command(update, context)
+        elif data.startswith("accounts_page_"):
+            after_id, before_id = self._parse_page_callback(data)
+            await self.accounts_command(update, context, after_id, before_id)
         elif data == "show_status":
             await self.status_command(update, context)
         elif data == "show_help":
@@ -341,6 +372,14 @@ class SteamRentalBot:
             await self.admin_accounts(update, context)
         elif data == "admin_list_accounts":
             await self.admin_list_accounts(update, context)
+        elif data.startswith("admin_accounts_page_"):
+            after_id, before_id = self._parse_page_callback(data)
+            await self.admin_list_accounts(update, context, after_id, before_id)
+        elif data == "admin_rentals":
+            await self.admin_rentals(update, context)
+        elif data.startswith("admin_rentals_page_"):
+            after_id, before_id = self._parse_page_callback(data)
+            await self.admin_rentals(update, context, after_id, before_id)
         elif data == "admin_delete_account":
             await self.admin_delete_account(update, context)
         elif data.startswith("delete_account_"):
@@ -359,7 +398,7 @@ class SteamRentalBot:
         user_id = update.effective_user.id
         
         try:
-            account = self.db.get_account(account_id)
+            account = await self.db.get_account(account_id)
             if not account:
                 await update.callback_query.edit_message_text("❌ Аккаунт не найден.")
                 return
@@ -393,13 +432,13 @@ class SteamRentalBot:
         user_id = update.effective_user.id
         
         try:
-            account = self.db.get_account(account_id)
+            account = await self.db.get_account(account_id)
             if not account:
                 await update.callback_query.edit_message_text("❌ Аккаунт не найден.")
                 return
             
             # Создаем аренду
-            success = self.db.create_rental(int(account_id), str(user_id), duration)
+            success = await self.db.create_rental(int(account_id), str(user_id), duration)
             
             if success:
                 total_cost = duration * account.get('price', 50)
@@ -445,7 +484,7 @@ class SteamRentalBot:
             return
         
         try:
-            stats = self.db.get_detailed_stats()
+            stats = await self.db.get_stats_snapshot()
             
             text = """
 📊 Детальная статистика
@@ -483,7 +522,7 @@ class SteamRentalBot:
             return
         
         try:
-            users = self.db.get_users_list()
+            users = await self.db.get_users_list()
             
             text = "👥 Список пользователей:\n\n"
             
@@ -526,35 +565,36 @@ class SteamRentalBot:
         
         await update.callback_query.edit_message_text(text, reply_markup=reply_markup)
     
-    async def admin_list_accounts(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+    async def admin_list_accounts(self, update: Update, context: ContextTypes.DEFAULT_TYPE,
+                                  after_id: int = 0, before_id: int = None):
         """Показать список всех аккаунтов для админа"""
         user_id = update.effective_user.id
         
         if str(user_id) != self.admin_id:
             return
         
+        page_buttons = []
         try:
-            accounts = self.db.get_all_accounts()
+            page = await self.db.get_accounts_page(after_id, before_id, Config.BOT_PAGE_SIZE)
+            accounts = page['items']
+            page_buttons = self._page_buttons("admin_accounts_page", page)
             
             if not accounts:
                 text = "📭 Нет аккаунтов в системе."
             else:
                 text = "📋 Список всех аккаунтов:\n\n"
                 
-                for account in accounts[:10]:  # Показываем первые 10
+                for account in accounts:
                     status = "🔴 В аренде" if account['is_rented'] else "🟢 Свободен"
                     text += f"🎮 #{account['id']} - {account['username']}\n"
                     text += f"📝 Игра: {account['game_name']}\n"
                     text += f"📊 Статус: {status}\n"
                     text += f"📅 Создан: {account['created_at']}\n\n"
-                
-                if len(accounts) > 10:
-                    text += f"... и еще {len(accounts) - 10} аккаунтов"
             
         except Exception as e:
             text = f"❌ Ошибка получения аккаунтов: {e}"
         
-        keyboard = [
+        keyboard = page_buttons + [
             [InlineKeyboardButton("🗑️ Удалить аккаунт", callback_data="admin_delete_account")],
             [InlineKeyboardButton("« Назад", callback_data="admin_accounts")]
         ]
@@ -570,7 +610,7 @@ class SteamRentalBot:
             return
         
         try:
-            accounts = self.db.get_all_accounts()
+            accounts = await self.db.get_all_accounts()
             available_accounts = [acc for acc in accounts if not acc['is_rented']]
             
             if not available_accounts:
@@ -608,7 +648,7 @@ class SteamRentalBot:
             return
         
         try:
-            account = self.db.get_account(account_id)
+            account = await self.db.get_account(account_id)
             if not account:
                 await update.callback_query.edit_message_text("❌ Аккаунт не найден.")
                 return
@@ -644,7 +684,7 @@ class SteamRentalBot:
             return
         
         try:
-            success = self.db.delete_account(int(account_id))
+            success = await self.db.delete_account(int(account_id))
             
             if success:
                 text = f"""
@@ -733,22 +773,26 @@ class SteamRentalBot:
         
         await update.callback_query.edit_message_text(text, reply_markup=reply_markup)
     
-    async def admin_rentals(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+    async def admin_rentals(self, update: Update, context: ContextTypes.DEFAULT_TYPE,
+                            after_id: int = 0, before_id: int = None):
         """Показать управление арендами для админа"""
         user_id = update.effective_user.id
         
         if str(user_id) != self.admin_id:
             return
         
+        page_buttons = []
         try:
-            active_rentals = self.db.get_active_rentals_list()
+            page = await self.db.get_active_rentals_page(after_id, before_id, Config.BOT_PAGE_SIZE)
+            active_rentals = page['items']
+            page_buttons = self._page_buttons("admin_rentals_page", page)
             
             if not active_rentals:
                 text = "📭 Нет активных аренд в системе."
             else:
                 text = "📋 Активные аренды:\n\n"
                 
-                for rental in active_rentals[:10]:  # Показываем первые 10
+                for rental in active_rentals:
                     end_time = datetime.fromisoformat(rental['end_time'])
                     remaining = end_time - datetime.now()
                     
@@ -762,14 +806,11 @@ class SteamRentalBot:
                         text += f"🕐 Завершение: {end_time.strftime('%Y-%m-%d %H:%M')}\n\n"
                     else:
                         text += f"🎮 Аккаунт #{rental['account_id']} - Истек\n\n"
-                
-                if len(active_rentals) > 10:
-                    text += f"... и еще {len(active_rentals) - 10} аренд"
             
         except Exception as e:
             text = f"❌ Ошибка получения аренд: {e}"
         
-        keyboard = [
+        keyboard = page_buttons + [
             [InlineKeyboardButton("🔄 Обновить", callback_data="admin_rentals")],
             [InlineKeyboardButton("« Назад", callback_data="admin_back")]
         ]
@@ -832,9 +873,10 @@ class SteamRentalBot:
                 return
             
             # Добавляем аккаунт в базу данных
-            success = self.db.add_account(username, password, game_name, price, description)
+            success = await self.db.add_account(username, password, game_name, price, description)
             
             if success:
+                total_accounts = await self.db.get_total_accounts()
                 await update.message.reply_text(f"""
 ✅ Аккаунт успешно добавлен и проверен!
 
@@ -845,7 +887,7 @@ class SteamRentalBot:
 📄 Описание: {description if description else 'Не указано'}
 ✅ Steam API: Проверен
 
-📊 Всего аккаунтов: {self.db.get_total_accounts()}
+📊 Всего аккаунтов: {total_accounts}
                 """)
             else:
                 await update.message.reply_text("❌ Не удалось добавить аккаунт. Проверьте данные и попробуйте снова.")
@@ -891,7 +933,7 @@ class SteamRentalBot:
             value = " ".join(args[2:])
             
             # Проверяем, что аккаунт существует
-            account = self.db.get_account(account_id)
+            account = await self.db.get_account(account_id)
             if not account:
                 await update.message.reply_text(f"❌ Аккаунт с ID {account_id} не найден.")
                 return
@@ -911,7 +953,7 @@ class SteamRentalBot:
                     return
             
             # Обновляем аккаунт
-            success = self.db.update_account(account_id, field, value)
+            success = await self.db.update_account(account_id, field, value)
             
             if success:
                 await update.message.reply_text(f"""
@@ -973,7 +1015,7 @@ class SteamRentalBot:
                 return
             
             # Сохраняем токен в базу данных или конфигурацию
-            success = self.db.save_token(token_type, token_value)
+            success = await self.db.save_token(token_type, token_value)
             
             if success:
                 await update.message.reply_text(f"""
@@ -1001,8 +1043,8 @@ class SteamRentalBot:
         
         try:
             # Получаем токены из базы данных
-            funpay_token = self.db.get_token('FUNPAY_TOKEN')
-            steam_token = self.db.get_token('STEAM_API_KEY')
+            funpay_token = await self.db.get_token('FUNPAY_TOKEN')
+            steam_token = await self.db.get_token('STEAM_API_KEY')
             
             text = """
 🔑 Управление токенами
@@ -14,12 +14,13 @@ from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import Application, CommandHandler, MessageHandler, CallbackQueryHandler, filters, ContextTypes
 from config import Config
 from database import Database
+from async_database import AsyncDatabase
 
 class SimpleSteamRentalBot:
     def __init__(self):
         self.token = Config.TELEGRAM_TOKEN
         self.admin_id = Config.TELEGRAM_ADMIN_ID
-        self.db = Database()
+        self.db = AsyncDatabase(Database())
         self.application = None
         
         # Настройка логирования
@@ -102,7 +103,7 @@ class SimpleSteamRentalBot:
         user = update.effective_user
         
         # Добавляем пользователя в базу данных
-        self.db.add_user(
+        await self.db.add_user(
             telegram_id=str(user.id),
             username=user.username,
             first_name=user.first_name,
@@ -168,10 +169,11 @@ class SimpleSteamRentalBot:
     async def status_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Обработчик команды /status"""
         try:
-            # Получаем статистику из базы данных
-            total_accounts = self.db.get_total_accounts()
-            available_accounts = self.db.get_available_accounts()
-            active_rentals = self.db.get_active_rentals()
+            # Получаем статистику из общего кэшированного снимка
+            stats = await self.db.get_stats_snapshot()
+            total_accounts = stats['total_accounts']
+            available_accounts = stats['available_accounts']
+            active_rentals = stats['active_rentals']
             
             status_text = f"""
 📊 Статус системы
@@ -196,19 +198,45 @@ class SimpleSteamRentalBot:
         
         await update.message.reply_text(status_text)
     
-    async def accounts_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+    async def _reply(self, update: Update, text: str, reply_markup: InlineKeyboardMarkup = None):
+        """Ответ на команду или редактирование сообщения при нажатии кнопки"""
+        if update.callback_query:
+            await update.callback_query.edit_message_text(text, reply_markup=reply_markup)
+        else:
+            await update.message.reply_text(text, reply_markup=reply_markup)
+    
+    def _page_buttons(self, prefix: str, page: dict) -> list:
+        """Кнопки перехода между страницами списка"""
+        items = page['items']
+        buttons = []
+        if items and page['has_prev']:
+            buttons.append(InlineKeyboardButton("⬅️ Назад", callback_data=f"{prefix}_prev_{items[0]['id']}"))
+        if items and page['has_next']:
+            buttons.append(InlineKeyboardButton("Далее ➡️", callback_data=f"{prefix}_next_{items[-1]['id']}"))
+        return [buttons] if buttons else []
+    
+    def _parse_page_callback(self, data: str) -> tuple:
+        """Разбор callback_data страницы: (after_id, before_id)"""
+        _, direction, item_id = data.rsplit("_", 2)
+        if direction == "prev":
+            return 0, int(item_id)
+        return int(item_id), None
+    
+    async def accounts_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE,
+                               after_id: int = 0, before_id: int = None):
         """Обработчик команды /accounts"""
         try:
-            accounts = self.db.get_available_accounts_list()
+            page = await self.db.get_accounts_page(after_id, before_id, Config.BOT_PAGE_SIZE, available_only=True)
+            accounts = page['items']
             
             if not accounts:
-                await update.message.reply_text("❌ Нет доступных аккаунтов в данный момент.")
+                await self._reply(update, "❌ Нет доступных аккаунтов в данный момент.")
                 return
             
             text = "📋 Доступные аккаунты:\n\n"
             keyboard = []
             
-            for i, account in enumerate(accounts[:10]):  # Показываем максимум 10
+            for account in accounts:
                 text += f"🎮 Аккаунт #{account['id']}\n"
                 text += f"📝 Описание: {account.get('description', 'Нет описания')}\n"
                 text += f"💰 Цена: {account.get('price', 'Не указана')} руб/час\n\n"
@@ -218,21 +246,20 @@ class SimpleSteamRentalBot:
                     callback_data=f"rent_account_{account['id']}"
                 )])
             
-            if len(accounts) > 10:
-                text += f"... и еще {len(accounts) - 10} аккаунтов"
+            keyboard.extend(self._page_buttons("accounts_page", page))
             
             reply_markup = InlineKeyboardMarkup(keyboard)
-            await update.message.reply_text(text, reply_markup=reply_markup)
+            await self._reply(update, text, reply_markup)
             
         except Exception as e:
-            await update.message.reply_text(f"❌ Ошибка получения аккаунтов: {e}")
+            await self._reply(update, f"❌ Ошибка получения аккаунтов: {e}")
     
     async def rentals_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Обработчик команды /rentals"""
         user_id = update.effective_user.id
         
         try:
-            rentals = self.db.get_user_rentals(user_id)
+            rentals = await self.db.get_user_rentals(user_id)
             
             if not rentals:
                 await update.message.reply_text("📭 У вас нет активных аренд.")
@@ -295,10 +322,11 @@ class SimpleSteamRentalBot:
         """
         
         try:
-            total_accounts = self.db.get_total_accounts()
-            available_accounts = self.db.get_available_accounts()
-            active_rentals = self.db.get_active_rentals()
-            total_users = self.db.get_total_users()
+            stats = await self.db.get_stats_snapshot()
+            total_accounts = stats['total_accounts']
+            available_accounts = stats['available_accounts']
+            active_rentals = stats['active_rentals']
+            total_users = stats['total_users']
             
             admin_text += f"""
 • Всего аккаунтов: {total_accounts}
@@ -327,6 +355,9 @@ class SimpleSteamRentalBot:
         
         if data == "show_accounts":
             await self.accounts_command(update, context)
+        elif data.startswith("accounts_page_"):
+            after_id, before_id = self._parse_page_callback(data)
+            await self.accounts_command(update, context, after_id, before_id)
         elif data == "show_status":
             await self.status_command(update, context)
         elif data == "show_help":
@@ -353,7 +384,7 @@ class SimpleSteamRentalBot:
     async def handle_rent_request(self, update: Update, context: ContextTypes.DEFAULT_TYPE, account_id: str):
         """Обработка запроса на аренду"""
         try:
-            account = self.db.get_account(account_id)
+            account = await self.db.get_account(account_id)
             if not account:
                 await update.callback_query.edit_message_text("❌ Аккаунт не найден.")
                 return
@@ -387,13 +418,13 @@ class SimpleSteamRentalBot:
         user_id = update.effective_user.id
         
         try:
-            account = self.db.get_account(account_id)
+            account = await self.db.get_account(account_id)
             if not account:
                 await update.callback_query.edit_message_text("❌ Аккаунт не найден.")
                 return
             
             # Создаем аренду
-            success = self.db.create_rental(int(account_id), str(user_id), duration)
+            success = await self.db.create_rental(int(account_id), str(user_id), duration)
             
             if success:
                 total_cost = duration * account.get('price', 50)
@@ -439,7 +470,7 @@ class SimpleSteamRentalBot:
             return
         
         try:
-            stats = self.db.get_detailed_stats()
+            stats = await self.db.get_stats_snapshot()
             
             text = """
 📊 Детальная статистика
@@ -477,7 +508,7 @@ class SimpleSteamRentalBot:
             return
         
         try:
-            users = self.db.get_users_list()
+            users = await self.db.get_users_list()
             
             text = "👥 Список пользователей:\n\n"
             
@@ -505,7 +536,7 @@ class SimpleSteamRentalBot:
             return
         
         try:
-            accounts = self.db.get_all_accounts()
+            accounts = await self.db.get_all_accounts()
             
             if not accounts:
                 text = "📭 Нет аккаунтов в системе."
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Тест асинхронного фасада базы данных
+"""
+
+import os
+import time
+import asyncio
+import tempfile
+from database import Database
+from async_database import AsyncDatabase
+
+def test_async_database():
+    """Тест асинхронных вызовов базы данных"""
+    print("🧪 Тест асинхронного фасада базы данных...")
+
+    db_path = os.path.join(tempfile.mkdtemp(), 'async_test.db')
+    db = Database(db_path)
+    adb = AsyncDatabase(db)
+
+    # Имитируем медленный отчет администратора
+    original_stats = db.get_detailed_stats
+    def slow_stats():
+        time.sleep(0.5)
+        return original_stats()
+    db.get_detailed_stats = slow_stats
+
+    async def scenario():
+        await adb.add_user('1001', 'tester')
+        assert await adb.get_total_users() == 1
+        print("✅ Методы Database доступны через await")
+
+        # Отчет выполняется в отдельном пуле и не задерживает обычные запросы
+        stats_task = asyncio.ensure_future(adb.get_detailed_stats())
+        await asyncio.sleep(0.05)
+        started = time.monotonic()
+        assert await adb.get_total_accounts() == 0
+        assert time.monotonic() - started < 0.3
+        assert (await stats_task)['total_users'] == 1
+        print("✅ Медленная статистика не блокирует другие запросы")
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        adb.close()
+
+if __name__ == '__main__':
+    test_async_database()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Тест пула браузеров FunPay
+"""
+
+import os
+import time
+import tempfile
+import threading
+from browser_pool import BrowserPool
+
+class FakeDriver:
+    """Браузер, запоминающий переходы и cookies"""
+
+    def __init__(self):
+        self.cookies = []
+        self.visited = []
+        self.dead = False
+
+    @property
+    def current_url(self):
+        if self.dead:
+            raise ConnectionError("браузер не отвечает")
+        return self.visited[-1] if self.visited else 'about:blank'
+
+    def get(self, url):
+        self.visited.append(url)
+
+    def add_cookie(self, cookie):
+        self.cookies.append(cookie)
+
+    def get_cookies(self):
+        return list(self.cookies)
+
+    def quit(self):
+        self.dead = True
+
+def test_browser_pool():
+    """Тест переиспользования браузеров, cookies и параллельной выдачи"""
+    print("🧪 Тест пула браузеров...")
+
+    cookies_path = os.path.join(tempfile.mkdtemp(), 'cookies.json')
+    drivers = []
+    logins = []
+
+    def factory():
+        drivers.append(FakeDriver())
+        return drivers[-1]
+
+    def login(driver):
+        logins.append(driver)
+        driver.add_cookie({'name': 'golden_key', 'value': 'secret', 'sameSite': 'Lax'})
+        return True
+
+    pool = BrowserPool(size=2, factory=factory, cookies_path=cookies_path, base_url='https://funpay.test')
+    pool.set_login(login)
+    pool.warm_up()
+    assert len(drivers) == 2 and not logins
+
+    # Вход выполняется в одном браузере, второй получает его cookies
+    assert pool.ensure_login()
+    assert len(logins) == 1 and os.path.exists(cookies_path)
+    with pool.session() as first:
+        with pool.session() as second:
+            assert {first, second} == set(drivers)
+    assert len(logins) == 1
+    assert all(any(c['name'] == 'golden_key' for c in d.cookies) for d in drivers)
+    print("✅ Браузеры переиспользуются, вход выполнен один раз")
+
+    # Параллельные операции не превышают размер пула
+    active = []
+    peak = []
+    lock = threading.Lock()
+
+    def send():
+        with pool.session() as driver:
+            with lock:
+                active.append(driver)
+                peak.append(len(active))
+            time.sleep(0.05)
+            with lock:
+                active.remove(driver)
+
+    threads = [threading.Thread(target=send) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert max(peak) == 2 and len(drivers) == 2
+    print("✅ Параллельная выдача ограничена размером пула")
+
+    # Упавший браузер заменяется, ошибка на странице браузер не закрывает
+    try:
+        with pool.session() as driver:
+            raise ValueError("элемент не найден")
+    except ValueError:
+        pass
+    assert not driver.dead
+    try:
+        with pool.session() as driver:
+            driver.dead = True
+            raise ConnectionError("браузер упал")
+    except ConnectionError:
+        pass
+    with pool.session() as first:
+        with pool.session() as second:
+            assert not first.dead and not second.dead
+    assert len(drivers) == 3
+    pool.close()
+    print("✅ Упавший браузер заменен новым")
+
+    # Следующий запуск восстанавливает сессию из файла без входа
+    restored = BrowserPool(size=1, factory=factory, cookies_path=cookies_path, base_url='https://funpay.test')
+    restored.set_login(login)
+    with restored.session() as driver:
+        assert driver.visited == ['https://funpay.test']
+        assert [c['name'] for c in driver.cookies] == ['golden_key']
+    assert len(logins) == 1
+    restored.close()
+    print("✅ Сессия восстановлена из cookies без входа")
+
+if __name__ == '__main__':
+    test_browser_pool()
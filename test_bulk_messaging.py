@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Тест ограничения частоты запросов и массовой рассылки
+"""
+
+import os
+import time
+import asyncio
+import tempfile
+import threading
+from database import Database
+from rate_limiter import TokenBucket
+from bulk_messaging import BulkMessageDispatcher
+
+class FakeChat:
+    """Отправка сообщений с общей корзиной токенов и отказами для отдельных заказов"""
+
+    def __init__(self, limiter, failures=None, stop_after=None):
+        self.limiter = limiter
+        self.failures = dict(failures or {})  # заказ -> число отказов подряд
+        self.stop_after = stop_after
+        self.dispatcher = None
+        self.sent = []
+        self.active = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+
+    def send(self, order_id, text):
+        self.limiter.acquire()
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(0.01)
+        with self.lock:
+            self.active -= 1
+            if self.failures.get(order_id, 0) > 0:
+                self.failures[order_id] -= 1
+                raise ConnectionError("FunPay не ответил")
+            self.sent.append(order_id)
+            if self.stop_after and len(self.sent) >= self.stop_after:
+                self.dispatcher.stop()
+        return True
+
+def test_token_bucket():
+    """Тест корзины токенов"""
+    print("🧪 Тест корзины токенов...")
+
+    bucket = TokenBucket(rate=1, capacity=2)
+    now = float(int(time.monotonic()) + 1)
+    assert [bucket.reserve(now=now) for _ in range(4)] == [0.0, 0.0, 1.0, 2.0]
+    # За 3 секунды долг погашен и накоплен один токен
+    assert bucket.reserve(now=now + 3) == 0.0
+    assert bucket.reserve(now=now + 3) == 1.0
+    metrics = bucket.get_metrics()
+    assert metrics['acquired'] == 6 and metrics['throttled'] == 3 and metrics['waited_seconds'] == 4.0
+
+    async def burst():
+        fast = TokenBucket(rate=100, capacity=5)
+        started = time.monotonic()
+        await asyncio.gather(*(fast.acquire_async() for _ in range(15)))
+        return time.monotonic() - started
+
+    assert 0.08 <= asyncio.run(burst()) < 0.5
+    print("✅ Всплеск ограничен емкостью, далее — частотой корзины")
+
+def test_bulk_messaging():
+    """Тест параллельной рассылки с повторами и продолжением после остановки"""
+    print("🧪 Тест массовой рассылки...")
+
+    db_path = os.path.join(tempfile.mkdtemp(), 'bulk_test.db')
+    db = Database(db_path)
+    order_ids = [f'order_{i:02d}' for i in range(40)]
+
+    chat = FakeChat(TokenBucket(rate=200, capacity=10), failures={'order_03': 1, 'order_07': 5})
+    dispatcher = BulkMessageDispatcher(db, chat.send, workers=8, max_attempts=3, backoff_seconds=0.05)
+    started = time.monotonic()
+    report = dispatcher.send('Технические работы', order_ids + ['order_00'], 'Сервис будет недоступен час')
+    elapsed = time.monotonic() - started
+
+    assert report['status'] == 'completed' and report['total'] == 40
+    assert report['sent'] == 39 and report['failed'] == 1 and report['pending'] == 0
+    assert report['failures'] == {'order_07': 'FunPay не ответил'}
+    assert sorted(chat.sent) == [order_id for order_id in order_ids if order_id != 'order_07']
+    assert chat.peak > 1 and elapsed < 2
+    assert dispatcher.get_metrics() == {'campaigns': 1, 'sent': 39, 'failed_attempts': 4, 'failed': 1}
+    print(f"✅ 40 получателей за {elapsed:.2f} с, повтор после сбоя, отчет об ошибках")
+
+    # Остановка посреди рассылки: остаток отправляется после перезапуска без повторов
+    chat = FakeChat(TokenBucket(rate=1000, capacity=10), stop_after=5)
+    interrupted = BulkMessageDispatcher(db, chat.send, workers=1)
+    chat.dispatcher = interrupted
+    report = interrupted.send('Новые игры', order_ids[:12], 'В каталоге новые игры')
+    assert report['status'] == 'running' and report['sent'] == 5 and report['pending'] == 7
+    assert db.get_unfinished_message_campaign_ids() == [report['campaign_id']]
+
+    resumed_chat = FakeChat(TokenBucket(rate=1000, capacity=10))
+    resumed = BulkMessageDispatcher(db, resumed_chat.send, workers=4)
+    reports = resumed.resume()
+    assert len(reports) == 1 and reports[0]['status'] == 'completed' and reports[0]['sent'] == 12
+    assert sorted(chat.sent + resumed_chat.sent) == order_ids[:12]
+    assert db.get_unfinished_message_campaign_ids() == []
+    print("✅ Прерванная рассылка продолжена с неотправленных сообщений")
+
+if __name__ == '__main__':
+    test_token_bucket()
+    test_bulk_messaging()
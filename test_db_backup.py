@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Тест резервного копирования базы данных
+"""
+
+import os
+import time
+import sqlite3
+import tempfile
+import threading
+from database import Database
+from db_backup import DatabaseBackup
+
+def test_db_backup():
+    """Тест онлайн-копии при одновременной записи, проверки и ротации"""
+    print("🧪 Тест резервного копирования...")
+
+    work_dir = tempfile.mkdtemp()
+    db_path = os.path.join(work_dir, 'backup_test.db')
+    db = Database(db_path)
+    for i in range(2000):
+        db.add_steam_account(f'user_{i}', 'x' * 200, 'Counter-Strike 2')
+
+    # Запись продолжается во время копирования и не ждет его окончания
+    stop = threading.Event()
+    write_times = []
+
+    def writer():
+        i = 0
+        while not stop.is_set():
+            started = time.monotonic()
+            db.record_funpay_orders([{'id': f'w{i}', 'title': 'CS2', 'status': 'paid',
+                                      'game_name': None, 'duration': '1'}])
+            write_times.append(time.monotonic() - started)
+            i += 1
+            time.sleep(0.01)
+
+    thread = threading.Thread(target=writer)
+    thread.start()
+    backup = DatabaseBackup(db_path, backup_dir=os.path.join(work_dir, 'backups'),
+                            generations=2, pages=20, sleep=0.01, max_restarts=5)
+    try:
+        result = backup.create()
+    finally:
+        stop.set()
+        thread.join()
+
+    assert result['steps'] > 1 and result['size'] < result['raw_size']
+    assert write_times and max(write_times) < 1.0
+    print(f"✅ Копия за {result['steps']} шагов ({result['restarts']} перезапусков), "
+          f"записей во время копирования: {len(write_times)}")
+
+    restored = os.path.join(work_dir, 'restored.db')
+    DatabaseBackup.restore(result['path'], restored)
+    conn = sqlite3.connect(restored)
+    assert conn.execute('PRAGMA integrity_check').fetchone()[0] == 'ok'
+    assert conn.execute('SELECT COUNT(*) FROM steam_accounts').fetchone()[0] == 2000
+    conn.close()
+    print("✅ Копия восстанавливается и проходит integrity_check")
+
+    second = backup.create()
+    third = backup.create()
+    assert backup.list_backups() == [third['path'], second['path']]
+    assert third['removed'] == [result['path']]
+    assert not [name for name in os.listdir(backup.backup_dir) if not name.endswith('.db.gz')]
+    print("✅ Хранятся только последние поколения")
+
+if __name__ == '__main__':
+    test_db_backup()
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Тест пула соединений SQLite
+"""
+
+import os
+import tempfile
+import threading
+from database import Database
+from db_pool import get_pool
+
+def test_db_pool():
+    """Тест пула соединений"""
+    print("🧪 Тест пула соединений...")
+
+    db_path = os.path.join(tempfile.mkdtemp(), 'pool_test.db')
+    db = Database(db_path)
+    pool = get_pool(db_path)
+
+    # Все классы доступа к данным используют общий пул
+    assert db.pool is pool
+
+    # В пределах потока соединение переиспользуется
+    assert pool.get_connection() is pool.get_connection()
+    print("✅ Соединение потока переиспользуется")
+
+    # Соединение настроено один раз: WAL и synchronous=NORMAL
+    conn = pool.get_connection()
+    assert conn.execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+    assert conn.execute('PRAGMA synchronous').fetchone()[0] == 1
+    print("✅ WAL и synchronous=NORMAL включены")
+
+    # Другой поток получает собственное соединение
+    other = []
+    thread = threading.Thread(target=lambda: other.append(pool.get_connection()))
+    thread.start()
+    thread.join()
+    assert other[0] is not conn
+    print("✅ Каждый поток получает свое соединение")
+
+    # Исключение во внешнем блоке откатывает и вложенные изменения
+    try:
+        with pool.connection() as outer:
+            outer.execute("INSERT INTO users (telegram_id) VALUES ('outer')")
+            with pool.connection() as inner:
+                inner.execute("INSERT INTO users (telegram_id) VALUES ('inner')")
+            raise RuntimeError("откат")
+    except RuntimeError:
+        pass
+    assert db.get_total_users() == 0
+    print("✅ Вложенные блоки фиксируются только внешним блоком")
+
+    db.add_user('42')
+    assert db.get_total_users() == 1
+
+    pool.close_all()
+    assert db.get_total_users() == 1
+    print("✅ После close_all соединение открывается заново")
+
+if __name__ == '__main__':
+    test_db_pool()
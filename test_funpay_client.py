@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Тест асинхронного HTTP клиента FunPay
+"""
+
+import time
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from funpay_client import AsyncFunPayClient
+
+class SlowHandler(BaseHTTPRequestHandler):
+    """Медленный сервер, считающий одновременные запросы"""
+    active = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def do_GET(self):
+        with SlowHandler.lock:
+            SlowHandler.active += 1
+            SlowHandler.peak = max(SlowHandler.peak, SlowHandler.active)
+        time.sleep(0.3)
+        with SlowHandler.lock:
+            SlowHandler.active -= 1
+        body = self.path.encode()
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+class PageHandler(BaseHTTPRequestHandler):
+    """Страница с ETag, отвечающая 304 на условный запрос"""
+    body = b'<div>1</div>'
+    requests = 0
+    not_modified = 0
+
+    def do_GET(self):
+        PageHandler.requests += 1
+        etag = '"%d"' % hash(PageHandler.body)
+        if self.headers.get('If-None-Match') == etag:
+            PageHandler.not_modified += 1
+            self.send_response(304)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('ETag', etag)
+        self.send_header('Content-Length', str(len(PageHandler.body)))
+        self.end_headers()
+        self.wfile.write(PageHandler.body)
+
+    def log_message(self, format, *args):
+        pass
+
+def test_funpay_client():
+    """Тест параллельных запросов с ограничением на хост"""
+    print("🧪 Тест асинхронного HTTP клиента FunPay...")
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), SlowHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    client = AsyncFunPayClient(max_per_host=2)
+
+    async def fetch_all(paths):
+        responses = await asyncio.gather(*(client.get(base_url + path) for path in paths))
+        return [response.text for response in responses]
+
+    try:
+        # Два запроса выполняются одновременно, а не друг за другом
+        started = time.monotonic()
+        assert client.run(fetch_all(['/orders', '/reviews'])) == ['/orders', '/reviews']
+        assert time.monotonic() - started < 0.55
+        print("✅ Страницы загружаются параллельно")
+
+        # Одновременно к хосту идет не больше max_per_host запросов
+        SlowHandler.peak = 0
+        paths = [f'/order/{i}' for i in range(6)]
+        assert client.run(fetch_all(paths)) == paths
+        assert SlowHandler.peak == 2
+        print("✅ Ограничение запросов к хосту соблюдается")
+    finally:
+        client.close()
+        server.shutdown()
+        server.server_close()
+
+def test_page_cache():
+    """Тест кэша страниц с условными запросами"""
+    print("🧪 Тест кэша страниц FunPay...")
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), PageHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/account/orders"
+    parsed = []
+
+    def parse(content):
+        parsed.append(content)
+        return [{'body': content.decode()}]
+
+    client = AsyncFunPayClient(page_cache_seconds=60)
+    try:
+        # Одновременные запросы одной страницы объединяются
+        async def fetch_twice():
+            return await asyncio.gather(client.fetch_page(url, parse), client.fetch_page(url, parse))
+        first, second = client.run(fetch_twice())
+        assert first == second == [{'body': '<div>1</div>'}]
+        assert PageHandler.requests == 1 and len(parsed) == 1
+        print("✅ Одновременные запросы объединены")
+
+        # Свежий результат отдается без запроса, изменение копии не портит кэш
+        first[0]['game_name'] = 'Dota 2'
+        assert client.run(client.fetch_page(url, parse)) == [{'body': '<div>1</div>'}]
+        assert PageHandler.requests == 1
+        print("✅ Повторная загрузка в пределах срока обслужена из кэша")
+
+        # После истечения срока отправляется условный запрос, разбор не повторяется
+        client.page_cache_seconds = 0
+        assert client.run(client.fetch_page(url, parse)) == [{'body': '<div>1</div>'}]
+        assert PageHandler.not_modified == 1 and len(parsed) == 1
+        print("✅ Неизменившаяся страница не разбирается повторно")
+
+        # Измененная страница разбирается заново
+        PageHandler.body = b'<div>2</div>'
+        assert client.run(client.fetch_page(url, parse)) == [{'body': '<div>2</div>'}]
+        assert len(parsed) == 2
+        print("✅ Измененная страница разобрана")
+    finally:
+        client.close()
+        server.shutdown()
+        server.server_close()
+
+if __name__ == '__main__':
+    test_funpay_client()
+    test_page_cache()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Тест учета заказов FunPay: отметка последнего заказа и защита от повторной выдачи
+"""
+
+import os
+import logging
+import tempfile
+from types import SimpleNamespace
+from database import Database
+from funpay_manager import FunPayManager
+
+def page(*order_ids):
+    """Страница заказов FunPay от новых к старым"""
+    return [{'id': order_id, 'title': f'CS2 {order_id}', 'status': 'Новый'} for order_id in order_ids]
+
+def test_funpay_orders():
+    """Тест инкрементального приема и идемпотентной обработки заказов"""
+    print("🧪 Тест учета заказов FunPay...")
+
+    db_path = os.path.join(tempfile.mkdtemp(), 'orders_test.db')
+    db = Database(db_path)
+    db.add_steam_account('cs_1', 'pass', 'Counter-Strike 2')
+
+    # Первый опрос: все заказы новые, закрытый заказ только запоминается
+    first_page = page('o3', 'o2', 'o1')
+    unseen = db.get_unseen_funpay_orders(first_page)
+    assert [o['id'] for o in unseen] == ['o3', 'o2', 'o1']
+    for order in unseen:
+        if order['id'] != 'o1':
+            order['game_name'] = 'Counter-Strike 2'
+    db.record_funpay_orders(unseen)
+    assert [o['id'] for o in db.get_pending_funpay_orders()] == ['o2', 'o3']
+    print("✅ Новые заказы записаны")
+
+    # Повторный опрос той же страницы ничего не разбирает
+    assert db.get_unseen_funpay_orders(page('o3', 'o2', 'o1')) == []
+    # Просмотр останавливается на первом известном заказе
+    assert [o['id'] for o in db.get_unseen_funpay_orders(page('o5', 'o4', 'o3', 'o2'))] == ['o5', 'o4']
+    print("✅ Просмотр остановлен на уже увиденных заказах")
+
+    # Заказ обрабатывается только один раз
+    assert db.start_funpay_order('o2')
+    assert not db.start_funpay_order('o2')
+    account = db.claim_free_account('Counter-Strike 2', 'o2', 1)
+    db.finish_funpay_order('o2', 'failed', account['rental_id'])
+
+    # Повторная попытка после неудачной отправки получает тот же аккаунт
+    assert db.start_funpay_order('o2')
+    retry = db.get_order_rental_account('o2')
+    assert retry['id'] == account['id'] and retry['rental_id'] == account['rental_id']
+    db.finish_funpay_order('o2', 'delivered')
+    assert not db.start_funpay_order('o2')
+    assert [o['id'] for o in db.get_pending_funpay_orders()] == ['o3']
+    print("✅ Выданный заказ не обрабатывается повторно")
+
+    # Заказ без свободных аккаунтов остается в очереди
+    assert db.start_funpay_order('o3')
+    assert db.claim_free_account('Counter-Strike 2', 'o3', 1) is None
+    db.finish_funpay_order('o3', 'no_account')
+    assert [o['id'] for o in db.get_pending_funpay_orders()] == ['o3']
+    print("✅ Заказ без свободного аккаунта ждет следующего цикла")
+
+    # Ожидание аккаунта не расходует попытки: после 7 опросов заказ выдается
+    for _ in range(6):
+        assert db.start_funpay_order('o3')
+        db.finish_funpay_order('o3', 'no_account')
+    assert [o['id'] for o in db.get_pending_funpay_orders()] == ['o3']
+    assert db.abandon_stale_funpay_orders() == []
+    db.add_steam_account('cs_2', 'pass', 'Counter-Strike 2')
+    assert db.start_funpay_order('o3')
+    assert db.claim_free_account('Counter-Strike 2', 'o3', 1)['username'] == 'cs_2'
+    db.finish_funpay_order('o3', 'delivered')
+    print("✅ Заказ дождался появления аккаунта")
+
+    # Заказ, ждущий аккаунт дольше срока, снимается с выдачи
+    db.record_funpay_orders([{'id': 'o7', 'title': 'CS2 o7', 'status': 'Новый', 'game_name': 'Counter-Strike 2'}])
+    assert db.start_funpay_order('o7')
+    db.finish_funpay_order('o7', 'no_account')
+    with db.pool.connection() as conn:
+        conn.execute("UPDATE funpay_orders SET first_seen_at = datetime('now', '-2 days') WHERE order_id = 'o7'")
+    assert [o['id'] for o in db.abandon_stale_funpay_orders()] == ['o7']
+    assert db.get_pending_funpay_orders() == [] and not db.start_funpay_order('o7')
+    print("✅ Давно ожидающий заказ снят с выдачи")
+
+    # Заказ с неизвестной игрой только запоминается и не попадает в очередь выдачи
+    manager = SimpleNamespace(db=db, logger=logging.getLogger(__name__))
+    unknown = {'id': 'o6', 'title': 'Аренда аккаунта неизвестной игры', 'status': 'Новый'}
+    unknown['game_name'] = FunPayManager.extract_game_from_order(manager, unknown)
+    assert unknown['game_name'] is None
+    db.record_funpay_orders([unknown])
+    with db.pool.connection() as conn:
+        state = conn.execute("SELECT state FROM funpay_orders WHERE order_id = 'o6'").fetchone()[0]
+    assert state == 'ignored'
+    assert not db.start_funpay_order('o6')
+    assert db.get_pending_funpay_orders() == []
+    print("✅ Заказ с неопределенной игрой не ставится в очередь")
+
+if __name__ == '__main__':
+    test_funpay_orders()
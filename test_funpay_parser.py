@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Тест разбора страниц FunPay: lxml против прежнего разбора BeautifulSoup
+"""
+
+import os
+import time
+from bs4 import BeautifulSoup
+import funpay_parser
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'test_data')
+
+def load_fixture(name):
+    with open(os.path.join(DATA_DIR, name), 'rb') as f:
+        return f.read()
+
+def reference_parse(content, item_class, parse_item):
+    """Прежний разбор: полное дерево html.parser и find() по каждому полю"""
+    soup = BeautifulSoup(content, 'html.parser')
+    result = []
+    for elem in soup.find_all('div', {'class': item_class}):
+        try:
+            result.append(parse_item(elem))
+        except Exception:
+            continue
+    return result
+
+def test_funpay_parser():
+    """Тест совпадения результатов разбора на фикстурах"""
+    print("🧪 Тест разбора страниц FunPay...")
+
+    orders_html = load_fixture('funpay_orders.html')
+    expected_orders = reference_parse(orders_html, 'order-item', funpay_parser._order_bs4)
+    assert [o['id'] for o in expected_orders] == ['ORD-1001', 'ORD-1002', '']
+    for backend in ('lxml', 'bs4'):
+        assert funpay_parser.parse_orders(orders_html, backend) == expected_orders, backend
+        assert funpay_parser.parse_orders(orders_html.decode('utf-8'), backend) == expected_orders, backend
+    assert expected_orders[1]['title'] == 'Dota 2 & Battle Pass'
+    print("✅ Заказы разобраны так же, как прежним парсером")
+
+    reviews_html = load_fixture('funpay_reviews.html')
+    expected_reviews = reference_parse(reviews_html, 'review-item', funpay_parser._review_bs4)
+    assert [(r['id'], r['rating']) for r in expected_reviews] == [('R-1', 5), ('R-2', 0), ('R-5', 4)]
+    for backend in ('lxml', 'bs4'):
+        assert funpay_parser.parse_reviews(reviews_html, backend) == expected_reviews, backend
+    print("✅ Отзывы разобраны так же, как прежним парсером")
+
+    assert funpay_parser.parse_orders(b'') == []
+    assert funpay_parser.parse_reviews(b'<html></html>') == []
+    print("✅ Пустые страницы обрабатываются")
+
+    # Большая история заказов: быстрый разбор не медленнее прежнего
+    item = orders_html.split(b'<div class="order-item" data-order-id="ORD-1001">')[1].split(b'<div class="order-item paid"')[0]
+    big_page = b'<html><body>' + b''.join(
+        b'<div class="order-item" data-order-id="ORD-%d">' % i + item for i in range(2000)
+    ) + b'</body></html>'
+
+    started = time.perf_counter()
+    fast = funpay_parser.parse_orders(big_page)
+    fast_time = time.perf_counter() - started
+    started = time.perf_counter()
+    slow = reference_parse(big_page, 'order-item', funpay_parser._order_bs4)
+    slow_time = time.perf_counter() - started
+
+    assert fast == slow and len(fast) == 2000
+    assert fast_time < slow_time
+    print(f"✅ 2000 заказов: lxml {fast_time:.3f}с, BeautifulSoup {slow_time:.3f}с")
+
+if __name__ == '__main__':
+    test_funpay_parser()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Тест определения игры по названию заказа и замер скорости
+"""
+
+import os
+import time
+import tempfile
+from database import Database
+from game_classifier import GameClassifier
+from migrations import DEFAULT_GAME_ALIASES
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'test_data')
+
+def load_corpus():
+    """Названия заказов с ожидаемой игрой"""
+    with open(os.path.join(DATA_DIR, 'order_titles.tsv'), encoding='utf-8') as f:
+        rows = [line.rstrip('\r\n').split('\t') for line in f if line.strip() and not line.startswith('#')]
+    return [(title, expected or None) for title, expected in rows]
+
+def linear_scan(aliases, title):
+    """Прежний способ: подстроки в порядке словаря"""
+    title = title.lower()
+    for alias, game_name in aliases.items():
+        if alias in title:
+            return game_name
+    return None
+
+def test_game_classifier():
+    """Тест классификатора игр на корпусе названий заказов"""
+    print("🧪 Тест определения игры по заказу...")
+
+    db_path = os.path.join(tempfile.mkdtemp(), 'games_test.db')
+    db = Database(db_path)
+    corpus = load_corpus()
+
+    for title, expected in corpus:
+        assert db.classify_game(title) == expected, (title, expected, db.classify_game(title))
+    print(f"✅ Корпус из {len(corpus)} названий классифицирован верно")
+
+    # Новые псевдонимы и игры подхватываются без перезапуска
+    assert db.classify_game('Rust аккаунт аренда') is None
+    assert db.add_game_alias('Rust', 'Rust')
+    assert db.classify_game('Rust аккаунт аренда') == 'Rust'
+    db.add_steam_account('tarkov_user', 'pass', 'Escape from Tarkov')
+    assert db.classify_game('аренда escape  from tarkov') == 'Escape from Tarkov'
+    assert db.remove_game_alias('rust')
+    assert db.classify_game('Rust аккаунт аренда') is None
+    print("✅ Изменения реестра применяются сразу")
+
+    benchmark(corpus)
+
+def benchmark(corpus, repeats=200):
+    """Сравнение с линейным перебором при каталоге из 20 и 1000 игр"""
+    titles = [title for title, _ in corpus] * repeats
+
+    for extra_games in (0, 1000):
+        aliases = dict(DEFAULT_GAME_ALIASES)
+        aliases.update({f'game title {i}': f'Game {i}' for i in range(extra_games)})
+        classifier = GameClassifier(':memory:')
+        classifier.load(aliases.items())
+
+        started = time.perf_counter()
+        for title in titles:
+            classifier.classify(title)
+        compiled_time = time.perf_counter() - started
+
+        started = time.perf_counter()
+        for title in titles:
+            linear_scan(aliases, title)
+        linear_time = time.perf_counter() - started
+
+        print(f"⏱️ {len(aliases)} псевдонимов, {len(titles)} заказов: "
+              f"выражение {compiled_time:.3f}с, перебор {linear_time:.3f}с")
+
+    # На большом каталоге единое выражение быстрее перебора
+    assert compiled_time < linear_time
+
+if __name__ == '__main__':
+    test_game_classifier()
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Тест инкрементальной статистики по играм
+"""
+
+import os
+import sqlite3
+import tempfile
+from database import Database
+from migrations import run_migrations
+
+def test_game_statistics():
+    """Тест обновления статистики при аренде, завершении и отзыве"""
+    print("🧪 Тест инкрементальной статистики по играм...")
+
+    db_path = os.path.join(tempfile.mkdtemp(), 'stats_test.db')
+    db = Database(db_path)
+    db.add_steam_account('cs_1', 'pass', 'Counter-Strike 2')
+    db.add_steam_account('cs_2', 'pass', 'Counter-Strike 2')
+    db.add_steam_account('dota_1', 'pass', 'Dota 2')
+
+    # Начало аренды увеличивает счетчик аренд игры
+    assert db.claim_free_account('Counter-Strike 2', 'order_1', 2)
+    assert db.claim_free_account('Counter-Strike 2', 'order_2', 3)
+    assert db.claim_free_account('Dota 2', 'order_3', 1)
+    popular = db.get_statistics()['popular_games']
+    assert popular[0] == {'game': 'Counter-Strike 2', 'count': 2, 'revenue': 0}
+    print("✅ Аренды учтены при выдаче аккаунта")
+
+    # Завершение аренд добавляет доход
+    with db.pool.connection() as conn:
+        conn.execute("UPDATE rentals SET end_time = datetime('now', '-1 minute')")
+    assert db.end_expired_rentals_batch() == [1, 2, 3]
+    stats = {row['game_name']: row for row in db.get_game_statistics()}
+    assert stats['Counter-Strike 2']['total_revenue'] == 250
+    assert stats['Dota 2']['total_revenue'] == 50
+    assert db.get_detailed_stats()['total_revenue'] == 300
+    print("✅ Доход учтен при завершении аренд")
+
+    # Оценки отзывов усредняются инкрементально
+    assert db.record_review('order_1', 5)
+    assert db.record_review('order_2', 4)
+    assert not db.record_review('unknown_order', 1)
+    stats = {row['game_name']: row for row in db.get_game_statistics()}
+    assert stats['Counter-Strike 2']['total_reviews'] == 2
+    assert stats['Counter-Strike 2']['average_rating'] == 4.5
+    print("✅ Оценки отзывов учтены")
+
+    # Миграция восстанавливает статистику по уже накопленным арендам
+    with db.pool.connection() as conn:
+        conn.execute('DROP INDEX idx_statistics_game_name')
+        conn.execute('DELETE FROM statistics')
+        conn.execute('DELETE FROM schema_version WHERE version >= 2')
+    conn = sqlite3.connect(db_path)
+    try:
+        run_migrations(conn)
+        rows = dict(conn.execute('SELECT game_name, total_rentals FROM statistics').fetchall())
+    finally:
+        conn.close()
+    assert rows == {'Counter-Strike 2': 2, 'Dota 2': 1}
+    print("✅ Статистика заполнена миграцией")
+
+if __name__ == '__main__':
+    test_game_statistics()
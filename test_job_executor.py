@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Тест исполнителя периодических задач
+"""
+
+import time
+import threading
+from job_executor import JobExecutor
+
+def test_job_executor():
+    """Тест независимости задач, пропуска перекрытий и таймаутов"""
+    print("🧪 Тест исполнителя задач...")
+
+    executor = JobExecutor()
+    release = threading.Event()
+    fast_runs = []
+
+    def failing():
+        raise RuntimeError("сбой")
+
+    run_slow = executor.job('slow_sync', lambda: release.wait(5), timeout=0.1)
+    run_fast = executor.job('fast', lambda: fast_runs.append(time.monotonic()))
+    run_failing = executor.job('failing', failing)
+
+    try:
+        slow = run_slow()
+        assert slow is not None
+
+        # Быстрая задача не ждет медленную
+        run_fast().result(timeout=1)
+        assert len(fast_runs) == 1 and not slow.done()
+        print("✅ Задачи выполняются независимо")
+
+        # Повторный запуск медленной задачи пропускается
+        assert run_slow() is None
+        time.sleep(0.2)
+        executor.check_timeouts()
+        executor.check_timeouts()
+        metrics = executor.get_metrics()['slow_sync']
+        assert metrics['running'] and metrics['skipped'] == 1 and metrics['timeouts'] == 1
+        print("✅ Перекрывающийся запуск пропущен, таймаут отмечен")
+
+        release.set()
+        slow.result(timeout=1)
+        assert run_slow().result(timeout=1)
+        run_failing().result(timeout=1)
+    finally:
+        release.set()
+        executor.shutdown(wait=True)
+
+    metrics = executor.get_metrics()
+    assert metrics['slow_sync']['runs'] == 2
+    assert sum(metrics['slow_sync']['histogram'].values()) == 2
+    assert metrics['slow_sync']['histogram']['<=0.5s'] == 1
+    assert metrics['fast']['histogram']['<=0.1s'] == 1
+    assert metrics['failing']['errors'] == 1 and metrics['failing']['runs'] == 1
+    print("✅ Гистограммы длительности собраны")
+
+if __name__ == '__main__':
+    test_job_executor()
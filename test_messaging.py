@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Тест единой отправки сообщений и общих шаблонов
+"""
+
+import string
+from message_templates import MESSAGE_TEMPLATES, render_message
+from messaging import HttpMessageBackend, MessageSender, SeleniumMessageBackend, create_message_sender
+
+class FakeManager:
+    """HTTP-отправка, не проходящая для отдельных заказов"""
+    login = 'seller'
+    password = 'secret'
+    db = None
+
+    def __init__(self, failing=()):
+        self.failing = set(failing)
+        self.sent = []
+
+    def send_message(self, order_id, text):
+        if order_id in self.failing:
+            return False
+        self.sent.append((order_id, text))
+        return True
+
+class FakeMessenger:
+    """Браузерный мессенджер с учетом входа"""
+    created = 0
+
+    def __init__(self):
+        FakeMessenger.created += 1
+        self.logins = []
+        self.sent = []
+
+    def login_to_funpay(self, username, password):
+        self.logins.append(username)
+        return True
+
+    def send_message_to_order(self, order_id, text):
+        self.sent.append((order_id, text))
+        return True
+
+    def close(self):
+        pass
+
+def test_messaging():
+    """Тест шаблонов, HTTP-отправки и запасного браузера"""
+    print("🧪 Тест отправки сообщений...")
+
+    # Каждый шаблон собирается из своих полей
+    for name, template in MESSAGE_TEMPLATES.items():
+        fields = {field for _, field, _, _ in string.Formatter().parse(template) if field}
+        text = render_message(name, **{field: f'<{field}>' for field in fields})
+        assert all(f'<{field}>' in text for field in fields)
+    account = {'game_name': 'Dota 2', 'username': 'dota_user', 'password': 'p@ss',
+               'duration': 2, 'start_time': '2024-01-01 12:00', 'rental_id': 7}
+    assert 'dota_user' in render_message('account_data', **account)
+    try:
+        render_message('account_data', game_name='Dota 2')
+        assert False, "нет обязательных полей"
+    except KeyError:
+        pass
+    print("✅ Шаблоны собираются одним шагом для обоих способов")
+
+    manager = FakeManager(failing={'o2'})
+    browser = SeleniumMessageBackend('seller', 'secret', messenger_factory=FakeMessenger)
+    sender = MessageSender(HttpMessageBackend(manager), browser)
+
+    assert sender.send_template('o1', 'account_data', **account)
+    assert browser.messenger is None and FakeMessenger.created == 0
+    print("✅ По HTTP отправлено без запуска браузера")
+
+    assert sender.send_template('o2', 'account_data', **account)
+    assert sender.send('o2', 'повтор')
+    assert FakeMessenger.created == 1 and browser.messenger.logins == ['seller']
+    assert [order_id for order_id, _ in browser.messenger.sent] == ['o2', 'o2']
+    assert sender.get_metrics() == {'http_sent': 1, 'http_failed': 2, 'selenium_sent': 2}
+    print("✅ При неудаче HTTP сообщение отправлено через браузер")
+
+    http_only = create_message_sender(FakeManager(failing={'o3'}), fallback='')
+    assert http_only.fallback is None and not http_only.send('o3', 'текст')
+    assert isinstance(create_message_sender(manager).primary, HttpMessageBackend)
+    manager.db = object()
+    assert create_message_sender(manager).fallback.db is manager.db
+    print("✅ Запасной способ отключается настройкой")
+
+if __name__ == '__main__':
+    test_messaging()
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Тест миграций схемы базы данных
+"""
+
+import os
+import tempfile
+from database import Database
+from migrations import MIGRATIONS, get_schema_version, run_migrations
+
+def test_migrations():
+    """Тест применения миграций и использования индексов"""
+    print("🧪 Тест миграций...")
+
+    db_path = os.path.join(tempfile.mkdtemp(), 'migrations_test.db')
+    db = Database(db_path)
+
+    with db.pool.connection() as conn:
+        cursor = conn.cursor()
+
+        # Все миграции применены
+        assert get_schema_version(cursor) == MIGRATIONS[-1][0]
+        print(f"✅ Версия схемы: {get_schema_version(cursor)}")
+
+        # Повторный запуск ничего не меняет
+        assert run_migrations(conn) == 0
+        print("✅ Повторный запуск идемпотентен")
+
+        # Горячие запросы используют индексы вместо полного сканирования
+        queries = [
+            ("SELECT id FROM rentals WHERE status = 'active' AND end_time < datetime('now')", ()),
+            ("SELECT id FROM rentals WHERE renter_id = ? AND status = 'active' ORDER BY end_time DESC", ('1',)),
+            ("SELECT id FROM steam_accounts WHERE is_rented = FALSE AND game_name = ?", ('Dota 2',)),
+            ("SELECT id FROM operation_history WHERE user_id = ? ORDER BY created_at DESC", ('1',)),
+        ]
+        for query, params in queries:
+            cursor.execute(f'EXPLAIN QUERY PLAN {query}', params)
+            plan = ' '.join(row[-1] for row in cursor.fetchall())
+            assert 'USING' in plan and 'INDEX' in plan, plan
+            print(f"✅ {plan}")
+
+if __name__ == '__main__':
+    test_migrations()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Тест конвейера обработки заказов
+"""
+
+import time
+import threading
+from order_pipeline import OrderPipeline
+
+def test_order_pipeline():
+    """Тест параллельной выдачи, ограничения очереди и метрик"""
+    print("🧪 Тест конвейера заказов...")
+
+    claimed = set()
+    finished = {}
+    lock = threading.Lock()
+    release = threading.Event()
+
+    def claim(order_id):
+        with lock:
+            if order_id in claimed:
+                return False
+            claimed.add(order_id)
+            return True
+
+    def allocate(order):
+        if order['game_name'] == 'Unknown Game':
+            return None
+        return {'username': f"user_{order['id']}", 'rental_id': 1}
+
+    def deliver(order_id, account_data):
+        release.wait(5)
+        time.sleep(0.2)
+        return order_id != 'o_fail'
+
+    def finish(order_id, state, account_data):
+        with lock:
+            finished[order_id] = state
+
+    pipeline = OrderPipeline(claim, allocate, deliver, finish, workers=4, queue_size=6)
+    orders = [{'id': f'o{i}', 'game_name': 'Dota 2'} for i in range(6)]
+    orders += [{'id': 'o_fail', 'game_name': 'Dota 2'}, {'id': 'o_none', 'game_name': 'Unknown Game'}]
+
+    # Очередь ограничена: лишние заказы отклоняются до запуска обработчиков
+    accepted = [pipeline.submit(order) for order in orders]
+    assert accepted == [True] * 6 + [False, False]
+    assert not pipeline.submit(orders[0])
+    assert not pipeline.has_capacity()
+    print("✅ Заполненная очередь отклоняет заказы")
+
+    pipeline.start()
+    try:
+        started = time.monotonic()
+        release.set()
+        pipeline.join()
+        elapsed = time.monotonic() - started
+        # 6 отправок по 0.2с на 4 обработчиках — два круга, а не шесть
+        assert elapsed < 0.8, elapsed
+        print(f"✅ 6 заказов выданы параллельно за {elapsed:.2f}с")
+
+        for order in orders[6:]:
+            assert pipeline.submit(order)
+        pipeline.join()
+    finally:
+        pipeline.stop()
+
+    assert finished == {**{f'o{i}': 'delivered' for i in range(6)}, 'o_fail': 'failed', 'o_none': 'no_account'}
+    metrics = pipeline.get_metrics()
+    assert metrics['submitted'] == 8 and metrics['rejected'] == 2 and metrics['duplicates'] == 1
+    assert metrics['results'] == {'delivered': 6, 'failed': 1, 'no_account': 1}
+    assert metrics['stages']['deliver']['count'] == 7
+    assert metrics['stages']['deliver']['avg_seconds'] >= 0.2
+    assert metrics['in_flight'] == 0 and metrics['workers'] == 0
+    print("✅ Метрики этапов собраны")
+
+if __name__ == '__main__':
+    test_order_pipeline()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Тест адаптивного опроса заказов
+"""
+
+import os
+import tempfile
+import threading
+from settings_manager import SettingsManager
+from order_poller import AdaptiveOrderPoller, RequestBudget
+
+def test_order_poller():
+    """Тест интервалов, бюджета запросов и настроек опроса"""
+    print("🧪 Тест адаптивного опроса заказов...")
+
+    db_path = os.path.join(tempfile.mkdtemp(), 'poller_test.db')
+    settings = SettingsManager(db_path)
+    assert settings.get_setting('funpay', 'order_poll_min_seconds') == '15'
+
+    settings.set_setting('funpay', 'order_poll_min_seconds', '10')
+    settings.set_setting('funpay', 'order_poll_max_seconds', '80')
+    settings.set_setting('funpay', 'order_poll_jitter', '0')
+    settings.set_setting('funpay', 'order_poll_budget_per_hour', '2')
+
+    # Повторная инициализация не затирает измененные настройки
+    settings = SettingsManager(db_path)
+    assert settings.get_setting('funpay', 'order_poll_min_seconds') == '10'
+
+    poller = AdaptiveOrderPoller(lambda: 0, settings)
+    assert [poller.next_interval(0) for _ in range(4)] == [20, 40, 80, 80]
+    assert poller.next_interval(2) == 10
+    print("✅ Интервал растет в простое и сбрасывается после заказов")
+
+    settings.set_setting('funpay', 'order_poll_jitter', '0.2')
+    poller.reload_settings()
+    intervals = [poller.next_interval(1) for _ in range(50)]
+    assert all(8 <= interval <= 12 for interval in intervals)
+    assert len(set(intervals)) > 1
+    print("✅ Разброс интервала в пределах настройки")
+
+    budget = RequestBudget(2, period=60)
+    assert budget.acquire(now=0) == 0 and budget.acquire(now=1) == 0
+    assert budget.acquire(now=30) == 30
+    assert budget.acquire(now=60) == 0
+    print("✅ Бюджет запросов ограничивает окно")
+
+    # Живой цикл: два опроса по бюджету, третий откладывается
+    polled = threading.Semaphore(0)
+
+    def poll():
+        polled.release()
+        return 1
+
+    poller = AdaptiveOrderPoller(poll, settings)
+    poller.start()
+    try:
+        assert polled.acquire(timeout=5)
+        poller.wake()
+        assert polled.acquire(timeout=5)
+        poller.wake()
+        assert not polled.acquire(timeout=0.5)
+    finally:
+        poller.stop()
+
+    metrics = poller.get_metrics()
+    assert metrics['polls'] == 2 and metrics['active_polls'] == 2
+    assert metrics['budget_waits'] >= 1 and metrics['budget_used'] == 2
+    print("✅ Опрос не выходит за бюджет запросов")
+
+if __name__ == '__main__':
+    test_order_poller()
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Тест постраничного вывода аккаунтов и аренд
+"""
+
+import os
+import tempfile
+from database import Database
+
+def test_pagination():
+    """Тест пагинации по ключу в обе стороны"""
+    print("🧪 Тест постраничного вывода...")
+
+    db_path = os.path.join(tempfile.mkdtemp(), 'page_test.db')
+    db = Database(db_path)
+    for i in range(7):
+        db.add_steam_account(f'user_{i}', 'pass', 'Dota 2')
+    assert db.create_rental(3, 'renter', 1)
+
+    # Вперед по всем аккаунтам
+    first = db.get_accounts_page(limit=3)
+    assert [a['id'] for a in first['items']] == [1, 2, 3]
+    assert not first['has_prev'] and first['has_next']
+    second = db.get_accounts_page(after_id=3, limit=3)
+    assert [a['id'] for a in second['items']] == [4, 5, 6]
+    last = db.get_accounts_page(after_id=6, limit=3)
+    assert [a['id'] for a in last['items']] == [7]
+    assert last['has_prev'] and not last['has_next']
+    print("✅ Переход вперед читает по одной странице")
+
+    # Назад от второй страницы
+    back = db.get_accounts_page(before_id=4, limit=3)
+    assert [a['id'] for a in back['items']] == [1, 2, 3]
+    assert not back['has_prev'] and back['has_next']
+    print("✅ Переход назад возвращает предыдущую страницу")
+
+    # Только свободные аккаунты и активные аренды
+    available = db.get_accounts_page(limit=3, available_only=True)
+    assert [a['id'] for a in available['items']] == [1, 2, 4]
+    assert available['items'][0]['price'] == 50
+    rentals = db.get_active_rentals_page(limit=3)
+    assert [(r['account_id'], r['user_id']) for r in rentals['items']] == [(3, 'renter')]
+    assert not rentals['has_next']
+    print("✅ Фильтры страниц работают")
+
+if __name__ == '__main__':
+    test_pagination()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Тест очереди смены паролей освобожденных аккаунтов
+"""
+
+import os
+import time
+import tempfile
+import threading
+from database import Database
+from password_rotation import PasswordRotator
+
+class FakeSteamManager:
+    """Steam с медленной сменой пароля и отказами для отдельных аккаунтов"""
+
+    def __init__(self, failures):
+        self.failures = dict(failures)  # username -> число отказов подряд
+        self.calls = []
+        self.lock = threading.Lock()
+        self.counter = 0
+
+    def generate_password(self):
+        with self.lock:
+            self.counter += 1
+            return f'new_pass_{self.counter}'
+
+    def change_steam_password(self, username, old_password, new_password):
+        time.sleep(0.1)
+        with self.lock:
+            self.calls.append(username)
+            if self.failures.get(username, 0) > 0:
+                self.failures[username] -= 1
+                return False
+        return True
+
+class ReleasingSteamManager(FakeSteamManager):
+    """Steam, во время смены пароля которого аккаунт освобождают вручную"""
+
+    def __init__(self, db):
+        super().__init__({})
+        self.db = db
+
+    def change_steam_password(self, username, old_password, new_password):
+        with self.db.pool.connection() as conn:
+            conn.execute('''
+                UPDATE steam_accounts SET password_rotation_pending = FALSE WHERE username = ?
+            ''', (username,))
+        return super().change_steam_password(username, old_password, new_password)
+
+def test_password_rotation():
+    """Тест параллельной смены паролей с повторами"""
+    print("🧪 Тест смены паролей после аренды...")
+
+    db_path = os.path.join(tempfile.mkdtemp(), 'rotation_test.db')
+    db = Database(db_path)
+    for i in range(9):
+        db.add_steam_account(f'cs_{i}', 'old_pass', 'Counter-Strike 2')
+    for i in range(8):
+        assert db.claim_free_account('Counter-Strike 2', f'order_{i}', 1)
+    with db.pool.connection() as conn:
+        conn.execute("UPDATE rentals SET end_time = datetime('now', '-1 minute')")
+
+    freed = db.end_expired_rentals_batch(hold_for_rotation=True)
+    assert freed == list(range(1, 9))
+    assert db.get_rotation_pending_account_ids() == freed
+
+    # До смены пароля освобожденные аккаунты не выдаются
+    assert db.inventory.count('Counter-Strike 2') == 1
+    assert db.claim_free_account('Counter-Strike 2', 'order_x', 1)['id'] == 9
+    assert db.claim_free_account('Counter-Strike 2', 'order_y', 1) is None
+    print("✅ Аккаунты без смены пароля не выдаются")
+
+    steam = FakeSteamManager({'cs_0': 2, 'cs_1': 10})
+    rotator = PasswordRotator(db, steam, workers=4, max_attempts=3, backoff_seconds=0.05)
+    started = time.monotonic()
+    rotator.start()
+    try:
+        # Повторная постановка тех же аккаунтов не дублирует работу
+        assert rotator.submit(freed) == 0
+        deadline = time.monotonic() + 5
+        while time.monotonic() < deadline:
+            metrics = rotator.get_metrics()
+            if metrics['rotated'] + metrics['given_up'] == 8:
+                break
+            time.sleep(0.02)
+        elapsed = time.monotonic() - started
+    finally:
+        rotator.stop()
+
+    metrics = rotator.get_metrics()
+    assert metrics['rotated'] == 7 and metrics['given_up'] == 1
+    assert metrics['failed_attempts'] == 5 and metrics['queue_depth'] == 0
+    assert steam.calls.count('cs_0') == 3 and steam.calls.count('cs_1') == 3
+    # 8 аккаунтов по 0.1с на четырех потоках, а не 1.3с подряд
+    assert elapsed < 1.0, elapsed
+    print(f"✅ Пароли сменены параллельно за {elapsed:.2f}с, повторы с задержкой отработали")
+
+    # Аккаунт с неудачной сменой пароля остается недоступным до следующего запуска
+    assert db.get_rotation_pending_account_ids() == [2]
+    assert db.inventory.count('Counter-Strike 2') == 7
+    accounts = {account['id']: account for account in db.get_accounts_by_ids(range(1, 9))}
+    assert accounts[2]['password'] == 'old_pass' and accounts[2]['is_rented']
+    assert all(accounts[i]['password'].startswith('new_pass_') for i in accounts if i != 2)
+    assert not db.complete_password_rotation(1, 'again')
+    assert db.get_accounts_by_ids([1])[0]['password'] == 'again'
+    print("✅ В свободные возвращены только аккаунты с новым паролем")
+
+    # Пароль, уже измененный в Steam, сохраняется, даже если аккаунт перестал ждать смены
+    releasing = ReleasingSteamManager(db)
+    rotator = PasswordRotator(db, releasing, workers=1, max_attempts=3, backoff_seconds=0.01)
+    rotator.start()
+    try:
+        deadline = time.monotonic() + 5
+        while time.monotonic() < deadline and rotator.get_metrics()['skipped'] == 0:
+            time.sleep(0.02)
+    finally:
+        rotator.stop()
+    metrics = rotator.get_metrics()
+    assert metrics['rotated'] == 0 and metrics['failed_attempts'] == 1 and metrics['skipped'] == 1
+    assert releasing.calls == ['cs_1']
+    assert db.get_accounts_by_ids([2])[0]['password'] == 'new_pass_1'
+    print("✅ Новый пароль не потерян, повторная смена не выполнялась")
+
+if __name__ == '__main__':
+    test_password_rotation()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Тест атомарного захвата аккаунтов при аренде
+"""
+
+import os
+import tempfile
+import threading
+from database import Database
+
+def test_rental_claim():
+    """Тест отсутствия двойной аренды при параллельных заказах"""
+    print("🧪 Тест атомарного захвата аккаунтов...")
+
+    db_path = os.path.join(tempfile.mkdtemp(), 'claim_test.db')
+    db = Database(db_path)
+    for i in range(5):
+        db.add_steam_account(f'cs_user_{i}', 'pass', 'Counter-Strike 2')
+
+    # Повторная аренда занятого аккаунта невозможна
+    assert db.create_rental(1, 'first', 1)
+    assert not db.create_rental(1, 'second', 1)
+    print("✅ Занятый аккаунт не арендуется повторно")
+
+    # 10 потоков конкурируют за 4 оставшихся аккаунта
+    claimed = []
+    lock = threading.Lock()
+
+    def worker(n):
+        account = Database(db_path).claim_free_account('Counter-Strike 2', f'order_{n}', 1)
+        if account:
+            with lock:
+                claimed.append(account['id'])
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(10)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(claimed) == [2, 3, 4, 5], claimed
+    assert db.claim_free_account('Counter-Strike 2', 'late', 1) is None
+    assert db.get_active_rentals() == 5
+    print(f"✅ Каждый аккаунт выдан ровно одному заказу: {sorted(claimed)}")
+
+    # Индекс свободных аккаунтов согласован с арендой, возвратом и удалением
+    assert db.inventory.count('Counter-Strike 2') == 0
+    with db.pool.connection() as conn:
+        conn.execute("UPDATE rentals SET end_time = datetime('now', '-1 minute') WHERE account_id IN (1, 2)")
+    assert db.end_expired_rentals_batch() == [1, 2]
+    assert db.inventory.count('Counter-Strike 2') == 2
+    assert db.delete_account(2)
+    assert db.inventory.count('Counter-Strike 2') == 1
+    assert db.add_account('dota_user', 'pass', 'Dota 2', 50)
+    assert db.inventory.count('Dota 2') == 1
+    print("✅ Индекс свободных аккаунтов согласован с базой")
+
+    # rent_account занимает аккаунт так же атомарно, как create_rental
+    deadlines = []
+    listener = lambda path, rental_id, end_time: deadlines.append(rental_id)
+    Database.add_rental_listener(listener)
+    try:
+        assert db.rent_account(6, 'dota_renter', 1)
+        assert not db.rent_account(6, 'other_renter', 1)
+    finally:
+        Database.remove_rental_listener(listener)
+    assert db.inventory.count('Dota 2') == 0 and len(deadlines) == 1
+    print("✅ rent_account учитывает индекс свободных аккаунтов и слушателей")
+
+if __name__ == '__main__':
+    test_rental_claim()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Тест планировщика окончания аренд
+"""
+
+import os
+import time
+import tempfile
+import threading
+from datetime import datetime, timedelta, timezone
+from database import Database
+from rental_expiry_scheduler import RentalExpiryScheduler
+
+def test_rental_expiry_scheduler():
+    """Тест срабатывания планировщика точно к сроку"""
+    print("🧪 Тест планировщика окончания аренд...")
+
+    db_path = os.path.join(tempfile.mkdtemp(), 'expiry_test.db')
+    db = Database(db_path)
+    db.add_steam_account('expiry_user', 'pass', 'Dota 2')
+    db.add_steam_account('long_user', 'pass', 'Dota 2')
+
+    # Аренда истекла во время простоя системы
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    with db.pool.connection() as conn:
+        conn.execute("UPDATE steam_accounts SET is_rented = TRUE WHERE id = 1")
+        conn.execute('''
+            INSERT INTO rentals (account_id, renter_id, start_time, end_time, duration_hours)
+            VALUES (1, 'renter', ?, ?, 1)
+        ''', (now - timedelta(hours=1), now - timedelta(seconds=5)))
+
+    expired = []
+    done = threading.Event()
+
+    def on_expire():
+        expired.extend(db.end_expired_rentals_batch())
+        done.set()
+
+    scheduler = RentalExpiryScheduler(db, on_expire)
+    scheduler.start()
+    try:
+        # Просроченная аренда обрабатывается сразу после запуска
+        assert done.wait(5)
+        assert expired == [1]
+        assert scheduler.pending_count() == 0
+        print("✅ Просроченная аренда завершена при запуске")
+
+        # Новая аренда попадает в очередь через подписку Database
+        assert db.create_rental(2, 'renter', 1)
+        assert scheduler.pending_count() == 1
+        print("✅ Новая аренда добавлена в очередь")
+
+        # Продление переносит срок, устаревшая запись не срабатывает
+        assert db.add_bonus_time('renter', 30, 'тест')
+        assert scheduler.pending_count() == 1
+        print("✅ Продление переносит срок")
+    finally:
+        scheduler.stop()
+
+    # Неудачное завершение аренды повторяется через короткую паузу
+    db.add_steam_account('retry_user', 'pass', 'Dota 2')
+    with db.pool.connection() as conn:
+        conn.execute("UPDATE steam_accounts SET is_rented = TRUE WHERE id = 3")
+        conn.execute('''
+            INSERT INTO rentals (account_id, renter_id, start_time, end_time, duration_hours)
+            VALUES (3, 'retry_renter', ?, ?, 1)
+        ''', (now - timedelta(hours=1), now - timedelta(seconds=5)))
+
+    calls = []
+    retried = threading.Event()
+
+    def flaky_expire():
+        calls.append(len(calls))
+        if len(calls) == 1:
+            raise RuntimeError("база заблокирована")
+        freed = db.end_expired_rentals_batch()
+        retried.set()
+        return freed
+
+    scheduler = RentalExpiryScheduler(db, flaky_expire, retry_seconds=0.2)
+    scheduler.start()
+    try:
+        assert retried.wait(5)
+        assert len(calls) == 2
+        with db.pool.connection() as conn:
+            status = conn.execute("SELECT status FROM rentals WHERE renter_id = 'retry_renter'").fetchone()[0]
+        assert status == 'completed', status
+        assert scheduler.pending_count() == 1  # осталась только продленная аренда
+        print("✅ Аренда завершена повторной попыткой после ошибки")
+    finally:
+        scheduler.stop()
+
+    # Аренда, уже завершенная предыдущим пакетом, не повторяется
+    with db.pool.connection() as conn:
+        rental_id = conn.execute("SELECT id FROM rentals WHERE renter_id = 'retry_renter'").fetchone()[0]
+    batches = []
+    scheduler = RentalExpiryScheduler(db, lambda: batches.append(db.end_expired_rentals_batch()),
+                                      retry_seconds=0.1)
+    scheduler.start()
+    try:
+        scheduler.schedule(rental_id, now - timedelta(seconds=5))
+        time.sleep(0.6)
+        assert batches == [[]], batches
+        assert scheduler.pending_count() == 1  # только продленная аренда
+        print("✅ Завершенная ранее аренда не ставится на повтор")
+    finally:
+        scheduler.stop()
+
+if __name__ == '__main__':
+    test_rental_expiry_scheduler()
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Тест пакетной обработки отзывов без повторного начисления бонусов
+"""
+
+import os
+import tempfile
+from datetime import datetime
+from database import Database
+
+def review(review_id, order_id, rating):
+    return {'id': review_id, 'order_id': order_id, 'rating': rating, 'comment': '', 'date': ''}
+
+def test_review_processing():
+    """Тест однократного начисления бонусов за отзывы"""
+    print("🧪 Тест пакетной обработки отзывов...")
+
+    db_path = os.path.join(tempfile.mkdtemp(), 'reviews_test.db')
+    db = Database(db_path)
+    db.add_steam_account('cs_1', 'pass', 'Counter-Strike 2')
+    db.add_steam_account('cs_2', 'pass', 'Counter-Strike 2')
+    first = db.claim_free_account('Counter-Strike 2', 'order_1', 1)
+    db.claim_free_account('Counter-Strike 2', 'order_2', 1)
+
+    page = [review('r3', 'unknown', 5), review('r2', 'order_2', 3), review('r1', 'order_1', 5)]
+    new_reviews = db.get_unseen_funpay_reviews(page)
+    assert len(new_reviews) == 3
+
+    result = db.process_reviews_batch(new_reviews)
+    assert result == {'processed': 3, 'bonuses': 1, 'unmatched': ['unknown']}
+    print("✅ Отзывы обработаны одним пакетом")
+
+    # Бонус продлил аренду и записан пользователю заказа
+    rental = db.get_order_rental_account('order_1')
+    extended = datetime.fromisoformat(rental['end_time']) - first['end_time']
+    assert extended.total_seconds() == 30 * 60
+    assert db.get_total_bonus_time('order_1') == 30
+    assert db.get_total_bonus_time('order_2') == 0
+    stats = {row['game_name']: row for row in db.get_game_statistics()}
+    assert stats['Counter-Strike 2']['total_reviews'] == 2
+    print("✅ Бонус начислен и аренда продлена")
+
+    # Повторный опрос той же страницы ничего не начисляет
+    assert db.get_unseen_funpay_reviews(page) == []
+    assert db.process_reviews_batch(page) == {'processed': 0, 'bonuses': 0, 'unmatched': []}
+    assert db.get_total_bonus_time('order_1') == 30
+
+    # Новый отзыв поверх старых обрабатывается отдельно
+    new_page = [review('r4', 'order_2', 4)] + page
+    assert [r['id'] for r in db.get_unseen_funpay_reviews(new_page)] == ['r4']
+    assert db.process_reviews_batch(db.get_unseen_funpay_reviews(new_page))['bonuses'] == 1
+    assert db.get_total_bonus_time('order_2') == 30
+    print("✅ Повторные отзывы не дают бонус второй раз")
+
+if __name__ == '__main__':
+    test_review_processing()